@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import os
+import pickle
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from phase1_feature_engineering import build_features
+from phase2_anomaly_detection import features as ANOMALY_FEATURES
+from synthetic_telemetry import EPISODE_ROWS, FAULT_TYPES, add_faults
+from telemetry_schema import load_csv, save_csv
+
+# ---------------- FAULT INJECTION CONFIG ----------------
+# Faults (synthetic_telemetry.FAULT_TYPES) are written into the raw
+# telemetry before phase1, so derived features carry them too.
+FAULT_RATE = 0.05        # share of rows inside a fault episode (all types)
+
+# ---------------- SWEEP CONFIG ----------------
+SWEEP_GRID = {
+    "contamination": [0.01, 0.02, 0.05, 0.1],
+    "n_estimators": [25, 50, 100, 200],
+    "max_samples": ["auto", 64, 128, 256],
+    "feature_set": ["phase2", "thermal_power", "compact"],
+}
+
+FEATURE_SETS = {
+    "phase2": ANOMALY_FEATURES,
+    "thermal_power": ["temperature", "evap_temp", "superheat", "power_watts",
+                      "compressor_rpm", "power_per_rpm"],
+    "compact": ["superheat", "power_per_rpm", "compressor_rpm", "fan_rpm"],
+}
+
+SEEDS = [42]
+MIN_RECALL = 0.8         # "still catches the faults"
+LATENCY_SAMPLES = 20     # single-row decision_function calls per config
+N_WORKERS = os.cpu_count() or 1
+OUTPUT_FILE = "anomaly_sweep_results.csv"
+
+
+# Raw telemetry in, phase1 features out, with a "fault" column holding the
+# FAULT_TYPES code (0 = clean) for every row.
+def inject_faults(telemetry, rate=FAULT_RATE, episode_rows=EPISODE_ROWS, seed=0):
+    df = add_faults(telemetry.sort_values("ts"), rate, episode_rows, seed)
+    return build_features(df).reset_index(drop=True)
+
+
+# ---------------- ONE CONFIGURATION ----------------
+# The faulted feature frame is sent to each worker once (initializer),
+# tasks only carry the parameters.
+_frame = None
+
+
+def _init_worker(frame):
+    global _frame
+    _frame = frame
+
+
+def evaluate_config(config):
+    X = np.ascontiguousarray(_frame[FEATURE_SETS[config["feature_set"]]].to_numpy(dtype=np.float32))
+    truth = _frame["fault"].to_numpy() > 0
+    fault = _frame["fault"].to_numpy()
+
+    model = IsolationForest(
+        n_estimators=config["n_estimators"],
+        contamination=config["contamination"],
+        max_samples=config["max_samples"],
+        random_state=config["seed"],
+        n_jobs=1,
+    )
+
+    # Same semantics as phase2 detect_anomalies(): fit on the data it flags
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)   # max_samples > rows
+        start = time.perf_counter()
+        model.fit(X)
+        fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = model.decision_function(X)
+    batch_seconds = time.perf_counter() - start
+    predicted = score < 0
+
+    # One row at a time, as the firmware stream would call it
+    single = []
+    for i in range(min(LATENCY_SAMPLES, len(X))):
+        start = time.perf_counter()
+        model.decision_function(X[i:i + 1])
+        single.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    model.decision_function(X)
+    _, score_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tp = int((predicted & truth).sum())
+    fp = int((predicted & ~truth).sum())
+    fn = int((~predicted & truth).sum())
+    result = {
+        **config,
+        "max_samples": str(config["max_samples"]),
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "false_positive_rate": fp / max(int((~truth).sum()), 1),
+        "fit_seconds": fit_seconds,
+        "score_us_per_row": batch_seconds / len(X) * 1e6,
+        "score_us_single": float(np.median(single)) * 1e6,
+        "score_peak_kb": score_peak / 1024,
+        "model_kb": len(pickle.dumps(model)) / 1024,
+    }
+    for code, kind in enumerate(FAULT_TYPES[1:], start=1):
+        mask = fault == code
+        result[f"recall_{kind}"] = float(predicted[mask].mean()) if mask.any() else np.nan
+    return result
+
+
+# ---------------- SWEEP ----------------
+def sweep_configs(grid=SWEEP_GRID, seeds=SEEDS):
+    keys = list(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        for seed in seeds:
+            yield {**dict(zip(keys, values)), "seed": seed}
+
+
+# Results are averaged over seeds: one row per configuration
+def run_sweep(frame, grid=SWEEP_GRID, seeds=SEEDS, n_workers=N_WORKERS):
+    configs = list(sweep_configs(grid, seeds))
+    if n_workers <= 1:
+        _init_worker(frame)
+        rows = [evaluate_config(c) for c in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(frame,)) as pool:
+            rows = list(pool.map(evaluate_config, configs, chunksize=4))
+
+    results = pd.DataFrame(rows).drop(columns="seed")
+    keys = list(grid)
+    results = results.groupby(keys, sort=False, as_index=False).mean()
+    results["f1"] = np.where(
+        results["precision"] + results["recall"] > 0,
+        2 * results["precision"] * results["recall"] / (results["precision"] + results["recall"]),
+        0.0,
+    )
+    return results.round(4)
+
+
+# Cheapest configuration that still catches the faults: recall above the
+# floor, then lowest score latency, fit time and model size
+def cheapest_config(results, min_recall=MIN_RECALL):
+    ok = results[results["recall"] >= min_recall]
+    if ok.empty:
+        return None
+    return ok.sort_values(["score_us_per_row", "fit_seconds", "model_kb"]).iloc[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IsolationForest sweep on fault-injected telemetry")
+    parser.add_argument("--input", default="telemetry.csv", help="raw telemetry (phase1 input)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--fault-rate", type=float, default=FAULT_RATE)
+    parser.add_argument("--seeds", type=int, nargs="+", default=SEEDS)
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL)
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    args = parser.parse_args()
+
+    frame = inject_faults(load_csv(args.input), rate=args.fault_rate)
+    n_faulty = int((frame["fault"] > 0).sum())
+    print(f"Injected {n_faulty} fault rows into {len(frame)} samples")
+
+    start = time.perf_counter()
+    results = run_sweep(frame, seeds=args.seeds, n_workers=args.workers)
+    print(f"Swept {len(results)} configurations in {time.perf_counter() - start:.1f}s")
+
+    save_csv(results, args.output)
+
+    baseline = results[(results["contamination"] == 0.05) & (results["n_estimators"] == 100)
+                       & (results["max_samples"] == "auto") & (results["feature_set"] == "phase2")]
+    if not baseline.empty:
+        b = baseline.iloc[0]
+        print(f"Current phase2 model: precision {b['precision']:.2f}, recall {b['recall']:.2f}, "
+              f"{b['score_us_per_row']:.1f} µs/row, {b['model_kb']:.0f} KB")
+
+    best = cheapest_config(results, args.min_recall)
+    if best is None:
+        print(f"⚠️ No configuration reaches recall {args.min_recall}")
+    else:
+        print(f"Cheapest with recall ≥ {args.min_recall}: contamination={best['contamination']}, "
+              f"n_estimators={best['n_estimators']}, max_samples={best['max_samples']}, "
+              f"features={best['feature_set']} → precision {best['precision']:.2f}, "
+              f"recall {best['recall']:.2f}, {best['score_us_per_row']:.1f} µs/row, "
+              f"{best['model_kb']:.0f} KB")
+
+    print("✅ Anomaly sweep completed")
+    print(f"📁 Output file: {args.output}")
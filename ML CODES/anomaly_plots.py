@@ -0,0 +1,247 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.dates as mdates
+import matplotlib.image as mimage
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from risk_scoring import anomaly_flags
+from telemetry_schema import load_csv
+
+# ---------------- PLOT CONFIG ----------------
+INPUT_FILE = "ml_dataset_component_anomalies.csv"
+OUTPUT_DIR = "plots"
+
+MAX_POINTS = 2000        # line points per series (~2 per pixel at 1000 px)
+MARKER_GRID = (1400, 800)   # anomaly markers closer than one cell are drawn once
+TREND_WINDOW = 5         # rolling-mean samples of the dashboard trend line
+PANEL_SIZE = (7, 4)      # inches per panel
+DPI = 100
+N_WORKERS = min(6, os.cpu_count() or 1)
+
+DASHBOARD_TITLE = "Predictive Maintenance – Full Anomaly Dashboard"
+
+# value column, anomaly column, y label, title (dashboard order, 3 × 2)
+PANELS = [
+    ("temperature", "temp_anomaly", "Temperature (°C)", "Temperature"),
+    ("superheat", "temp_anomaly", "Superheat", "Superheat"),
+    ("power_watts", "power_anomaly", "Power (W)", "Power"),
+    ("fan_rpm", "rpm_anomaly", "Fan RPM", "Fan RPM"),
+    ("compressor_rpm", "rpm_anomaly", "Compressor RPM", "Compressor RPM"),
+    ("vibration", "vibration_anomaly", "Vibration", "Vibration"),
+]
+
+
+# ---------------- LTTB ----------------
+# Largest-Triangle-Three-Buckets (Steinarsson 2013): first and last point,
+# then per bucket the point spanning the largest triangle with the previous
+# pick and the next bucket's mean. Keeps peaks and edges that a stride or a
+# mean would flatten. Returns indices into x / y.
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0] = 0
+    picked[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2]
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        xs = x[lo:hi]
+        ys = y[lo:hi]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
+
+
+# ---------------- PANEL DATA ----------------
+# Matplotlib date numbers straight from datetime64, no Python datetimes
+def date_numbers(ts):
+    ts = pd.Series(ts)
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    return mdates.date2num(ts.to_numpy())
+
+
+# Anomalous rows that would land on the same sub-pixel cell (MARKER_GRID
+# cells over the data range, ~2 per pixel) are one marker: every
+# anomaly stays visible, overdraw doesn't cost seconds.
+def _distinct_markers(x, y, rows, grid=MARKER_GRID):
+    if len(rows) <= grid[0]:
+        return rows
+    cells = []
+    for values, n in zip((x, y), grid):
+        low, high = values.min(), values.max()
+        span = high - low if high > low else 1.0
+        cells.append(((values[rows] - low) / span * (n - 1)).astype(np.int64))
+    _, first = np.unique(cells[0] * grid[1] + cells[1], return_index=True)
+    return rows[np.sort(first)]
+
+
+# Normal line = LTTB pick of the whole series minus anomalous rows (x and y
+# always from the same rows); anomalies = every anomalous row.
+def prepare_panel(ts, values, anomalous, ylabel, title, max_points=MAX_POINTS, trend_window=None):
+    return _panel(date_numbers(ts), values, anomalous, ylabel, title, max_points, trend_window)
+
+
+def _panel(x, values, anomalous, ylabel, title, max_points, trend_window):
+    y = np.asarray(values, dtype=np.float64)
+    anomalous = np.asarray(anomalous, dtype=bool)
+
+    keep = lttb(x, y, max_points)
+    normal = keep[~anomalous[keep]]
+    anomaly = _distinct_markers(x, y, np.flatnonzero(anomalous))
+
+    panel = {
+        "ylabel": ylabel,
+        "title": title,
+        "normal": (x[normal], y[normal]),
+        "anomaly": (x[anomaly], y[anomaly]),
+        "trend": None,
+    }
+    if trend_window:
+        # rolling mean only at the picked rows, from one cumulative sum
+        total = np.concatenate([[0.0], np.cumsum(y)])
+        trend = (total[keep + 1] - total[np.maximum(keep + 1 - trend_window, 0)]) / trend_window
+        trend[keep < trend_window - 1] = np.nan
+        panel["trend"] = (x[keep], trend)
+    return panel
+
+
+def prepare_panels(df, panels=PANELS, max_points=MAX_POINTS, trend_window=TREND_WINDOW):
+    if not df["ts"].is_monotonic_increasing:
+        df = df.sort_values("ts")
+    x = date_numbers(df["ts"])
+    flags = {}
+    prepared = []
+    for value_col, anomaly_col, ylabel, title in panels:
+        if anomaly_col not in flags:
+            flags[anomaly_col] = anomaly_flags(df[anomaly_col]).astype(bool)
+        prepared.append(_panel(x, df[value_col], flags[anomaly_col],
+                               ylabel, title, max_points, trend_window))
+    return prepared
+
+
+# ---------------- DRAWING ----------------
+def draw_panel(ax, panel):
+    ax.plot(*panel["normal"], label="Normal")
+    # markers as a Line2D: far cheaper to rasterize than a scatter collection;
+    # large marker sets are embedded as an image in SVG output
+    x, y = panel["anomaly"]
+    ax.plot(x, y, "o", markersize=5, color="tab:orange", label="Anomaly", zorder=3,
+            rasterized=len(x) > 10_000)
+    if panel["trend"] is not None:
+        ax.plot(*panel["trend"], linestyle="--", color="tab:green", label="Trend")
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax.set_xlabel("Time")
+    ax.set_ylabel(panel["ylabel"])
+    ax.set_title(panel["title"])
+    ax.legend(loc="upper right")
+
+
+# Off-screen: Figure + Agg canvas, never pyplot, so no display or GUI
+# backend is touched and workers share no state. path=None → RGBA array.
+def _render_panel(task):
+    panel, path, figsize, dpi = task
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    draw_panel(fig.add_subplot(), panel)
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path)
+        return path
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def _render_all(tasks, workers):
+    if workers <= 1:
+        return [_render_panel(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_panel, tasks))
+
+
+def _file_name(title):
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+# One file per panel (PNG or SVG), panels rendered in parallel
+def render_panel_files(panels, out_dir=OUTPUT_DIR, fmt="png", workers=N_WORKERS,
+                       figsize=PANEL_SIZE, dpi=DPI):
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(p, os.path.join(out_dir, f"{_file_name(p['title'])}.{fmt}"), figsize, dpi)
+             for p in panels]
+    return _render_all(tasks, workers)
+
+
+# 3 × 2 dashboard. PNG: panels are rasterized in parallel and tiled under a
+# title strip. SVG stays vector, so it is drawn as one figure.
+def render_dashboard(panels, path, title=DASHBOARD_TITLE, workers=N_WORKERS,
+                     figsize=PANEL_SIZE, dpi=DPI):
+    if path.lower().endswith(".svg"):
+        fig = Figure(figsize=(figsize[0] * 2, figsize[1] * 3), dpi=dpi)
+        FigureCanvasAgg(fig)
+        axs = fig.subplots(3, 2)
+        for ax, panel in zip(axs.ravel(), panels):
+            draw_panel(ax, panel)
+        fig.suptitle(title, fontsize=14)
+        fig.tight_layout()
+        fig.savefig(path)
+        return path
+
+    images = _render_all([(p, None, figsize, dpi) for p in panels], workers)
+    rows = [np.concatenate(images[i:i + 2], axis=1) for i in range(0, len(images), 2)]
+    grid = np.concatenate(rows, axis=0)
+
+    header = Figure(figsize=((grid.shape[1] + 1) / dpi, 0.6), dpi=dpi)
+    canvas = FigureCanvasAgg(header)
+    header.text(0.5, 0.5, title, ha="center", va="center", fontsize=14)
+    canvas.draw()
+    strip = np.asarray(canvas.buffer_rgba())[:, :grid.shape[1]]
+
+    mimage.imsave(path, np.concatenate([strip, grid], axis=0))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless, downsampled anomaly plots")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS)
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    args = parser.parse_args()
+
+    df = load_csv(args.input)
+
+    start = time.perf_counter()
+    panels = prepare_panels(df, max_points=args.max_points)
+    prepared = time.perf_counter() - start
+
+    os.makedirs(args.out, exist_ok=True)
+    dashboard = render_dashboard(panels, os.path.join(args.out, f"dashboard.{args.format}"),
+                                 workers=args.workers)
+    files = render_panel_files(panels, args.out, args.format, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(df)} rows → {sum(len(p['normal'][0]) + len(p['anomaly'][0]) for p in panels)} "
+          f"plotted points (downsampling {prepared:.2f}s, total {elapsed:.2f}s)")
+    print(f"✅ Rendered dashboard + {len(files)} panels")
+    print(f"📁 Output folder: {args.out}/")
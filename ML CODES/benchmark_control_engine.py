@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from control_engine import compressor_control_vectorized, decide_control_vectorized
+from phase3_compressor_control import compressor_control
+from phase3_control_logic import CONTROL_COLUMNS, decide_control
+
+# ---------------- BENCHMARK CONFIG ----------------
+BENCH_ROWS = 1_000_000
+CHECK_ROWS = 20_000      # rows also run through the row-wise reference
+SEED = 42
+
+
+# ---------------- SYNTHETIC ROWS ----------------
+# Values straddle every threshold, including exact boundary values and NaN.
+def make_rows(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+
+    def around(center, spread, exact):
+        values = rng.uniform(center - spread, center + spread, n)
+        values[rng.random(n) < 0.05] = exact
+        values[rng.random(n) < 0.01] = np.nan
+        return values
+
+    labels = np.array([0, 1, 1])
+    return pd.DataFrame({
+        "power_watts": around(900, 300, 900),
+        "superheat": around(9, 8, 12),
+        "temp_delta": around(3, 3, 3),
+        "vibration": rng.choice([0, 1, 1.5, 2, 3], n),
+        "vibration_anomaly": rng.choice(labels, n),
+        "power_anomaly": rng.choice(labels, n),
+        "temperature_anomaly": rng.choice(labels, n),
+    })
+
+
+def check_equivalence(df):
+    expected = df.apply(decide_control, axis=1)
+    expected.columns = CONTROL_COLUMNS
+    commands, _ = decide_control_vectorized(df)
+    for col in CONTROL_COLUMNS:
+        got = commands[col].astype(object).to_numpy()
+        if not np.array_equal(got, expected[col].to_numpy()):
+            raise AssertionError(f"decide_control mismatch in {col}")
+
+    expected = df.apply(compressor_control, axis=1, result_type="expand")
+    delta, state, _ = compressor_control_vectorized(df)
+    if not np.array_equal(delta, expected[0].to_numpy()):
+        raise AssertionError("compressor_control mismatch in rpm delta")
+    if not np.array_equal(state.astype(object), expected[1].to_numpy()):
+        raise AssertionError("compressor_control mismatch in state")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    df = make_rows(BENCH_ROWS)
+
+    sample = df.head(CHECK_ROWS)
+    check_equivalence(sample)
+    print(f"✅ Vectorized rules match row-wise functions on {CHECK_ROWS} rows")
+
+    _, rowwise = timed(lambda d: d.apply(decide_control, axis=1), sample)
+    (_, hits), vectorized = timed(decide_control_vectorized, df)
+    (_, _, comp_hits), comp_vectorized = timed(compressor_control_vectorized, df)
+
+    per_row = rowwise / CHECK_ROWS
+    print(f"decide_control row-wise:   {per_row * 1e6:.1f} µs/row "
+          f"(≈{per_row * BENCH_ROWS:.0f}s for {BENCH_ROWS} rows)")
+    print(f"decide_control vectorized: {vectorized:.3f}s for {BENCH_ROWS} rows")
+    print(f"compressor vectorized:     {comp_vectorized:.3f}s for {BENCH_ROWS} rows")
+    print("Rule hits:", hits)
+    print("Compressor decisions:", comp_hits)
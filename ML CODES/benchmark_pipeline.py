@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from instrumentation import PeakRSS
+from phase1_feature_engineering import build_features
+from phase2_anomaly_detection import detect_anomalies
+from phase3_control_logic import apply_control
+from phase3_health_score import compute_health_score
+from phase3_risk_classification import add_risk_levels
+from synthetic_telemetry import generate_rows
+
+# ---------------- BENCHMARK CONFIG ----------------
+# 10^8 rows needs tens of GB of RAM (phase1 → phase3 keep several copies of
+# the frame alive); the default stops at 10^6.
+DEFAULT_SIZES = [10**4, 10**5, 10**6]
+RESULTS_FILE = os.path.join("benchmarks", "pipeline_benchmarks.jsonl")
+REGRESSION_RATIO = 1.2   # slower than the previous run by this much → flagged
+
+
+# Stage → function of the previous stage's output, in pipeline order
+STAGES = {
+    "phase1_features": build_features,
+    "phase2_detection": detect_anomalies,
+    "phase3_scoring": lambda df: add_risk_levels(compute_health_score(df)),
+    "control": apply_control,
+}
+
+
+# ---------------- ONE SIZE ----------------
+# Runs in its own process, so one size's memory never inflates the next.
+def bench_size(n_rows, stages, seed=0):
+    df = generate_rows(n_rows, seed=seed)
+    results = []
+    for stage in STAGES:
+        if stage not in stages:
+            df = STAGES[stage](df)
+            continue
+
+        rows_in = len(df)
+        with PeakRSS() as rss:
+            cpu = time.process_time()
+            start = time.perf_counter()
+            df = STAGES[stage](df)
+            seconds = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+
+        results.append({
+            "stage": stage,
+            "rows": n_rows,
+            "rows_in": rows_in,
+            "rows_out": len(df),
+            "seconds": round(seconds, 4),
+            "cpu_seconds": round(cpu, 4),
+            "rows_per_s": round(rows_in / seconds) if seconds else None,
+            "rss_start_mb": round(rss.start, 1),
+            "rss_peak_mb": round(rss.peak, 1),
+            "rss_delta_mb": round(rss.peak - rss.start, 1),
+        })
+    return results
+
+
+# ---------------- RESULTS FILE ----------------
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+    }
+
+
+def load_results(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_results(records, path=RESULTS_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+# Last earlier run of the same (stage, rows) on any commit
+def previous_result(history, record):
+    for old in reversed(history):
+        if (old["stage"], old["rows"]) == (record["stage"], record["rows"]) \
+                and old["run_id"] != record["run_id"]:
+            return old
+    return None
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=tuple(STAGES), path=RESULTS_FILE):
+    run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **environment(),
+    }
+    history = load_results(path)
+
+    records = []
+    for n_rows in sizes:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rows = pool.submit(bench_size, n_rows, list(stages)).result()
+
+        for row in rows:
+            record = {**run, **row}
+            old = previous_result(history, record)
+            record["previous_seconds"] = old["seconds"] if old else None
+            records.append(record)
+            append_results([record], path)
+
+            change = ""
+            if old and old["seconds"]:
+                ratio = record["seconds"] / old["seconds"]
+                flag = "  ⚠️ regression" if ratio > REGRESSION_RATIO else ""
+                change = f"  ({ratio:.2f}× previous){flag}"
+            print(f"{record['stage']:<18} {n_rows:>11,} rows  {record['seconds']:>9.3f}s  "
+                  f"{record['rss_delta_mb']:>8.1f} MB{change}")
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile phase1 → control at scale")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                        help="row counts, e.g. 1e4 1e5 1e6 1e7 1e8")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--output", default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    records = run_benchmarks([int(s) for s in args.sizes], args.stages, args.output)
+
+    print(f"\n✅ {len(records)} benchmark results recorded")
+    print(f"📁 Output file: {args.output}")
@@ -1,14 +1,15 @@
 import cv2
 import time
 import random
-import paho.mqtt.client as mqtt
+from mqtt_publisher import MqttPublisher
 
 # ---------------- MQTT CONFIG ----------------
 MQTT_BROKER = "broker.hivemq.com"
 MQTT_TOPIC  = "freezer/inventory"
 
-client = mqtt.Client()
-client.connect(MQTT_BROKER, 1883, 60)
+# Network loop, reconnects and buffering run on the publisher's own
+# thread; publish() below never blocks the frame loop.
+publisher = MqttPublisher(MQTT_BROKER).start()
 
 # ---------------- CAMERA ----------------
 cap = cv2.VideoCapture(0)
@@ -38,8 +39,8 @@ while True:
         change = random.choice([-1, 0, 0, 0])
         inventory_count = max(0, inventory_count + change)
 
-        client.publish(MQTT_TOPIC, inventory_count)
-        print("Inventory sent:", inventory_count)
+        publisher.publish(MQTT_TOPIC, inventory_count)
+        print("Inventory queued:", inventory_count, publisher.stats())
 
         last_update_time = current_time
 
@@ -60,4 +61,6 @@ while True:
         break
 
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
+publisher.stop()
+print("MQTT publisher:", publisher.stats())
@@ -0,0 +1,124 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from phase2_component_anomalies import COMPONENTS
+from telemetry_schema import ANOMALY_LABELS, load_csv, save_csv
+
+# ---------------- PARALLEL CONFIG ----------------
+N_WORKERS = os.cpu_count() or 1
+DEFAULT_PARAMS = {"n_estimators": 100, "contamination": 0.05, "random_state": 42}
+
+
+# ---------------- SHARED FEATURE MATRIX ----------------
+# All component features go into ONE C-contiguous float32 matrix (the dtype
+# IsolationForest trains on anyway). Each component is a list of column
+# indices into it.
+def build_feature_matrix(df, components=COMPONENTS):
+    columns = []
+    for cols in components.values():
+        for col in cols:
+            if col not in columns:
+                columns.append(col)
+
+    X = np.empty((len(df), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        X[:, j] = df[col].to_numpy(dtype=np.float32)
+
+    index = {name: [columns.index(c) for c in cols] for name, cols in components.items()}
+    return X, columns, index
+
+
+# ---------------- WORKER ----------------
+# Workers attach to the feature matrix and the int8 result matrix by name;
+# nothing but the small task tuple is pickled.
+def _run_component(task):
+    (x_name, x_shape, out_name, out_shape, row, col_idx, mode, params, model_ref) = task
+
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        X = np.ndarray(x_shape, dtype=np.float32, buffer=x_shm.buf)
+        out = np.ndarray(out_shape, dtype=np.int8, buffer=out_shm.buf)
+        Xc = np.ascontiguousarray(X[:, col_idx])
+
+        start = time.perf_counter()
+        if mode == "fit":
+            # Same as phase2 detect_anomaly(): fit_predict on the component
+            pred = IsolationForest(**params).fit_predict(Xc)
+        else:
+            from model_registry import load_model
+            model, _ = load_model(*model_ref)
+            pred = np.where(model.decision_function(Xc) < 0, -1, 1)
+        out[row] = pred
+        return row, time.perf_counter() - start
+    finally:
+        x_shm.close()
+        out_shm.close()
+
+
+# ---------------- ALL COMPONENTS ----------------
+# mode="fit"   → train + predict every component (phase2 semantics)
+# mode="score" → decision_function with the registry models (no refit)
+def detect_components_parallel(df, components=COMPONENTS, n_workers=N_WORKERS,
+                               mode="fit", params=None, version=None, registry="models"):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    X, _, index = build_feature_matrix(df, components)
+    names = list(components)
+
+    x_shape = X.shape
+    out_shape = (len(names), len(df))
+
+    x_shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(len(names) * len(df), 1))
+    try:
+        np.ndarray(x_shape, dtype=np.float32, buffer=x_shm.buf)[:] = X
+        del X
+
+        tasks = [
+            (x_shm.name, x_shape, out_shm.name, out_shape,
+             row, index[name], mode, params, (name, version, registry))
+            for row, name in enumerate(names)
+        ]
+
+        workers = max(1, min(n_workers, len(names)))
+        if workers == 1:
+            timings = [_run_component(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                timings = list(pool.map(_run_component, tasks))
+
+        results = np.ndarray(out_shape, dtype=np.int8, buffer=out_shm.buf).copy()
+    finally:
+        x_shm.close()
+        x_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+    df = df.copy()
+    for row, name in enumerate(names):
+        df[name] = pd.Categorical.from_codes((results[row] == -1).astype(np.int8),
+                                             categories=ANOMALY_LABELS)
+    seconds = {names[row]: round(t, 3) for row, t in timings}
+    return df, seconds
+
+
+if __name__ == "__main__":
+    # Load ML dataset
+    df = load_csv("ml_dataset.csv")
+
+    start = time.perf_counter()
+    df, seconds = detect_components_parallel(df)
+    elapsed = time.perf_counter() - start
+
+    # Save output
+    save_csv(df, "ml_dataset_component_anomalies.csv")
+
+    print(f"Per-component seconds: {seconds}")
+    print(f"Wall time with {min(N_WORKERS, len(COMPONENTS))} workers: {elapsed:.3f}s")
+    print("✅ Component-level anomalies generated")
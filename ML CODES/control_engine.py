@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# DEFAULT SAFE VALUES
+# (phase3_control_logic.py imports these)
+# =========================
+DEFAULT_EEV_STEP = 50
+DEFAULT_FAN_RPM = 1200
+DEFAULT_COMP_RPM = 1800
+
+EEV_LIMITS = (20, 100)
+FAN_LIMITS = (800, 2000)
+COMP_LIMITS = (1000, 2500)
+
+NORMAL_REASON = "Normal operation"
+
+# =========================
+# SUPERVISORY RULES (decide_control)
+# Every matching rule adds its deltas; the LAST matching rule sets the reason.
+# (name, column, threshold, eev delta, fan delta, compressor delta, reason)
+# =========================
+CONTROL_RULES = [
+    ("high_power", "power_watts", 900, 0, 200, -300,
+     "High power detected → reducing compressor load"),
+    ("high_superheat", "superheat", 12, 10, 100, 0,
+     "High superheat → opening EEV"),
+    ("poor_cooling", "temp_delta", 3, 0, 200, 200,
+     "Poor cooling → increasing RPM"),
+    ("vibration", "vibration", 1.5, 0, -200, -500,
+     "Vibration anomaly → safety throttle"),
+]
+
+# =========================
+# COMPRESSOR RULES (compressor_control in phase3_compressor_control.py)
+# The FIRST matching rule decides; no match → (0, "HOLD").
+# =========================
+COMPRESSOR_HOLD = (0, "HOLD")
+
+
+def _column(df, name, default=0):
+    if name in df:
+        return df[name].to_numpy()
+    return np.full(len(df), default)
+
+
+def _greater(values, threshold):
+    # NaN never matches, like `row.get(...) > threshold` on a NaN cell
+    return np.asarray(values > threshold, dtype=bool)
+
+
+def _compressor_conditions(df):
+    sh = df["superheat"].to_numpy()
+    vib_anomaly = _column(df, "vibration_anomaly") == 1
+    power_anomaly = _column(df, "power_anomaly") == 1
+    temp_anomaly = _column(df, "temperature_anomaly") == 1
+    return [
+        ("VIBRATION_LIMIT", -300, vib_anomaly),
+        ("INEFFICIENT_POWER_USE", -200, power_anomaly & (sh < 8)),
+        ("INCREASE_COOLING", 300, sh > 12),
+        ("OVERCOOLING_RISK", -200, sh < 5),
+        ("TEMP_NOT_RECOVERING", 200, temp_anomaly & (sh > 10)),
+    ]
+
+
+# =========================
+# VECTORIZED decide_control
+# Returns (frame of the seven control columns, {rule: rows matched})
+# =========================
+def decide_control_vectorized(df):
+    n = len(df)
+    eev = np.full(n, DEFAULT_EEV_STEP, dtype=np.int32)
+    fan = np.full(n, DEFAULT_FAN_RPM, dtype=np.int32)
+    comp = np.full(n, DEFAULT_COMP_RPM, dtype=np.int32)
+
+    masks = []
+    hits = {}
+    for name, column, threshold, d_eev, d_fan, d_comp, _ in CONTROL_RULES:
+        mask = _greater(_column(df, column), threshold)
+        eev += d_eev * mask
+        fan += d_fan * mask
+        comp += d_comp * mask
+        masks.append(mask)
+        hits[name] = int(mask.sum())
+
+    # Last matching rule wins → np.select over the rules in reverse order
+    reasons = [rule[-1] for rule in CONTROL_RULES]
+    reason_codes = np.select(masks[::-1], list(range(len(reasons)))[::-1], default=len(reasons))
+    categories = reasons + [NORMAL_REASON]
+
+    out = pd.DataFrame({
+        "eev_step_cmd": np.clip(eev, *EEV_LIMITS).astype(np.int16),
+        "fan_rpm_cmd": np.clip(fan, *FAN_LIMITS).astype(np.int16),
+        "compressor_rpm_cmd": np.clip(comp, *COMP_LIMITS).astype(np.int16),
+        "eev_state": pd.Categorical.from_codes((eev > DEFAULT_EEV_STEP).astype(np.int8),
+                                               categories=["HOLD", "OPEN"]),
+        "fan_state": pd.Categorical.from_codes((fan > DEFAULT_FAN_RPM).astype(np.int8),
+                                               categories=["NORMAL", "HIGH"]),
+        "compressor_state": pd.Categorical.from_codes((comp < DEFAULT_COMP_RPM).astype(np.int8),
+                                                      categories=["NORMAL", "REDUCED"]),
+        "control_reason": pd.Categorical.from_codes(reason_codes, categories=categories),
+    }, index=df.index)
+
+    hits["normal_operation"] = int((reason_codes == len(reasons)).sum())
+    return out, hits
+
+
+# =========================
+# VECTORIZED compressor_control
+# Returns (rpm delta array, state categorical, {state: rows decided})
+# =========================
+def compressor_control_vectorized(df):
+    rules = _compressor_conditions(df)
+    conditions = [mask for _, _, mask in rules]
+
+    delta = np.select(conditions, [d for _, d, _ in rules], default=COMPRESSOR_HOLD[0])
+    codes = np.select(conditions, list(range(len(rules))), default=len(rules))
+
+    states = [name for name, _, _ in rules] + [COMPRESSOR_HOLD[1]]
+    state = pd.Categorical.from_codes(codes, categories=states)
+    hits = {name: int((codes == i).sum()) for i, name in enumerate(states)}
+    return delta.astype(np.int16), state, hits
+
+
+def apply_control_vectorized(df):
+    commands, hits = decide_control_vectorized(df)
+    df = df.copy()
+    df[commands.columns] = commands
+    return df, hits
@@ -0,0 +1,77 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firestore_incremental_export import iter_pages, page_to_frame
+
+# ---------------- EXPORT CONFIG ----------------
+COLLECTIONS = ["TEMPERATURE", "EVAPTEMP", "DOOR"]
+PAGE_SIZE = 1000
+MAX_WORKERS = 4
+EXPORT_DIR = "firestore_export"
+
+
+# ---------------- ONE COLLECTION ----------------
+# Every page becomes its own part file as soon as it arrives, so only one
+# page of documents per worker is ever held in memory. Documents without a
+# `ts` field come last, from iter_pages' untimed pass.
+# Output: <out_dir>/<COLLECTION>/part-00000.csv, part-00001.csv, ...
+def export_collection_chunked(db, collection_name, out_dir=EXPORT_DIR, page_size=PAGE_SIZE):
+    collection_dir = os.path.join(out_dir, collection_name)
+    os.makedirs(collection_dir, exist_ok=True)
+
+    # Remove parts of a previous run so old pages never mix with new ones
+    for name in os.listdir(collection_dir):
+        if name.startswith("part-") and name.endswith(".csv"):
+            os.remove(os.path.join(collection_dir, name))
+
+    start = time.perf_counter()
+    docs = 0
+    parts = 0
+    for page in iter_pages(db, collection_name, page_size=page_size, untimed=True):
+        path = os.path.join(collection_dir, f"part-{parts:05d}.csv")
+        page_to_frame(page).to_csv(path, index=False)
+        docs += len(page)
+        parts += 1
+
+    return {
+        "collection": collection_name,
+        "documents": docs,
+        "parts": parts,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ---------------- ALL COLLECTIONS ----------------
+# The Firestore client is thread-safe, so one client is shared by all workers.
+def export_concurrent(db, collections=COLLECTIONS, out_dir=EXPORT_DIR,
+                      page_size=PAGE_SIZE, max_workers=MAX_WORKERS):
+    start = time.perf_counter()
+    workers = max(1, min(max_workers, len(collections)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(export_collection_chunked, db, name, out_dir, page_size)
+            for name in collections
+        ]
+        results = [f.result() for f in futures]
+
+    for r in results:
+        print(f"{r['collection']}: {r['documents']} documents in {r['parts']} parts ({r['seconds']}s)")
+    print(f"Total wall time: {time.perf_counter() - start:.3f}s")
+    return results
+
+
+if __name__ == "__main__":
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    # Initialize Firebase
+    cred = credentials.Certificate("serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+
+    db = firestore.client()
+
+    export_concurrent(db)
+
+    print(f"✅ Collections exported to {EXPORT_DIR}/")
@@ -0,0 +1,217 @@
+import argparse
+import io
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+# ---------------- EXPORT CONFIG ----------------
+COLLECTIONS = ["TEMPERATURE", "EVAPTEMP", "DOOR"]
+PAGE_SIZE = 1000
+CHECKPOINT_FILE = "export_checkpoints.json"
+
+# Firestore orders documents by id through this special field path
+# (same value as firestore.FieldPath.document_id())
+DOCUMENT_ID_FIELD = "__name__"
+
+
+# ---------------- CHECKPOINTS ----------------
+# One high-water mark per collection: the (ts, document_id) of the last
+# exported document. ts is kept as ISO text when it is a Firestore timestamp.
+def load_checkpoints(path=CHECKPOINT_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoints(checkpoints, path=CHECKPOINT_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoints, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def encode_mark(ts, document_id):
+    if isinstance(ts, datetime):
+        return {"ts": ts.isoformat(), "ts_is_datetime": True, "document_id": document_id}
+    return {"ts": ts, "ts_is_datetime": False, "document_id": document_id}
+
+
+def decode_mark(mark):
+    ts = mark["ts"]
+    if mark.get("ts_is_datetime"):
+        ts = datetime.fromisoformat(ts)
+    return ts, mark["document_id"]
+
+
+# ---------------- PAGED QUERY ----------------
+# Yields lists of document snapshots ordered by (ts, document_id), starting
+# strictly after `mark`. Firestore leaves documents without a `ts` field out
+# of a query ordered by ts; with untimed=True they follow in a second pass
+# (see iter_untimed_pages).
+def iter_pages(db, collection_name, mark=None, page_size=PAGE_SIZE, untimed=False):
+    collection = db.collection(collection_name)
+    base = collection.order_by("ts").order_by(DOCUMENT_ID_FIELD)
+
+    cursor = None
+    if mark is not None:
+        ts, document_id = decode_mark(mark)
+        cursor = {"ts": ts, DOCUMENT_ID_FIELD: collection.document(document_id)}
+
+    while True:
+        query = base if cursor is None else base.start_after(cursor)
+        page = list(query.limit(page_size).stream())
+        if not page:
+            break
+
+        yield page
+
+        if len(page) < page_size:
+            break
+        last = page[-1]
+        cursor = {"ts": last.to_dict().get("ts"), DOCUMENT_ID_FIELD: collection.document(last.id)}
+
+    if untimed:
+        yield from iter_untimed_pages(db, collection_name, page_size)
+
+
+# Documents without `ts`, in document id order. Only ts is fetched while
+# scanning (a projection), full documents are read just for the misses.
+# Ids are not time ordered, so this pass always covers the whole collection.
+def iter_untimed_pages(db, collection_name, page_size=PAGE_SIZE):
+    collection = db.collection(collection_name)
+    base = collection.select(["ts"]).order_by(DOCUMENT_ID_FIELD)
+
+    query = base
+    while True:
+        page = list(query.limit(page_size).stream())
+        if not page:
+            return
+        missing = [collection.document(doc.id) for doc in page if "ts" not in doc.to_dict()]
+        docs = sorted((doc for doc in db.get_all(missing) if doc.exists),
+                      key=lambda doc: doc.id) if missing else []
+        if docs:
+            yield docs
+        if len(page) < page_size:
+            return
+        query = base.start_after({DOCUMENT_ID_FIELD: collection.document(page[-1].id)})
+
+
+def page_to_frame(page):
+    rows = []
+    for doc in page:
+        data = doc.to_dict()
+        data["document_id"] = doc.id
+        rows.append(data)
+    return pd.DataFrame(rows)
+
+
+# ---------------- APPEND OUTPUT ----------------
+# Appended pages keep the column order of the existing file. A page with
+# fields the header lacks (new sensors, typos like `vaule`) widens the file:
+# it is rewritten once with the extra columns added at the end.
+def append_frame(df, out_csv, columns=None):
+    if columns is None:
+        df.to_csv(out_csv, index=False)
+        return list(df.columns)
+
+    extra = [c for c in df.columns if c not in columns]
+    if extra:
+        print(f"⚠️ {out_csv}: new fields {extra}, widening the header")
+        columns = columns + extra
+        old = pd.read_csv(out_csv, dtype=str, keep_default_na=False)
+        old.reindex(columns=columns).to_csv(out_csv + ".tmp", index=False)
+        os.replace(out_csv + ".tmp", out_csv)
+    df.reindex(columns=columns).to_csv(out_csv, mode="a", header=False, index=False)
+    return columns
+
+
+# Ids already in the file. A run that died between the CSV append and the
+# checkpoint save re-reads at most its last page, so only the ids of the
+# last `rows` lines are read (from the end of the file); the untimed pass
+# re-reads every document without ts and needs them all (rows=None).
+def exported_ids(out_csv, columns, rows=None):
+    if "document_id" not in columns:
+        return set()
+    if rows is None:
+        return set(pd.read_csv(out_csv, usecols=["document_id"], dtype=str)["document_id"])
+
+    with open(out_csv, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = pos = f.tell()
+        tail = b""
+        while pos > 0 and tail.count(b"\n") <= rows + 1:
+            pos = max(0, pos - (1 << 16))
+            f.seek(pos)
+            tail = f.read(end - pos)
+    lines = tail.decode("utf-8").splitlines()[1:][-rows:]   # first line: partial or header
+    if not lines:
+        return set()
+    df = pd.read_csv(io.StringIO("\n".join(lines)), names=columns, dtype=str)
+    return set(df["document_id"].dropna())
+
+
+def export_collection_incremental(db, collection_name, out_csv,
+                                  checkpoints, checkpoint_path=CHECKPOINT_FILE,
+                                  page_size=PAGE_SIZE, untimed=False):
+    mark = checkpoints.get(collection_name)
+
+    # No high-water mark yet → full export that replaces any old file
+    columns = None
+    seen = set()
+    if mark is not None and os.path.exists(out_csv):
+        columns = list(pd.read_csv(out_csv, nrows=0).columns)
+        seen = exported_ids(out_csv, columns, None if untimed else page_size)
+    elif mark is not None:
+        mark = None
+
+    exported = 0
+    for page in iter_pages(db, collection_name, mark, page_size, untimed):
+        df = page_to_frame(page)
+        df = df[~df["document_id"].isin(seen)]
+        if not df.empty:
+            columns = append_frame(df, out_csv, columns)
+            seen.update(df["document_id"])
+            exported += len(df)
+
+        last = page[-1]
+        if "ts" in last.to_dict():
+            checkpoints[collection_name] = encode_mark(last.to_dict()["ts"], last.id)
+            save_checkpoints(checkpoints, checkpoint_path)
+
+    return exported
+
+
+def export_all_incremental(db, collections=COLLECTIONS,
+                           checkpoint_path=CHECKPOINT_FILE, page_size=PAGE_SIZE, untimed=False):
+    checkpoints = load_checkpoints(checkpoint_path)
+    counts = {}
+    for name in collections:
+        counts[name] = export_collection_incremental(
+            db, name, f"{name}.csv", checkpoints, checkpoint_path, page_size, untimed
+        )
+        print(f"{name}: {counts[name]} new documents")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental Firestore → CSV export")
+    parser.add_argument("--untimed", action="store_true",
+                        help="also sweep for documents without ts (reads every document id, "
+                             "so run it occasionally, not on every export)")
+    args = parser.parse_args()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    # Initialize Firebase
+    cred = credentials.Certificate("serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+
+    db = firestore.client()
+
+    export_all_incremental(db, untimed=args.untimed)
+
+    print("✅ Incremental CSV export completed")
@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from phase1_feature_engineering import build_features
+from phase2_anomaly_detection import detect_anomalies
+from phase2_component_anomalies import detect_component_anomalies
+from phase3_control_logic import apply_control
+from phase3_health_score import compute_health_score
+from phase3_risk_classification import add_risk_levels
+from telemetry_schema import DEVICE_COLUMN, load_csv, save_csv
+from telemetry_store import TelemetryStore
+
+# ---------------- FLEET CONFIG ----------------
+OUTPUT_DIR = "fleet_output"
+N_WORKERS = os.cpu_count() or 1
+MIN_ROWS = 20            # fewer rows than this is too little to fit a forest
+
+
+# ---------------- OUTPUT NAMES ----------------
+# Device id → file name. Ids that sanitizing changes ("fz/1", "fz 1"), or
+# that clash with another id ignoring case (case-insensitive file
+# systems), get a short hash of the raw id appended, so no two devices
+# ever write the same file.
+def _sanitize(device):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(device))
+
+
+def output_names(devices):
+    folded = {}
+    for device in devices:
+        folded.setdefault(_sanitize(device).lower(), []).append(device)
+    names = {}
+    for group in folded.values():
+        for device in group:
+            name = _sanitize(device)
+            if len(group) > 1 or name != str(device):
+                name += "-" + hashlib.sha1(str(device).encode()).hexdigest()[:8]
+            names[device] = name
+    return names
+
+
+# ---------------- ONE FREEZER ----------------
+# phase1 → phase2 → phase3 on a single device's rows: its own features,
+# its own IsolationForest models and its own health / risk / control.
+def process_device(device, df, out_dir=OUTPUT_DIR, components=False, name=None):
+    start = time.perf_counter()
+    df = df.drop(columns=[DEVICE_COLUMN], errors="ignore")
+
+    features = build_features(df)
+    if len(features) < MIN_ROWS:
+        return {"device": device, "rows": len(features), "skipped": True, "seconds": 0.0}
+
+    scored = add_risk_levels(compute_health_score(detect_anomalies(features)))
+    scored = apply_control(scored)
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = name or output_names([device])[device]
+    save_csv(scored.assign(**{DEVICE_COLUMN: device}), os.path.join(out_dir, f"{name}.csv"))
+    if components:
+        component = detect_component_anomalies(features).assign(**{DEVICE_COLUMN: device})
+        save_csv(component, os.path.join(out_dir, f"{name}.components.csv"))
+
+    risk = scored["risk_level"].value_counts()
+    return {
+        "device": device,
+        "rows": len(scored),
+        "skipped": False,
+        "critical": int(risk.get("CRITICAL", 0)),
+        "warning": int(risk.get("WARNING", 0)),
+        "min_health": float(scored["health_score"].min()),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _process_from_store(store_root, device, out_dir, components, name):
+    df = TelemetryStore(store_root).read_frame(device)
+    return process_device(device, df, out_dir, components, name)
+
+
+# ---------------- SCHEDULING ----------------
+# Every device is its own task on a shared queue: an idle worker always
+# takes the next pending device, so a slow freezer never holds back the
+# others. Tasks are queued largest first so the long ones don't end up
+# as the tail of the run.
+def _run(tasks, n_workers):
+    results = []
+    if n_workers <= 1:
+        for func, args, _ in tasks:
+            results.append(func(*args))
+        return results
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(func, *args)
+                   for func, args, _ in sorted(tasks, key=lambda t: -t[2])]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+# Fleet from one frame with a device_id column (partitions are pickled to
+# the workers)
+def run_fleet(df, out_dir=OUTPUT_DIR, n_workers=N_WORKERS, components=False):
+    parts = list(df.groupby(DEVICE_COLUMN, observed=True, sort=False)) if DEVICE_COLUMN in df else []
+    names = output_names([device for device, _ in parts])
+    tasks = [
+        (process_device, (device, part, out_dir, components, names[device]), len(part))
+        for device, part in parts
+    ]
+    return _run(tasks, n_workers)
+
+
+# Fleet from the telemetry store: workers read their own device's columns
+# from the memory-mapped segments, nothing large crosses processes
+def run_fleet_from_store(store_root, out_dir=OUTPUT_DIR, n_workers=N_WORKERS, components=False):
+    store = TelemetryStore(store_root)
+    devices = store.devices()
+    names = output_names(devices)
+    tasks = []
+    for device in devices:
+        rows = store.row_count(device)
+        tasks.append((_process_from_store, (store_root, device, out_dir, components, names[device]), rows))
+    return _run(tasks, n_workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run phase1 → phase3 per freezer")
+    parser.add_argument("--input", default="fleet_telemetry.csv",
+                        help="CSV with a device_id column")
+    parser.add_argument("--store", help="telemetry store root (instead of --input)")
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    parser.add_argument("--components", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.store:
+        results = run_fleet_from_store(args.store, n_workers=args.workers, components=args.components)
+    else:
+        results = run_fleet(load_csv(args.input), n_workers=args.workers, components=args.components)
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print(f"⚠️ No devices found in {args.store or args.input} (needs a {DEVICE_COLUMN} column)")
+        raise SystemExit(1)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    summary = pd.DataFrame(results).sort_values("device")
+    save_csv(summary, os.path.join(OUTPUT_DIR, "fleet_summary.csv"))
+
+    skipped = int(summary["skipped"].sum())
+    print(f"✅ {len(summary) - skipped} freezers processed ({skipped} skipped) "
+          f"in {elapsed:.2f}s with {args.workers} workers")
+    print(f"📁 Output folder: {OUTPUT_DIR}/")
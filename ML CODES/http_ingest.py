@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+
+import pandas as pd
+
+from mqtt_ingest import RECORD_COLUMNS, TOPIC_FIELDS, CsvSink, StoreSink, records_frame
+from telemetry_frames import decode_batch, frames_to_frame
+from telemetry_schema import DEVICE_COLUMN, save_csv
+from telemetry_store import DEFAULT_DEVICE
+
+# ---------------- SERVER CONFIG ----------------
+HOST = "0.0.0.0"
+PORT = 1880              # Node-RED's port, so the sketches only change host
+
+OUTPUT_FILE = "telemetry_http.csv"
+ALERT_FILE = "alerts_http.csv"
+
+BATCH_ROWS = 2000        # samples per write ...
+BATCH_INTERVAL_S = 1.0   # ... or whatever is pending after this long
+MAX_PENDING_ROWS = 200_000   # beyond this, requests get 503 + Retry-After
+MAX_BODY_BYTES = 8 << 20
+KEEPALIVE_S = 30         # idle keep-alive connections are closed after this
+
+# Accepted `ts` window: from 2000-01-01 up to a day ahead of the server
+# clock (device clocks drift; anything outside is a bad value, not a sample)
+MIN_TS_S = 946_684_800
+MAX_FUTURE_S = 86_400
+
+# Body keys = the firmware's uploadData() JSON (same names as the MQTT
+# topics), plus an optional device id and epoch-ms timestamp
+REQUIRED_FIELDS = {"temp", "humidity", "door", "vibration", "power"}
+SAMPLE_FIELDS = set(TOPIC_FIELDS)
+META_FIELDS = {"device", "ts"}
+ALERT_FIELDS = {"alert", "temp", "door", "device", "ts"}
+
+
+# ---------------- VALIDATION ----------------
+# A body is one object (what the firmware sends today) or an array of them.
+# Invalid items are reported by index; the valid ones are still accepted.
+def _number(value):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+def _meta(item, received):
+    device = item.get("device", DEFAULT_DEVICE)
+    if not isinstance(device, str) or not device:
+        return None, "device must be a non-empty string"
+    ts = item.get("ts")
+    if ts is None:
+        return (device, received), None
+    if not _number(ts):
+        return None, "ts must be epoch milliseconds"
+    if not MIN_TS_S <= ts / 1000 <= received + MAX_FUTURE_S:
+        return None, "ts out of range (epoch milliseconds from 2000 to now + 1 day)"
+    return (device, ts / 1000), None
+
+
+def validate_sample(item, received):
+    if not isinstance(item, dict):
+        return None, "expected a JSON object"
+    unknown = item.keys() - SAMPLE_FIELDS - META_FIELDS
+    if unknown:
+        return None, f"unknown fields {sorted(unknown)}"
+    missing = REQUIRED_FIELDS - item.keys()
+    if missing:
+        return None, f"missing fields {sorted(missing)}"
+    meta, error = _meta(item, received)
+    if error:
+        return None, error
+
+    values = {}
+    for field in SAMPLE_FIELDS & item.keys():
+        if not _number(item[field]):
+            return None, f"{field} must be a finite number"
+        values[TOPIC_FIELDS[field]] = item[field]
+    return (meta[0], meta[1], values), None
+
+
+def validate_alert(item, received):
+    if not isinstance(item, dict):
+        return None, "expected a JSON object"
+    unknown = item.keys() - ALERT_FIELDS
+    if unknown:
+        return None, f"unknown fields {sorted(unknown)}"
+    if not isinstance(item.get("alert"), str):
+        return None, "alert must be a string"
+    for field in ("temp", "door"):
+        if field in item and not _number(item[field]):
+            return None, f"{field} must be a finite number"
+    meta, error = _meta(item, received)
+    if error:
+        return None, error
+    return {"ts": meta[1], DEVICE_COLUMN: meta[0], "alert": item["alert"],
+            "temperature": item.get("temp"), "door_status": item.get("door")}, None
+
+
+def validate_body(body, validator, received):
+    items = body if isinstance(body, list) else [body]
+    accepted, rejected = [], []
+    for i, item in enumerate(items):
+        value, error = validator(item, received)
+        if error:
+            rejected.append({"index": i, "error": error})
+        else:
+            accepted.append(value)
+    return accepted, rejected
+
+
+# ---------------- INGEST SERVICE ----------------
+# Requests are acknowledged once validated and buffered in memory; one
+# writer task flushes micro-batches to the sink from a worker thread, so a
+# slow disk never holds up a response. A batch whose write fails goes back
+# to the front of the buffer and is retried with the next flush (disk full,
+# file locked, ...; data the sink rejects is dropped and counted); a full
+# buffer answers 503 and the sender retries later instead of the server
+# growing without bound.
+class HttpIngest:
+
+    def __init__(self, sink, alert_path=ALERT_FILE, batch_rows=BATCH_ROWS,
+                 batch_interval=BATCH_INTERVAL_S, max_pending=MAX_PENDING_ROWS):
+        self.sink = sink
+        self.alert_path = alert_path
+        self.batch_rows = batch_rows
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        self.records = []       # (device, epoch s, {column: value}) from JSON
+        self.frames = []        # DataFrames from binary frame batches
+        self.frame_rows = 0
+        self.alerts = []
+        self._due = asyncio.Event()
+        self.stats = {"requests": 0, "samples": 0, "rejected": 0, "alerts": 0,
+                      "written": 0, "failed": 0, "dropped": 0, "batches": 0, "busy": 0}
+
+    def pending_rows(self):
+        return len(self.records) + self.frame_rows
+
+    # ---------- routes ----------
+    def upload(self, body, content_type):
+        received = time.time()
+        if content_type == "application/octet-stream":
+            try:
+                df = frames_to_frame(decode_batch(body), received)
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            self.frames.append(df)
+            self.frame_rows += len(df)
+            accepted, rejected = len(df), []
+        else:
+            try:
+                parsed = json.loads(body)
+            except ValueError:
+                return 400, {"error": "body is not valid JSON"}
+            records, rejected = validate_body(parsed, validate_sample, received)
+            self.records.extend(records)
+            accepted = len(records)
+
+        self.stats["samples"] += accepted
+        self.stats["rejected"] += len(rejected)
+        if self.pending_rows() >= self.batch_rows:
+            self._due.set()
+        status = 200 if accepted or not rejected else 422
+        return status, {"accepted": accepted, "rejected": rejected}
+
+    def alert(self, body):
+        try:
+            parsed = json.loads(body)
+        except ValueError:
+            return 400, {"error": "body is not valid JSON"}
+        alerts, rejected = validate_body(parsed, validate_alert, time.time())
+        self.alerts.extend(alerts)
+        self.stats["alerts"] += len(alerts)
+        self.stats["rejected"] += len(rejected)
+        # alerts are rare and urgent: write them with the next flush tick
+        self._due.set()
+        return (200 if alerts or not rejected else 422), {"accepted": len(alerts), "rejected": rejected}
+
+    def route(self, method, path, body, content_type):
+        self.stats["requests"] += 1
+        if method == "GET" and path == "/health":
+            return 200, {**self.stats, "pending": self.pending_rows()}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        if path not in ("/uploadData", "/alert"):
+            return 404, {"error": f"no route {path}"}
+        if self.pending_rows() >= self.max_pending:
+            self.stats["busy"] += 1
+            return 503, {"error": "ingest buffer full, retry later"}
+        if path == "/alert":
+            return self.alert(body)
+        return self.upload(body, content_type)
+
+    # ---------- writer ----------
+    def _write(self, records, frames, alerts):
+        parts = [records_frame(records)] if records else []
+        parts += [df[["ts", DEVICE_COLUMN] + RECORD_COLUMNS] for df in frames]
+        if parts:
+            df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+            df[DEVICE_COLUMN] = df[DEVICE_COLUMN].astype(str)
+            self.sink.write(df.astype({c: "float32" for c in RECORD_COLUMNS}))
+        if alerts:
+            df = pd.DataFrame(alerts)
+            df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+            save_csv(df, self.alert_path, append=os.path.exists(self.alert_path))
+
+    async def flush(self):
+        records, frames, alerts = self.records, self.frames, self.alerts
+        self.records, self.frames, self.alerts, self.frame_rows = [], [], [], 0
+        rows = len(records) + sum(len(df) for df in frames)
+        if not rows and not alerts:
+            return
+        try:
+            await asyncio.to_thread(self._write, records, frames, alerts)
+        except ValueError as e:
+            # the data itself can't be written: retrying would fail forever
+            self.stats["dropped"] += rows
+            print(f"⚠️ Dropped {rows} samples: {e}")
+            return
+        except OSError as e:
+            # already acknowledged: keep them, in order, ahead of newer rows
+            self.records = records + self.records
+            self.frames = frames + self.frames
+            self.alerts = alerts + self.alerts
+            self.frame_rows += sum(len(df) for df in frames)
+            self.stats["failed"] += 1
+            print(f"⚠️ Write failed, {rows} samples kept for retry: {e}")
+            return
+        except Exception as e:
+            # a bug, not bad input: drop loudly but keep the writer alive
+            self.stats["dropped"] += rows
+            print(f"⚠️ Dropped {rows} samples on unexpected {type(e).__name__}: {e}")
+            return
+        self.stats["written"] += rows
+        self.stats["batches"] += 1
+
+    async def writer(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._due.wait(), self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._due.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Flush failed: {type(e).__name__}: {e}")
+
+
+# ---------------- HTTP/1.1 ----------------
+# Just enough HTTP for the sketches' HTTPClient and bulk senders:
+# Content-Length bodies, keep-alive by default (HTTP/1.1), JSON replies.
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 503: "Service Unavailable"}
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+    if status == 503:
+        head += "Retry-After: 1\r\n"
+    return head.encode() + b"\r\n" + body
+
+
+async def handle_connection(ingest, reader, writer):
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_S)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, path, version = lines[0].split(" ", 2)
+            except ValueError:
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            length = headers.get("content-length") or "0"
+            if not (length.isascii() and length.isdigit()):
+                # body framing unknown: answer and drop the connection
+                writer.write(_response(400, {"error": "invalid Content-Length"}, False))
+                await writer.drain()
+                return
+            length = int(length)
+            if length > MAX_BODY_BYTES:
+                writer.write(_response(413, {"error": "body too large"}, False))
+                await writer.drain()
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            content_type = headers.get("content-type", "").split(";")[0].strip()
+            status, payload = ingest.route(method, path.split("?")[0], body, content_type)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(ingest, host=HOST, port=PORT, stop=None):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(ingest, r, w), host, port)
+    writer = asyncio.create_task(ingest.writer())
+    print(f"✅ Ingest listening on http://{host}:{port} (/uploadData, /alert, /health)")
+    try:
+        async with server:
+            await (stop.wait() if stop else server.serve_forever())
+    finally:
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        await ingest.flush()
+    return ingest.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk HTTP ingest for /uploadData and /alert")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--output", default=OUTPUT_FILE, help="CSV to append samples to")
+    parser.add_argument("--store", help="write to this telemetry store instead of CSV")
+    parser.add_argument("--alerts", default=ALERT_FILE)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    sink = StoreSink(args.store) if args.store else CsvSink(args.output)
+
+    async def main():
+        ingest = HttpIngest(sink, args.alerts, args.batch_rows)
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        return await serve(ingest, args.host, args.port, stop)
+
+    stats = asyncio.run(main())
+    print(f"✅ {stats['requests']} requests, {stats['written']} samples written in "
+          f"{stats['batches']} batches ({stats['rejected']} rejected, {stats['busy']} busy)")
+    print(f"📁 Output: {args.store or args.output}, alerts: {args.alerts}")
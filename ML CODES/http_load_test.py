@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from synthetic_telemetry import generate_rows
+from telemetry_frames import decode_batch, encode_batch, firmware_payloads
+
+# ---------------- LOAD TEST CONFIG ----------------
+URL = "http://127.0.0.1:1880"
+DURATION_S = 10.0
+CONNECTIONS = 8
+BATCH = 200              # samples per request in the batched modes
+SAMPLES = 20_000         # distinct bodies cycled through
+
+# firmware  what the sketches do today: new connection + one JSON sample
+#           per POST (HTTPClient begin / POST / end)
+# single    same body over keep-alive connections
+# batch     JSON array of BATCH samples per POST, keep-alive
+# frames    BATCH binary frames (telemetry_frames) per POST, keep-alive
+MODES = ["firmware", "single", "batch", "frames"]
+
+
+# ---------------- CLIENT ----------------
+async def _post(reader, writer, host, path, body, content_type, keep_alive):
+    writer.write(
+        (f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+         f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+         f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return status
+
+
+def _requests(mode, bodies, frames):
+    if mode in ("firmware", "single"):
+        return [(body, "application/json", 1) for body in bodies]
+    if mode == "batch":
+        return [(b"[" + b",".join(bodies[i:i + BATCH]) + b"]", "application/json",
+                 len(bodies[i:i + BATCH])) for i in range(0, len(bodies), BATCH)]
+    return [(frames[i:i + BATCH].tobytes(), "application/octet-stream",
+             len(frames[i:i + BATCH])) for i in range(0, len(frames), BATCH)]
+
+
+async def _client(mode, url, requests, offset, deadline, counts):
+    keep_alive = mode != "firmware"
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < deadline:
+        body, content_type, n = requests[i % len(requests)]
+        i += 1
+        if writer is None:
+            reader, writer = await asyncio.open_connection(url.hostname, url.port)
+        status = await _post(reader, writer, url.netloc, "/uploadData", body, content_type, keep_alive)
+        if status == 200:
+            counts["samples"] += n
+        else:
+            counts["errors"] += 1
+        counts["requests"] += 1
+        if not keep_alive:
+            writer.close()
+            await writer.wait_closed()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_mode(mode, url, bodies, frames, duration=DURATION_S, connections=CONNECTIONS):
+    requests = _requests(mode, bodies, frames)
+    counts = {"samples": 0, "requests": 0, "errors": 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[
+        _client(mode, url, requests, c * len(requests) // connections, deadline, counts)
+        for c in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+    return {"mode": mode, **counts,
+            "samples_per_s": counts["samples"] / elapsed,
+            "requests_per_s": counts["requests"] / elapsed}
+
+
+# ---------------- LOCAL SERVER ----------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(out_dir):
+    port = _free_port()
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.Popen([
+        sys.executable, os.path.join(here, "http_ingest.py"), "--host", "127.0.0.1",
+        "--port", str(port), "--output", os.path.join(out_dir, "telemetry_http.csv"),
+        "--alerts", os.path.join(out_dir, "alerts_http.csv"),
+    ])
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("ingest server did not start")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the HTTP ingest service")
+    parser.add_argument("--url", help=f"running server (default: spawn one locally, like {URL})")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--duration", type=float, default=DURATION_S, help="seconds per mode")
+    parser.add_argument("--connections", type=int, default=CONNECTIONS)
+    args = parser.parse_args()
+
+    frames = decode_batch(encode_batch(generate_rows(SAMPLES)))
+    bodies, _ = firmware_payloads(frames)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        proc = None
+        url = args.url
+        if url is None:
+            proc, url = spawn_server(out_dir)
+        try:
+            results = [asyncio.run(run_mode(mode, urlparse(url), bodies, frames,
+                                            args.duration, args.connections))
+                       for mode in args.modes]
+        finally:
+            if proc is not None:
+                proc.send_signal(signal.SIGINT)
+                proc.wait()
+
+    baseline = next((r["samples_per_s"] for r in results if r["mode"] == "firmware"), None)
+    print(f"\n{'mode':<10} {'requests/s':>11} {'samples/s':>11} {'errors':>7} {'vs firmware':>12}")
+    for r in results:
+        ratio = f"{r['samples_per_s'] / baseline:.1f}×" if baseline else "-"
+        print(f"{r['mode']:<10} {r['requests_per_s']:>11,.0f} {r['samples_per_s']:>11,.0f} "
+              f"{r['errors']:>7} {ratio:>12}")
+    print(f"✅ {args.connections} connections × {args.duration:.0f}s per mode against {url}")
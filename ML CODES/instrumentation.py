@@ -0,0 +1,246 @@
+import contextvars
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ---------------- INSTRUMENTATION CONFIG ----------------
+# Environment overrides, so the phase scripts need no extra arguments:
+#   FREEZER_METRICS=0               switch recording off
+#   FREEZER_METRICS_DIR=metrics     where JSON lines / .prom / .prof go
+#   FREEZER_PROFILE_STAGE=anomalies run that one stage under cProfile
+ENABLED = os.environ.get("FREEZER_METRICS", "1") != "0"
+METRICS_DIR = os.environ.get("FREEZER_METRICS_DIR", "metrics")
+PROFILE_STAGE = os.environ.get("FREEZER_PROFILE_STAGE")
+
+JSONL_FILE = "stage_metrics.jsonl"
+RSS_INTERVAL_S = 0.005
+PROFILE_TOP = 15         # functions printed from a cProfile dump
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+
+# ---------------- PEAK RSS ----------------
+# One sampler thread per process reads /proc/self/statm while any stage or
+# step is open and raises the peak of every open block, so nested steps
+# cost no extra threads. Without /proc (macOS) only the process high-water
+# mark from getrusage is known.
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def max_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE / 2**20
+    except OSError:
+        return max_rss_mb()
+
+
+class _RSSSampler:
+
+    def __init__(self):
+        self._reset()
+
+    # also after a fork: the child has the parent's state but not its thread
+    def _reset(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.open = set()
+        self.thread = None
+
+    def add(self, block):
+        if self.pid != os.getpid():
+            self._reset()
+        with self.lock:
+            self.open.add(block)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+                self.thread.start()
+
+    def remove(self, block):
+        with self.lock:
+            self.open.discard(block)
+
+    # exits once nothing is open; add() starts a new one when needed
+    def _sample(self):
+        while True:
+            time.sleep(RSS_INTERVAL_S)
+            rss = current_rss_mb()
+            with self.lock:
+                if not self.open:
+                    self.thread = None
+                    return
+                for block in self.open:
+                    block.peak = max(block.peak, rss)
+
+
+_sampler = _RSSSampler()
+
+
+class PeakRSS:
+
+    def __enter__(self):
+        self.start = current_rss_mb()
+        self.peak = self.start
+        _sampler.add(self)
+        return self
+
+    def __exit__(self, *exc):
+        _sampler.remove(self)
+        self.peak = max(self.peak, current_rss_mb())
+        return False
+
+
+# ---------------- RECORDS ----------------
+# A stage is one phase (features, anomalies, ...); steps are named blocks
+# inside it ("load_csv", "fit", "load_csv/parse_ts" when nested). Steps
+# outside a stage are not recorded, so library calls stay free when
+# nobody is measuring.
+_current = contextvars.ContextVar("instrumentation_current", default=None)
+
+
+class Record:
+
+    def __init__(self, stage, step=None, rows_in=None):
+        self.stage = stage
+        self.step = step
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def as_dict(self):
+        return {
+            "run_id": RUN_ID,
+            "pid": os.getpid(),
+            "timestamp": self.timestamp,
+            "stage": self.stage,
+            "step": self.step,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rss_start_mb": round(self.rss_start_mb, 1),
+            "rss_peak_mb": round(self.rss_peak_mb, 1),
+        }
+
+
+# Finished records of this process, per stage (for the .prom file)
+_finished = {}
+
+
+@contextmanager
+def _measure(record):
+    token = _current.set(record)
+    record.timestamp = time.time()
+    try:
+        with PeakRSS() as rss:
+            cpu = time.process_time()
+            start = time.perf_counter()
+            try:
+                yield record
+            finally:
+                record.wall_seconds = time.perf_counter() - start
+                record.cpu_seconds = time.process_time() - cpu
+        record.rss_start_mb = rss.start
+        record.rss_peak_mb = rss.peak
+    finally:
+        _current.reset(token)
+    _finished.setdefault(record.stage, []).append(record)
+    _write_jsonl(record)
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    if not ENABLED:
+        yield Record(name, rows_in=rows_in)
+        return
+
+    record = Record(name, rows_in=rows_in)
+    _finished.pop(name, None)
+
+    profiler = cProfile.Profile() if PROFILE_STAGE == name else None
+    with _measure(record):
+        if profiler is None:
+            yield record
+        else:
+            profiler.enable()
+            try:
+                yield record
+            finally:
+                profiler.disable()
+
+    write_prometheus(name)
+    if profiler is not None:
+        _dump_profile(name, profiler)
+
+
+@contextmanager
+def step(name, rows_in=None):
+    parent = _current.get() if ENABLED else None
+    if parent is None:
+        yield None
+        return
+
+    path = name if parent.step is None else f"{parent.step}/{name}"
+    with _measure(Record(parent.stage, path, rows_in)) as record:
+        yield record
+
+
+# ---------------- EXPORT ----------------
+def _write_jsonl(record):
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, JSONL_FILE), "a") as f:
+        f.write(json.dumps(record.as_dict()) + "\n")
+
+
+PROM_METRICS = [
+    ("wall_seconds", "freezer_stage_wall_seconds", "Wall-clock time of the last run"),
+    ("cpu_seconds", "freezer_stage_cpu_seconds", "Process CPU time of the last run"),
+    ("rows_in", "freezer_stage_rows_in", "Rows entering the stage or step"),
+    ("rows_out", "freezer_stage_rows_out", "Rows leaving the stage or step"),
+    ("rss_peak_mb", "freezer_stage_peak_rss_megabytes", "Peak resident memory during the run"),
+    ("timestamp", "freezer_stage_last_run_timestamp_seconds", "Unix time the last run started"),
+]
+
+
+# One textfile per stage (node_exporter textfile collector reads every
+# *.prom in the directory), written atomically so a scrape never sees half
+# a file. step="" is the stage itself.
+def write_prometheus(name):
+    # a step run twice in one stage keeps its last run
+    records = {record.step: record for record in _finished.get(name, [])}.values()
+    lines = []
+    for attr, metric, help_text in PROM_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for record in records:
+            value = getattr(record, attr)
+            if value is None:
+                continue
+            labels = f'stage="{record.stage}",step="{record.step or ""}"'
+            lines.append(f"{metric}{{{labels}}} {value}")
+
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"freezer_{name}.prom")
+    with open(path + ".tmp", "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def _dump_profile(name, profiler):
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{name}.prof")
+    profiler.dump_stats(path)
+    print(f"📁 cProfile dump: {path} (top {PROFILE_TOP} by cumulative time)")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import IsolationForest
+
+from phase2_anomaly_detection import features as ANOMALY_FEATURES
+from phase2_component_anomalies import COMPONENTS
+from telemetry_schema import load_csv, save_csv
+
+# ---------------- REGISTRY CONFIG ----------------
+REGISTRY_DIR = "models"
+
+DEFAULT_PARAMS = {"n_estimators": 100, "contamination": 0.05, "random_state": 42}
+
+# Model name → features. "anomaly" is the phase2 whole-system model, the
+# others are the phase2 component models (name = output column).
+MODEL_FEATURES = {"anomaly": ANOMALY_FEATURES, **COMPONENTS}
+
+
+# ---------------- LAYOUT ----------------
+# models/<name>/v0001/model.joblib   fitted IsolationForest (uncompressed:
+#                                    no decompression on load)
+# models/<name>/v0001/meta.json      features, training window, params
+# models/<name>/LATEST               version used when none is given
+def _model_dir(name, registry):
+    return os.path.join(registry, name)
+
+
+def list_versions(name, registry=REGISTRY_DIR):
+    path = _model_dir(name, registry)
+    if not os.path.isdir(path):
+        return []
+    return sorted((v for v in os.listdir(path) if v[:1] == "v" and v[1:].isdigit()),
+                  key=lambda v: int(v[1:]))
+
+
+def latest_version(name, registry=REGISTRY_DIR):
+    path = os.path.join(_model_dir(name, registry), "LATEST")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no fitted model '{name}' in {registry}/ (run: fit)")
+    with open(path) as f:
+        return f.read().strip()
+
+
+# ---------------- FIT ----------------
+def _utc(value):
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def fit_model(df, name, params=None, registry=REGISTRY_DIR, start=None, end=None):
+    features = MODEL_FEATURES[name]
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    if start is not None:
+        df = df[df["ts"] >= _utc(start)]
+    if end is not None:
+        df = df[df["ts"] < _utc(end)]
+    if df.empty:
+        raise ValueError(f"no rows in training window for '{name}'")
+
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32))
+
+    started = time.perf_counter()
+    model = IsolationForest(**params).fit(X)
+    fit_seconds = time.perf_counter() - started
+
+    # one past the highest existing version, even if older ones were deleted
+    versions = list_versions(name, registry)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+    version_dir = os.path.join(_model_dir(name, registry), version)
+    os.makedirs(version_dir)
+
+    joblib.dump(model, os.path.join(version_dir, "model.joblib"))
+    meta = {
+        "name": name,
+        "version": version,
+        "features": features,
+        "params": params,
+        "train_rows": len(df),
+        "train_start": df["ts"].min().isoformat(),
+        "train_end": df["ts"].max().isoformat(),
+        "fit_seconds": round(fit_seconds, 3),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "sklearn_version": sklearn.__version__,
+    }
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Switch LATEST only after the version is complete
+    latest = os.path.join(_model_dir(name, registry), "LATEST")
+    with open(latest + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(latest + ".tmp", latest)
+    return meta
+
+
+# ---------------- LOAD ----------------
+# Loaded models are kept per process, so repeated scoring calls pay the
+# load once.
+_loaded = {}
+
+
+def load_model(name, version=None, registry=REGISTRY_DIR):
+    version = version or latest_version(name, registry)
+    key = (registry, name, version)
+    if key not in _loaded:
+        version_dir = os.path.join(_model_dir(name, registry), version)
+        model = joblib.load(os.path.join(version_dir, "model.joblib"))
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            meta = json.load(f)
+        _loaded[key] = (model, meta)
+    return _loaded[key]
+
+
+# ---------------- SCORE ----------------
+# decision_function only, no refit: the same rows always get the same
+# score for a given model version. IsolationForest.predict() is -1 where
+# the decision function is below 0, so labels are derived from the score.
+def score_model(df, name, version=None, registry=REGISTRY_DIR):
+    model, meta = load_model(name, version, registry)
+    X = np.ascontiguousarray(df[meta["features"]].to_numpy(dtype=np.float32))
+    score = model.decision_function(X)
+    anomaly = np.where(score < 0, -1, 1).astype(np.int8)
+    label = pd.Categorical.from_codes((anomaly == -1).astype(np.int8),
+                                      categories=["Normal", "Anomaly"])
+
+    df = df.copy()
+    if name == "anomaly":
+        df["anomaly"] = anomaly
+        df["anomaly_score"] = score.astype(np.float32)
+        df["anomaly_label"] = label
+    else:
+        df[name] = label
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit once, score many: IsolationForest registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit_cmd = sub.add_parser("fit")
+    fit_cmd.add_argument("--input", default="ml_dataset.csv")
+    fit_cmd.add_argument("--models", nargs="*", default=list(MODEL_FEATURES), choices=list(MODEL_FEATURES))
+    fit_cmd.add_argument("--start", help="training window start (UTC)")
+    fit_cmd.add_argument("--end", help="training window end (UTC, exclusive)")
+
+    score_cmd = sub.add_parser("score")
+    score_cmd.add_argument("--input", default="ml_dataset.csv")
+    score_cmd.add_argument("--output", default="ml_dataset_with_anomalies.csv")
+    score_cmd.add_argument("--models", nargs="*", default=["anomaly"], choices=list(MODEL_FEATURES))
+    score_cmd.add_argument("--version", help="model version (default: LATEST)")
+
+    sub.add_parser("list")
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        df = load_csv(args.input)
+        for name in args.models:
+            meta = fit_model(df, name, start=args.start, end=args.end)
+            print(f"{name} {meta['version']}: {meta['train_rows']} rows, {meta['fit_seconds']}s")
+        print("✅ Models registered")
+
+    elif args.command == "score":
+        df = load_csv(args.input)
+        start = time.perf_counter()
+        for name in args.models:
+            df = score_model(df, name, args.version)
+        elapsed = time.perf_counter() - start
+        save_csv(df, args.output)
+        print(f"✅ Scored {len(df)} rows in {elapsed * 1000:.1f} ms → {args.output}")
+
+    else:
+        for name in MODEL_FEATURES:
+            for version in list_versions(name):
+                _, meta = load_model(name, version)
+                print(f"{name} {version}: {meta['train_start']} → {meta['train_end']} ({meta['train_rows']} rows)")
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import os
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+
+from telemetry_schema import DEVICE_COLUMN, save_csv
+from telemetry_store import DEFAULT_DEVICE, STORE_ROOT, TelemetryStore
+
+# ---------------- MQTT CONFIG ----------------
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+MQTT_TOPICS = ["freezer/#"]
+
+OUTPUT_FILE = "telemetry_mqtt.csv"
+
+QUEUE_SIZE = 10_000      # raw messages buffered before the broker is throttled
+BATCH_ROWS = 500         # records per write ...
+BATCH_INTERVAL_S = 5.0   # ... or whatever is pending after this long
+TICK_WINDOW_S = 1.0      # all publishes of one tick arrive within this long
+
+# Firmware topic → telemetry column. The sketches publish one String value
+# per topic every SEND_INTERVAL, temp first:
+#   freezer/<field>            single freezer (DEFAULT_DEVICE)
+#   freezer/<device>/<field>   several freezers on one broker
+TOPIC_FIELDS = {
+    "temp": "temperature",
+    "humidity": "humidity",
+    "door": "door_status",
+    "vibration": "vibration",
+    "current": "current",
+    "power": "power_watts",
+    "high_pressure": "pressure",
+    "low_pressure": "low_pressure",
+    "inventory": "inventory",
+}
+
+# The sketches publish this topic first in every tick
+FIRST_COLUMN = TOPIC_FIELDS["temp"]
+
+# Every record has every column (NaN when a sketch doesn't publish it), so
+# CSV headers and store indexes stay the same from batch to batch
+RECORD_COLUMNS = list(TOPIC_FIELDS.values())
+
+
+# ---------------- TICK ASSEMBLY ----------------
+# One open record per device. The sketches publish every topic back to
+# back, freezer/temp first, once per SEND_INTERVAL (5 s), so a record is
+# closed when
+#   - freezer/temp arrives (the next tick has started), or
+#   - a value arrives more than TICK_WINDOW_S after the record's first one
+#     (temp of the next tick was lost), or
+#   - the sweep finds it older than TICK_WINDOW_S.
+# Nothing is learned from earlier ticks, so a lost publish only leaves a
+# gap in its own record. A value repeated inside the window (e.g. the
+# camera scripts publishing freezer/inventory on their own schedule)
+# replaces the earlier one; outside any window it becomes its own record.
+class TickAssembler:
+
+    def __init__(self, window=TICK_WINDOW_S, first_column=FIRST_COLUMN):
+        self.window = window
+        self.first_column = first_column
+        self.open = {}          # device → (first arrival, {column: value})
+
+    def add(self, device, column, value, received):
+        closed = None
+        current = self.open.get(device)
+        if current is not None and (column == self.first_column
+                                    or received - current[0] > self.window):
+            closed = self._close(device)
+            current = None
+        if current is None:
+            current = (received, {})
+            self.open[device] = current
+        current[1][column] = value
+        return closed
+
+    def _close(self, device):
+        received, values = self.open.pop(device)
+        return device, received, values
+
+    def expire(self, now):
+        stale = [d for d, (received, _) in self.open.items() if now - received > self.window]
+        return [self._close(d) for d in stale]
+
+    def close_all(self):
+        return [self._close(d) for d in list(self.open)]
+
+
+def parse_topic(topic):
+    parts = topic.split("/")
+    if len(parts) == 2:
+        device, field = DEFAULT_DEVICE, parts[1]
+    elif len(parts) == 3:
+        device, field = parts[1], parts[2]
+    else:
+        return None
+    column = TOPIC_FIELDS.get(field)
+    return None if column is None else (device, column)
+
+
+def records_frame(records):
+    values = np.full((len(records), len(RECORD_COLUMNS)), np.nan, dtype=np.float32)
+    slot = {c: i for i, c in enumerate(RECORD_COLUMNS)}
+    for row, (_, _, fields) in enumerate(records):
+        for column, value in fields.items():
+            values[row, slot[column]] = value
+
+    df = pd.DataFrame(values, columns=RECORD_COLUMNS)
+    df.insert(0, "ts", pd.to_datetime(np.array([r[1] for r in records]), unit="s", utc=True))
+    df.insert(1, DEVICE_COLUMN, [r[0] for r in records])
+    return df
+
+
+# ---------------- SINKS ----------------
+# Called from a worker thread with one micro-batch, so disk I/O never
+# stalls the event loop.
+class CsvSink:
+
+    def __init__(self, path=OUTPUT_FILE):
+        self.path = path
+
+    def write(self, df):
+        save_csv(df, self.path, append=os.path.exists(self.path))
+
+
+class StoreSink:
+
+    def __init__(self, root=STORE_ROOT):
+        self.store = TelemetryStore(root)
+
+    def write(self, df):
+        for device, rows in df.groupby(DEVICE_COLUMN, sort=False):
+            self.store.append(device, rows.drop(columns=DEVICE_COLUMN).sort_values("ts"))
+
+
+# ---------------- INGEST SERVICE ----------------
+# Transports call `await ingest.feed(topic, payload)`. The queue is
+# bounded: when the writer falls behind, feed() waits, which stalls the
+# MQTT network thread and lets TCP flow control throttle the broker
+# instead of growing memory. A batch the sink fails to write (OSError:
+# disk full, file locked) goes back to the front of `pending` and is
+# retried; once `pending` holds queue_size records the consumer stops
+# taking messages until a write succeeds, so the same back-pressure
+# applies. Data the sink rejects (ValueError) is dropped and counted.
+class MqttIngest:
+
+    def __init__(self, sink, queue_size=QUEUE_SIZE, batch_rows=BATCH_ROWS,
+                 batch_interval=BATCH_INTERVAL_S, tick_window=TICK_WINDOW_S):
+        self.sink = sink
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.max_pending = queue_size
+        self.batch_rows = batch_rows
+        self.batch_interval = batch_interval
+        self.ticks = TickAssembler(tick_window)
+        self.pending = []
+        self.last_flush = time.monotonic()
+        self._write_lock = asyncio.Lock()
+        self.stats = {"messages": 0, "rejected": 0, "records": 0, "written": 0,
+                      "failed": 0, "dropped": 0, "errors": 0, "batches": 0, "queue_peak": 0}
+
+    async def feed(self, topic, payload, received=None):
+        await self.queue.put((topic, payload, time.time() if received is None else received))
+        self.stats["queue_peak"] = max(self.stats["queue_peak"], self.queue.qsize())
+
+    def _handle(self, topic, payload, received):
+        self.stats["messages"] += 1
+        target = parse_topic(topic)
+        try:
+            value = float(payload)
+        except (TypeError, ValueError):
+            target = None
+        if target is None:
+            self.stats["rejected"] += 1
+            return
+        closed = self.ticks.add(*target, value, received)
+        if closed is not None:
+            self._add_records([closed])
+
+    def _add_records(self, records):
+        self.pending.extend(records)
+        self.stats["records"] += len(records)
+
+    async def _flush(self):
+        async with self._write_lock:
+            batch, self.pending = self.pending, []
+            self.last_flush = time.monotonic()
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(self.sink.write, records_frame(batch))
+            except OSError as e:
+                # retried with the next flush, ahead of newer records
+                self.pending = batch + self.pending
+                self.stats["failed"] += 1
+                print(f"⚠️ Write failed, {len(batch)} records kept for retry: {e}")
+                return
+            except Exception as e:
+                # bad data (ValueError) or a bug: retrying would fail forever
+                self.stats["dropped"] += len(batch)
+                print(f"⚠️ Dropped {len(batch)} records: {type(e).__name__}: {e}")
+                return
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    # Keeps consuming whatever goes wrong: a dead consumer would leave
+    # feed() blocked on the full queue for good
+    async def _consume(self):
+        while True:
+            if len(self.pending) >= self.max_pending:
+                # writes are failing: hold the queue (and the broker) until one succeeds
+                await self._flush()
+                if len(self.pending) >= self.max_pending:
+                    await asyncio.sleep(self.batch_interval)
+                continue
+            message = await self.queue.get()
+            try:
+                self._handle(*message)
+                # drain whatever is already queued before yielding again
+                while not self.queue.empty() and len(self.pending) < self.max_pending:
+                    self._handle(*self.queue.get_nowait())
+                if len(self.pending) >= self.batch_rows:
+                    await self._flush()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️ Ingest error: {type(e).__name__}: {e}")
+
+    # Closes stale ticks and writes partial batches on time
+    async def _sweep(self):
+        interval = min(self.ticks.window, self.batch_interval) / 2
+        while True:
+            await asyncio.sleep(interval)
+            self._add_records(self.ticks.expire(time.time()))
+            if self.pending and time.monotonic() - self.last_flush >= self.batch_interval:
+                await self._flush()
+
+    async def run(self, stop):
+        tasks = [asyncio.create_task(self._consume()), asyncio.create_task(self._sweep())]
+        try:
+            await stop.wait()
+        finally:
+            # a batch already handed to the sink finishes before shutdown
+            async with self._write_lock:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            while not self.queue.empty():
+                self._handle(*self.queue.get_nowait())
+            self._add_records(self.ticks.close_all())
+            await self._flush()
+        return self.stats
+
+
+# ---------------- TRANSPORTS ----------------
+# paho-mqtt runs its network loop on its own thread; each message is
+# handed to the event loop and the thread waits until the queue accepts
+# it (back-pressure). Subscribing in on_connect renews the subscription
+# after paho's automatic reconnects.
+async def run_paho(ingest, stop, host=MQTT_BROKER, port=MQTT_PORT, topics=MQTT_TOPICS):
+    import paho.mqtt.client as mqtt
+
+    loop = asyncio.get_running_loop()
+
+    def on_connect(client, *args):
+        for topic in topics:
+            client.subscribe(topic)
+        print(f"✅ Connected to {host}:{port}, subscribed to {topics}")
+
+    def on_message(client, userdata, msg):
+        received = time.time()
+        future = asyncio.run_coroutine_threadsafe(
+            ingest.feed(msg.topic, msg.payload, received), loop)
+        future.result()
+
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    else:
+        client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    client.connect_async(host, port, 60)
+    client.loop_start()
+
+    disconnected = asyncio.Event()
+    service = asyncio.create_task(ingest.run(disconnected))
+    await stop.wait()
+    # stop the network thread first (it may be waiting on the queue, which
+    # the still-running consumer drains), then let the service flush
+    await asyncio.to_thread(lambda: (client.disconnect(), client.loop_stop()))
+    disconnected.set()
+    return await service
+
+
+# In-process stand-in for a broker: publish() awaits every subscriber, so
+# a slow ingest throttles the publisher exactly like a full TCP window.
+class FakeBroker:
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, feed):
+        self.subscribers.append(feed)
+
+    async def publish(self, topic, payload):
+        for feed in self.subscribers:
+            await feed(topic, payload)
+
+
+# Telemetry columns → firmware publishes, in the sketches' order
+def firmware_messages(df, device=None):
+    prefix = "freezer" if device is None else f"freezer/{device}"
+    fields = [(f, c) for f, c in TOPIC_FIELDS.items() if c in df]
+    columns = [df[c].to_numpy() for _, c in fields]
+    for row in zip(*columns):
+        yield [(f"{prefix}/{f}", str(v).encode()) for (f, _), v in zip(fields, row)]
+
+
+async def replay(broker, df, devices=1, ticks_per_s=None):
+    sent = 0
+    ids = [None] if devices == 1 else [f"freezer_{i + 1:02d}" for i in range(devices)]
+    streams = [firmware_messages(df, device) for device in ids]
+    for messages in zip(*streams):
+        for tick in messages:
+            for topic, payload in tick:
+                await broker.publish(topic, payload)
+                sent += 1
+        if ticks_per_s:
+            await asyncio.sleep(1 / ticks_per_s)
+    return sent
+
+
+async def run_fake(ingest, rows, devices):
+    from synthetic_telemetry import generate_rows
+
+    broker = FakeBroker()
+    broker.subscribe(ingest.feed)
+    stop = asyncio.Event()
+    service = asyncio.create_task(ingest.run(stop))
+
+    df = generate_rows(rows)
+    start = time.perf_counter()
+    sent = await replay(broker, df, devices)
+    stop.set()
+    stats = await service
+    elapsed = time.perf_counter() - start
+    print(f"{sent} messages in {elapsed:.2f}s ({sent / elapsed:,.0f} msg/s)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MQTT → telemetry CSV / store ingestion")
+    parser.add_argument("--broker", default=MQTT_BROKER)
+    parser.add_argument("--port", type=int, default=MQTT_PORT)
+    parser.add_argument("--topics", nargs="+", default=MQTT_TOPICS)
+    parser.add_argument("--output", default=OUTPUT_FILE, help="CSV to append records to")
+    parser.add_argument("--store", help="write to this telemetry store instead of CSV")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--fake", type=int, metavar="ROWS",
+                        help="no broker: replay ROWS synthetic ticks through an in-process fake broker")
+    parser.add_argument("--devices", type=int, default=1, help="devices replayed with --fake")
+    args = parser.parse_args()
+
+    sink = StoreSink(args.store) if args.store else CsvSink(args.output)
+    ingest = MqttIngest(sink, args.queue_size, args.batch_rows)
+
+    async def main():
+        if args.fake:
+            return await run_fake(ingest, args.fake, args.devices)
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        return await run_paho(ingest, stop, args.broker, args.port, args.topics)
+
+    stats = asyncio.run(main())
+    print(f"✅ {stats['messages']} messages → {stats['written']} records "
+          f"in {stats['batches']} batches ({stats['rejected']} rejected, {stats['dropped']} dropped, "
+          f"queue peak {stats['queue_peak']})")
+    print(f"📁 Output: {args.store or args.output}")
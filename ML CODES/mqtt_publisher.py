@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import paho.mqtt.client as mqtt
+
+# ---------------- PUBLISHER CONFIG ----------------
+MQTT_PORT = 1883
+KEEPALIVE_S = 60
+
+MAX_PENDING = 100        # distinct topics buffered; the oldest is dropped past this
+LOOP_TIMEOUT_S = 0.1     # network-loop tick (socket I/O, keepalive pings)
+RECONNECT_MIN_S = 1.0    # backoff doubles from here ...
+RECONNECT_MAX_S = 30.0   # ... up to here, with ±20 % jitter
+STABLE_S = 10.0          # ... and only starts over once a link stayed up this long
+CONNACK_TIMEOUT_S = 10.0 # TCP up but no CONNACK after this → treated as a failed attempt
+STOP_FLUSH_S = 2.0       # how long stop() waits for pending messages
+STOP_JOIN_S = 5.0        # how long stop() waits for the network thread
+
+
+# ---------------- NON-BLOCKING PUBLISHER ----------------
+# publish() only swaps a value into a dict under a lock, so the vision
+# loop never waits on DNS, TCP or a dead broker. A background thread owns
+# the paho client: it connects (and reconnects with backoff), runs the
+# network loop and sends whatever is pending. The link only counts as up
+# once the broker accepted the CONNECT (CONNACK 0): a broker that takes
+# the TCP connection and then refuses or closes it gets the same backoff
+# as one that can't be reached.
+#
+# Pending messages coalesce per topic: while the broker is slow or down,
+# only the latest inventory count is kept and sent once it is back.
+class MqttPublisher:
+
+    def __init__(self, host, port=MQTT_PORT, keepalive=KEEPALIVE_S,
+                 max_pending=MAX_PENDING, client_id=""):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.max_pending = max_pending
+
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+        else:
+            self.client = mqtt.Client(client_id=client_id)
+
+        self._pending = OrderedDict()   # topic → (payload, qos, retain, enqueued)
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mqtt-publisher", daemon=True)
+        self.connected = False
+        self._was_connected = False
+        self._socket_open = False
+        self._closed = False            # set by paho when the broker refuses / drops us
+        self._connack_deadline = None
+        self._connected_since = None
+        self._delay = RECONNECT_MIN_S
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.counters = {
+            "enqueued": 0, "published": 0, "coalesced": 0, "dropped": 0,
+            "failed": 0, "reconnects": 0,
+            "latency_ms_last": None, "latency_ms_max": 0.0, "latency_ms_total": 0.0,
+        }
+
+    # ---------- caller side (never blocks on the network) ----------
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        with self._wake:
+            self.counters["enqueued"] += 1
+            if topic in self._pending:
+                self.counters["coalesced"] += 1
+                del self._pending[topic]
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.counters["dropped"] += 1
+            self._pending[topic] = (payload, qos, retain, time.monotonic())
+            self._wake.notify()
+
+    def stats(self):
+        with self._wake:
+            stats = dict(self.counters)
+            stats["queue_depth"] = len(self._pending)
+        stats["connected"] = self.connected
+        if stats["published"]:
+            stats["latency_ms_mean"] = stats["latency_ms_total"] / stats["published"]
+        return stats
+
+    def stop(self, flush_timeout=STOP_FLUSH_S):
+        deadline = time.monotonic() + flush_timeout
+        while self.connected and time.monotonic() < deadline:
+            with self._wake:
+                if not self._pending:
+                    break
+            time.sleep(LOOP_TIMEOUT_S)
+        self._stop.set()
+        with self._wake:
+            self._wake.notify()
+        self._thread.join(timeout=STOP_JOIN_S)
+        if self._thread.is_alive():
+            print(f"⚠️ MQTT publisher thread still running after {STOP_JOIN_S:.0f}s, not waiting for it")
+
+    # ---------- network thread ----------
+    # paho callbacks; they run inside client.loop() on the network thread.
+    # reason code: an int in the v1 API, a ReasonCode in v2
+    def _on_connect(self, client, userdata, flags, reason_code, *args):
+        failed = reason_code.is_failure if hasattr(reason_code, "is_failure") else reason_code != 0
+        self._connack_deadline = None
+        if failed:
+            print(f"⚠️ MQTT connection refused by {self.host}:{self.port} ({reason_code})")
+            self._closed = True
+            return
+        if self._was_connected:
+            self.counters["reconnects"] += 1
+        self._was_connected = self.connected = True
+        self._connected_since = time.monotonic()
+        print(f"✅ MQTT connected to {self.host}:{self.port}")
+
+    def _on_disconnect(self, client, userdata, *args):
+        self.connected = False
+        self._closed = True
+
+    # Waits out the current backoff step (with jitter), then doubles it
+    def _backoff(self, reason):
+        print(f"⚠️ MQTT {reason}, retrying in {self._delay:.0f}s")
+        self._stop.wait(self._delay * random.uniform(0.8, 1.2))
+        self._delay = min(self._delay * 2, RECONNECT_MAX_S)
+
+    def _drop_link(self, reason):
+        self.connected = False
+        self._socket_open = False
+        try:
+            self.client.disconnect()
+        except OSError:
+            pass
+        self._backoff(reason)
+
+    def _connect(self):
+        try:
+            self.client.connect(self.host, self.port, self.keepalive)
+        except OSError as e:
+            self._backoff(f"connect failed ({e})")
+            return
+        self._socket_open = True
+        self._closed = False
+        self._connack_deadline = time.monotonic() + CONNACK_TIMEOUT_S
+
+    # latency = publish() call → message handed to the socket
+    def _send_pending(self):
+        with self._wake:
+            batch, self._pending = self._pending, OrderedDict()
+        items = list(batch.items())
+        for i, (topic, (payload, qos, retain, enqueued)) in enumerate(items):
+            info = self.client.publish(topic, payload, qos=qos, retain=retain)
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                self.counters["failed"] += 1
+                # keep the unsent ones for after the reconnect, unless a
+                # newer value for the topic arrived meanwhile
+                with self._wake:
+                    for unsent_topic, message in items[i:]:
+                        self._pending.setdefault(unsent_topic, message)
+                self.connected = False
+                return
+            latency = (time.monotonic() - enqueued) * 1000
+            self.counters["published"] += 1
+            self.counters["latency_ms_last"] = latency
+            self.counters["latency_ms_max"] = max(self.counters["latency_ms_max"], latency)
+            self.counters["latency_ms_total"] += latency
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._socket_open:
+                self._connect()
+                continue
+
+            if not self.connected:
+                # TCP is up, waiting for the broker's CONNACK
+                if self.client.loop(timeout=LOOP_TIMEOUT_S) != mqtt.MQTT_ERR_SUCCESS or self._closed:
+                    self._drop_link("connection closed before CONNACK")
+                elif not self.connected and time.monotonic() > self._connack_deadline:
+                    self._drop_link(f"no CONNACK within {CONNACK_TIMEOUT_S:.0f}s")
+                continue
+
+            if time.monotonic() - self._connected_since >= STABLE_S:
+                self._delay = RECONNECT_MIN_S
+
+            with self._wake:
+                if not self._pending:
+                    self._wake.wait(LOOP_TIMEOUT_S)
+            self._send_pending()
+
+            if self.connected and self.client.loop(timeout=0) != mqtt.MQTT_ERR_SUCCESS:
+                self.connected = False
+            if not self.connected or self._closed:
+                self._drop_link("connection lost")
+
+        if self.connected:
+            self._send_pending()
+            self.client.loop(timeout=LOOP_TIMEOUT_S)
+            self.client.disconnect()
+            self.connected = False
@@ -0,0 +1,220 @@
+import argparse
+import ast
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+import pandas as pd
+
+# ---------------- AUDIT CONFIG ----------------
+IMAGE_ROOT = "images"
+MODEL_FILE = "yolov8n.onnx"      # YOLO("yolov8n.pt").export(format="onnx", dynamic=True)
+RESULTS_FILE = "inventory_audit.csv"
+
+BATCH_SIZE = 8
+N_DECODERS = min(8, os.cpu_count() or 1)
+PREFETCH_BATCHES = 2     # decoded batches kept ready ahead of the model
+IMG_SIZE = 640
+CONF = 0.4
+IOU = 0.45
+REPORT_EVERY = 50        # batches between progress lines
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Same labels yolo_inventory_freezer.py counts as ice cream
+ICE_CREAM_ALIASES = [
+    "bowl",
+    "cup",
+    "bottle",
+    "book",
+    "remote"
+]
+
+
+# ---------------- FILES ----------------
+def find_images(root):
+    paths = []
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        paths += [os.path.join(folder, f) for f in sorted(files)
+                  if f.lower().endswith(IMAGE_EXTENSIONS)]
+    return paths
+
+
+# Resume: every path already in the results file is skipped
+def processed_paths(results_file):
+    if not os.path.exists(results_file):
+        return set()
+    return set(pd.read_csv(results_file, usecols=["path"])["path"])
+
+
+# ---------------- DECODE ----------------
+# Runs in the thread pool (imread / resize release the GIL): letterbox to
+# IMG_SIZE × IMG_SIZE, BGR → RGB, CHW float32 in [0, 1].
+def load_image(path, size=IMG_SIZE):
+    img = cv2.imread(path)
+    if img is None:
+        return path, None, None
+    h, w = img.shape[:2]
+    scale = size / max(h, w)
+    nh, nw = round(h * scale), round(w * scale)
+    resized = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return path, tensor, (w, h)
+
+
+# Decoded images in file order, at most PREFETCH_BATCHES batches in flight
+# so memory stays flat however large the tree is
+def iter_batches(paths, batch_size, pool):
+    window = batch_size * PREFETCH_BATCHES
+    pending = deque()
+    todo = iter(paths)
+    batch = []
+    while True:
+        while len(pending) < window:
+            path = next(todo, None)
+            if path is None:
+                break
+            pending.append(pool.submit(load_image, path))
+        if not pending:
+            break
+        batch.append(pending.popleft().result())
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------- DETECTION ----------------
+def class_names(session):
+    names = session.get_modelmeta().custom_metadata_map.get("names")
+    if names is None:
+        raise ValueError("model has no class names; export it with ultralytics")
+    return ast.literal_eval(names)
+
+
+# Greedy IoU suppression, per class (boxes as x1, y1, x2, y2)
+def nms(boxes, scores, classes, iou=IOU):
+    offset = classes[:, None] * (IMG_SIZE * 2)
+    boxes = boxes + offset
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores)
+    keep = []
+    while len(order):
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        x1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        overlap = inter / (area[i] + area[rest] - inter + 1e-9)
+        order = rest[overlap <= iou]
+    return np.array(keep, dtype=np.int64)
+
+
+# YOLOv8 output (batch, 4 + classes, anchors): cx, cy, w, h then class
+# scores. Returns the kept class ids per image.
+def detect(output, conf=CONF, iou=IOU):
+    detections = []
+    for pred in output:
+        pred = pred.T
+        scores = pred[:, 4:]
+        classes = scores.argmax(axis=1)
+        best = scores[np.arange(len(scores)), classes]
+        mask = best >= conf
+        if not mask.any():
+            detections.append(np.empty(0, dtype=np.int64))
+            continue
+        cx, cy, w, h = pred[mask, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        keep = nms(boxes, best[mask], classes[mask], iou)
+        detections.append(classes[mask][keep])
+    return detections
+
+
+# ---------------- AUDIT ----------------
+def _row(path, size, classes, alias_ids):
+    row = {"path": path, "status": "ok" if size is not None else "unreadable",
+           "width": size[0] if size else None, "height": size[1] if size else None,
+           "detections": len(classes) if size else None}
+    counts = {alias: int(np.count_nonzero(classes == i)) if size else None
+              for alias, i in alias_ids.items()}
+    row["count"] = sum(counts.values()) if size else None
+    row.update(counts)
+    row["processed_at"] = datetime.now(timezone.utc).isoformat()
+    return row
+
+
+def run_audit(root=IMAGE_ROOT, model_file=MODEL_FILE, results_file=RESULTS_FILE,
+              batch_size=BATCH_SIZE, decoders=N_DECODERS, threads=0):
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    names = class_names(session)
+    ids = {name: i for i, name in names.items()}
+    alias_ids = {alias: ids[alias] for alias in ICE_CREAM_ALIASES if alias in ids}
+
+    done = processed_paths(results_file)
+    paths = [p for p in find_images(root) if p not in done]
+    print(f"{len(paths)} images to process ({len(done)} already in {results_file})")
+
+    start = time.perf_counter()
+    images = 0
+    with ThreadPoolExecutor(max_workers=decoders) as pool:
+        for n, batch in enumerate(iter_batches(paths, batch_size, pool), start=1):
+            readable = [item for item in batch if item[1] is not None]
+            classes = {}
+            if readable:
+                output = session.run(None, {input_name: np.stack([t for _, t, _ in readable])})[0]
+                classes = dict(zip((p for p, _, _ in readable), detect(output)))
+
+            rows = [_row(path, size, classes.get(path), alias_ids)
+                    for path, _, size in batch]
+            # appended per batch: an interrupted run resumes after the last batch
+            pd.DataFrame(rows).to_csv(results_file, mode="a", index=False,
+                                      header=not os.path.exists(results_file))
+
+            images += len(batch)
+            if n % REPORT_EVERY == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {images}/{len(paths)} images, {images / elapsed:.1f} images/s")
+
+    elapsed = time.perf_counter() - start
+    return images, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline ice-cream inventory audit of stored captures (ONNX, CPU)")
+    parser.add_argument("--root", default=IMAGE_ROOT, help="image folder, scanned recursively")
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--decoders", type=int, default=N_DECODERS, help="image decoding threads")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = all cores)")
+    parser.add_argument("--export", action="store_true",
+                        help="export yolov8n.pt to --model first (needs ultralytics)")
+    args = parser.parse_args()
+
+    if args.export:
+        from ultralytics import YOLO
+        exported = YOLO("yolov8n.pt").export(format="onnx", dynamic=True, imgsz=IMG_SIZE)
+        os.replace(exported, args.model)
+        print(f"📁 Exported model: {args.model}")
+
+    images, elapsed = run_audit(args.root, args.model, args.output,
+                                args.batch_size, args.decoders, args.threads)
+    rate = images / elapsed if elapsed else 0.0
+    print(f"✅ {images} images in {elapsed:.1f}s ({rate:.1f} images/s)")
+    print(f"📁 Output file: {args.output}")
@@ -1,47 +1,62 @@
-import pandas as pd
-
-# Load raw telemetry data
-df = pd.read_csv("telemetry.csv")
-
-# Convert timestamp
-df["ts"] = pd.to_datetime(df["ts"])
-
-# Sort by time
-df = df.sort_values("ts")
+from instrumentation import stage, step
+from telemetry_schema import DEVICE_COLUMN, load_csv, save_csv
 
 # -------------------------------
 # FEATURE ENGINEERING
 # -------------------------------
+def build_features(df):
+    multi_device = DEVICE_COLUMN in df
 
-# 1. Superheat (core refrigeration metric)
-df["superheat"] = df["temperature"] - df["evap_temp"]
+    # Sort by time (per freezer when several are mixed)
+    with step("sort"):
+        df = df.sort_values([DEVICE_COLUMN, "ts"] if multi_device else "ts")
 
-# 2. Temperature change rate
-df["temp_delta"] = df["temperature"].diff()
+    with step("derive"):
+        # 1. Superheat (core refrigeration metric)
+        df["superheat"] = df["temperature"] - df["evap_temp"]
 
-# 3. Power per compressor RPM
-df["power_per_rpm"] = df["power_watts"] / df["compressor_rpm"]
+        # 2. Temperature change rate (never across two freezers)
+        if multi_device:
+            df["temp_delta"] = df.groupby(DEVICE_COLUMN, observed=True)["temperature"].diff()
+        else:
+            df["temp_delta"] = df["temperature"].diff()
 
-# 4. Fan efficiency
-df["fan_efficiency"] = df["fan_rpm"] / df["power_watts"]
+        # 3. Power per compressor RPM
+        df["power_per_rpm"] = df["power_watts"] / df["compressor_rpm"]
 
-# 5. Vibration flag (basic anomaly indicator)
-df["vibration_flag"] = df["vibration"].apply(lambda x: 1 if x > 0 else 0)
+        # 4. Fan efficiency
+        df["fan_efficiency"] = df["fan_rpm"] / df["power_watts"]
 
-# -------------------------------
-# CLEAN DATA
-# -------------------------------
+    # 5. Vibration flag (basic anomaly indicator)
+    with step("vibration_flag"):
+        df["vibration_flag"] = df["vibration"].apply(lambda x: 1 if x > 0 else 0)
 
-# Remove first row (diff creates NaN)
-df = df.dropna()
+    # -------------------------------
+    # CLEAN DATA
+    # -------------------------------
+    with step("clean"):
+        # Remove first row (diff creates NaN)
+        df = df.dropna()
 
-# Replace infinities
-df = df.replace([float("inf"), -float("inf")], 0)
+        # Replace infinities
+        df = df.replace([float("inf"), -float("inf")], 0)
 
-# -------------------------------
-# SAVE ML DATASET
-# -------------------------------
+    return df
+
+
+if __name__ == "__main__":
+    with stage("features") as run:
+        # Load raw telemetry data (typed, ts parsed as UTC)
+        df = load_csv("telemetry.csv")
+        run.rows_in = len(df)
+
+        df = build_features(df)
+        run.rows_out = len(df)
+
+        # -------------------------------
+        # SAVE ML DATASET
+        # -------------------------------
 
-df.to_csv("ml_dataset.csv", index=False)
+        save_csv(df, "ml_dataset.csv")
 
-print("✅ Phase 1 completed: ml_dataset.csv created")
+    print("✅ Phase 1 completed: ml_dataset.csv created")
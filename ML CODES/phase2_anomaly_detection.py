@@ -1,8 +1,7 @@
-import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-# Load dataset
-df = pd.read_csv("ml_dataset.csv")
+from instrumentation import stage, step
+from telemetry_schema import load_csv, save_csv
 
 # Features for anomaly detection
 features = [
@@ -17,23 +16,40 @@ features = [
     "fan_efficiency"
 ]
 
-X = df[features]
 
-# Train Isolation Forest
-model = IsolationForest(
-    n_estimators=100,
-    contamination=0.05,
-    random_state=42
-)
+def detect_anomalies(df, n_estimators=100, contamination=0.05, random_state=42):
+    df = df.copy()
+    X = df[features]
 
-df["anomaly"] = model.fit_predict(X)
-df["anomaly_score"] = model.decision_function(X)
+    # Train Isolation Forest
+    model = IsolationForest(
+        n_estimators=n_estimators,
+        contamination=contamination,
+        random_state=random_state
+    )
 
-df["anomaly_label"] = df["anomaly"].apply(
-    lambda x: "Anomaly" if x == -1 else "Normal"
-)
+    with step("fit_predict", rows_in=len(X)):
+        df["anomaly"] = model.fit_predict(X)
+    with step("decision_function", rows_in=len(X)):
+        df["anomaly_score"] = model.decision_function(X)
 
-# Save output
-df.to_csv("ml_dataset_with_anomalies.csv", index=False)
+    with step("label"):
+        df["anomaly_label"] = df["anomaly"].apply(
+            lambda x: "Anomaly" if x == -1 else "Normal"
+        )
+    return df
 
-print("✅ Phase 2 completed: anomalies detected")
+
+if __name__ == "__main__":
+    with stage("anomalies") as run:
+        # Load dataset
+        df = load_csv("ml_dataset.csv")
+        run.rows_in = len(df)
+
+        df = detect_anomalies(df)
+        run.rows_out = len(df)
+
+        # Save output
+        save_csv(df, "ml_dataset_with_anomalies.csv")
+
+    print("✅ Phase 2 completed: anomalies detected")
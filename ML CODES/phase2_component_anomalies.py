@@ -1,35 +1,49 @@
-import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-# Load ML dataset
-df = pd.read_csv("ml_dataset.csv")
+from instrumentation import stage, step
+from telemetry_schema import load_csv, save_csv
+
+# Output column → features of that component
+COMPONENTS = {
+    "temp_anomaly": ["temperature", "evap_temp", "superheat"],
+    "power_anomaly": ["power_watts", "power_per_rpm"],
+    "rpm_anomaly": ["fan_rpm", "compressor_rpm"],
+    "vibration_anomaly": ["vibration"],
+}
+
 
 # Helper function
-def detect_anomaly(data):
+def detect_anomaly(data, n_estimators=100, contamination=0.05, random_state=42):
     model = IsolationForest(
-        n_estimators=100,
-        contamination=0.05,
-        random_state=42
+        n_estimators=n_estimators,
+        contamination=contamination,
+        random_state=random_state
     )
     return model.fit_predict(data)
 
-# Temperature anomaly
-df["temp_anomaly"] = detect_anomaly(df[["temperature", "evap_temp", "superheat"]])
-df["temp_anomaly"] = df["temp_anomaly"].apply(lambda x: "Anomaly" if x == -1 else "Normal")
 
-# Power anomaly
-df["power_anomaly"] = detect_anomaly(df[["power_watts", "power_per_rpm"]])
-df["power_anomaly"] = df["power_anomaly"].apply(lambda x: "Anomaly" if x == -1 else "Normal")
+def detect_component_anomalies(df, n_estimators=100, contamination=0.05, random_state=42):
+    df = df.copy()
+
+    # Temperature, power, RPM and vibration anomaly
+    for col, cols in COMPONENTS.items():
+        with step(col, rows_in=len(df)):
+            df[col] = detect_anomaly(df[cols], n_estimators, contamination, random_state)
+            df[col] = df[col].apply(lambda x: "Anomaly" if x == -1 else "Normal")
+
+    return df
+
 
-# RPM anomaly
-df["rpm_anomaly"] = detect_anomaly(df[["fan_rpm", "compressor_rpm"]])
-df["rpm_anomaly"] = df["rpm_anomaly"].apply(lambda x: "Anomaly" if x == -1 else "Normal")
+if __name__ == "__main__":
+    with stage("component_anomalies") as run:
+        # Load ML dataset
+        df = load_csv("ml_dataset.csv")
+        run.rows_in = len(df)
 
-# Vibration anomaly
-df["vibration_anomaly"] = detect_anomaly(df[["vibration"]])
-df["vibration_anomaly"] = df["vibration_anomaly"].apply(lambda x: "Anomaly" if x == -1 else "Normal")
+        df = detect_component_anomalies(df)
+        run.rows_out = len(df)
 
-# Save output
-df.to_csv("ml_dataset_component_anomalies.csv", index=False)
+        # Save output
+        save_csv(df, "ml_dataset_component_anomalies.csv")
 
-print("✅ Component-level anomalies generated")
+    print("✅ Component-level anomalies generated")
@@ -1,7 +1,7 @@
-import pandas as pd
+from telemetry_schema import load_csv
 
 # Load anomaly dataset
-df = pd.read_csv("ml_dataset_with_anomalies.csv")
+df = load_csv("ml_dataset_with_anomalies.csv")
 
 # Define threshold (bottom 5% anomaly scores)
 threshold = df["anomaly_score"].quantile(0.05)
@@ -1,26 +1,36 @@
-import pandas as pd
+import argparse
+
 import matplotlib.pyplot as plt
 
+from anomaly_plots import draw_panel, prepare_panel, render_panel_files
+from telemetry_schema import load_csv
+
+parser = argparse.ArgumentParser(description="Component anomaly plots, one window per sensor")
+parser.add_argument("--headless", action="store_true",
+                    help="no windows; downsampled panels are written to plots/ (Agg)")
+HEADLESS = parser.parse_args().headless
+
 # Load data
-df = pd.read_csv("ml_dataset_component_anomalies.csv")
-df["ts"] = pd.to_datetime(df["ts"])
+df = load_csv("ml_dataset_component_anomalies.csv").sort_values("ts")
 
-# Helper plotting function
-def plot_anomaly(time, normal_y, anomaly_y, ylabel, title):
-    plt.figure()
-    plt.plot(time, normal_y, label="Normal")
-    plt.scatter(time, anomaly_y, label="Anomaly")
-    plt.xlabel("Time")
-    plt.ylabel(ylabel)
-    plt.title(title)
-    plt.legend()
+panels = []
+
+# Helper plotting function: the line is downsampled (LTTB), anomaly points
+# are always drawn; x values come from the same rows as y.
+def plot_anomaly(time, values, anomalous, ylabel, title):
+    panel = prepare_panel(time, values, anomalous, ylabel, title)
+    if HEADLESS:
+        panels.append(panel)
+        return
+    fig, ax = plt.subplots()
+    draw_panel(ax, panel)
     plt.show()
 
 # Temperature
 plot_anomaly(
     df["ts"],
-    df[df["temp_anomaly"] == "Normal"]["temperature"],
-    df[df["temp_anomaly"] == "Anomaly"]["temperature"],
+    df["temperature"],
+    df["temp_anomaly"] == "Anomaly",
     "Temperature (°C)",
     "Temperature Anomaly Detection"
 )
@@ -28,8 +38,8 @@ plot_anomaly(
 # Superheat
 plot_anomaly(
     df["ts"],
-    df[df["temp_anomaly"] == "Normal"]["superheat"],
-    df[df["temp_anomaly"] == "Anomaly"]["superheat"],
+    df["superheat"],
+    df["temp_anomaly"] == "Anomaly",
     "Superheat",
     "Superheat Anomaly Detection"
 )
@@ -37,8 +47,8 @@ plot_anomaly(
 # Power
 plot_anomaly(
     df["ts"],
-    df[df["power_anomaly"] == "Normal"]["power_watts"],
-    df[df["power_anomaly"] == "Anomaly"]["power_watts"],
+    df["power_watts"],
+    df["power_anomaly"] == "Anomaly",
     "Power (Watts)",
     "Power Anomaly Detection"
 )
@@ -46,8 +56,8 @@ plot_anomaly(
 # Fan RPM
 plot_anomaly(
     df["ts"],
-    df[df["rpm_anomaly"] == "Normal"]["fan_rpm"],
-    df[df["rpm_anomaly"] == "Anomaly"]["fan_rpm"],
+    df["fan_rpm"],
+    df["rpm_anomaly"] == "Anomaly",
     "Fan RPM",
     "Fan RPM Anomaly Detection"
 )
@@ -55,8 +65,8 @@ plot_anomaly(
 # Compressor RPM
 plot_anomaly(
     df["ts"],
-    df[df["rpm_anomaly"] == "Normal"]["compressor_rpm"],
-    df[df["rpm_anomaly"] == "Anomaly"]["compressor_rpm"],
+    df["compressor_rpm"],
+    df["rpm_anomaly"] == "Anomaly",
     "Compressor RPM",
     "Compressor RPM Anomaly Detection"
 )
@@ -64,8 +74,12 @@ plot_anomaly(
 # Vibration
 plot_anomaly(
     df["ts"],
-    df[df["vibration_anomaly"] == "Normal"]["vibration"],
-    df[df["vibration_anomaly"] == "Anomaly"]["vibration"],
+    df["vibration"],
+    df["vibration_anomaly"] == "Anomaly",
     "Vibration",
     "Vibration Anomaly Detection"
 )
+
+if HEADLESS:
+    files = render_panel_files(panels)
+    print(f"✅ {len(files)} plots written to plots/")
@@ -1,38 +1,36 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-
-# Load data
-df = pd.read_csv("ml_dataset_component_anomalies.csv")
-df["ts"] = pd.to_datetime(df["ts"])
+import argparse
 
-WINDOW = 5
-
-def plot_component(ax, value_col, anomaly_col, ylabel, title):
-    normal = df[df[anomaly_col] == "Normal"]
-    anomaly = df[df[anomaly_col] == "Anomaly"]
+import matplotlib.pyplot as plt
 
-    trend = df[value_col].rolling(WINDOW).mean()
+from anomaly_plots import PANELS, draw_panel, prepare_panels, render_dashboard
+from telemetry_schema import load_csv
 
-    ax.plot(normal["ts"], normal[value_col], label="Normal")
-    ax.scatter(anomaly["ts"], anomaly[value_col], s=80, label="Anomaly")
-    ax.plot(df["ts"], trend, linestyle="--", label="Trend")
+parser = argparse.ArgumentParser(description="Full anomaly dashboard (3×2 panels)")
+parser.add_argument("--headless", action="store_true",
+                    help="no window; the dashboard is written to anomaly_dashboard.png, "
+                         "panels rendered off-screen in parallel")
+parser.add_argument("--svg", action="store_true", help="with --headless, write anomaly_dashboard.svg")
+args = parser.parse_args()
 
-    ax.set_title(title)
-    ax.set_ylabel(ylabel)
-    ax.legend()
+HEADLESS = args.headless
+OUTPUT_FILE = "anomaly_dashboard.svg" if args.svg else "anomaly_dashboard.png"
 
-# Create 3x2 dashboard
-fig, axs = plt.subplots(3, 2, figsize=(14, 12))
-fig.suptitle("Predictive Maintenance – Full Anomaly Dashboard", fontsize=14)
+# Load data
+df = load_csv("ml_dataset_component_anomalies.csv")
 
-plot_component(axs[0, 0], "temperature", "temp_anomaly", "Temperature (°C)", "Temperature")
-plot_component(axs[0, 1], "superheat", "temp_anomaly", "Superheat", "Superheat")
+# Downsampled (LTTB) lines + all anomaly points + rolling trend, per panel
+panels = prepare_panels(df, PANELS)
 
-plot_component(axs[1, 0], "power_watts", "power_anomaly", "Power (W)", "Power")
-plot_component(axs[1, 1], "fan_rpm", "rpm_anomaly", "Fan RPM", "Fan RPM")
+if HEADLESS:
+    render_dashboard(panels, OUTPUT_FILE)
+    print(f"📁 Dashboard saved as: {OUTPUT_FILE}")
+else:
+    # Create 3x2 dashboard
+    fig, axs = plt.subplots(3, 2, figsize=(14, 12))
+    fig.suptitle("Predictive Maintenance – Full Anomaly Dashboard", fontsize=14)
 
-plot_component(axs[2, 0], "compressor_rpm", "rpm_anomaly", "Compressor RPM", "Compressor RPM")
-plot_component(axs[2, 1], "vibration", "vibration_anomaly", "Vibration", "Vibration")
+    for ax, panel in zip(axs.ravel(), panels):
+        draw_panel(ax, panel)
 
-plt.tight_layout()
-plt.show()
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,51 @@
+import pandas as pd
+
+# =========================
+# FILE PATHS
+# =========================
+INPUT_FILE  = "phase3_step1_eev_output.csv"
+OUTPUT_FILE = "phase3_step2_compressor_output.csv"
+
+# =========================
+# COMPRESSOR RPM CONTROL LOGIC
+# Row-wise rules from the step-2 notes ("import pandas as pd.txt");
+# control_engine.compressor_control_vectorized gives the same result.
+# =========================
+def compressor_control(row):
+    sh = row["superheat"]
+
+    # Safety first
+    if row.get("vibration_anomaly", 0) == 1:
+        return -300, "VIBRATION_LIMIT"
+
+    if row.get("power_anomaly", 0) == 1 and sh < 8:
+        return -200, "INEFFICIENT_POWER_USE"
+
+    # Cooling demand
+    if sh > 12:
+        return +300, "INCREASE_COOLING"
+
+    if sh < 5:
+        return -200, "OVERCOOLING_RISK"
+
+    # ML-based refinement
+    if row.get("temperature_anomaly", 0) == 1 and sh > 10:
+        return +200, "TEMP_NOT_RECOVERING"
+
+    return 0, "HOLD"
+
+
+if __name__ == "__main__":
+    # Load Step 1 output
+    df = pd.read_csv(INPUT_FILE)
+
+    # Apply logic
+    df[["compressor_rpm_cmd", "compressor_state"]] = df.apply(
+        compressor_control, axis=1, result_type="expand"
+    )
+
+    # Save output
+    df.to_csv(OUTPUT_FILE, index=False)
+
+    print("✅ Phase 3 Step 2 completed")
+    print(f"📁 Output file: {OUTPUT_FILE}")
@@ -1,25 +1,29 @@
 import pandas as pd
 
+from control_engine import DEFAULT_COMP_RPM, DEFAULT_EEV_STEP, DEFAULT_FAN_RPM, apply_control_vectorized
+from instrumentation import stage
+from telemetry_schema import load_csv, save_csv
+
 # =========================
 # FILE PATHS
 # =========================
 INPUT_FILE  = "ml_dataset_with_anomalies.csv"
 OUTPUT_FILE = "phase3_control_output.csv"
 
-# =========================
-# LOAD DATA
-# =========================
-df = pd.read_csv(INPUT_FILE)
-
-# =========================
-# DEFAULT SAFE VALUES
-# =========================
-DEFAULT_EEV_STEP = 50
-DEFAULT_FAN_RPM = 1200
-DEFAULT_COMP_RPM = 1800
+CONTROL_COLUMNS = [
+    "eev_step_cmd",
+    "fan_rpm_cmd",
+    "compressor_rpm_cmd",
+    "eev_state",
+    "fan_state",
+    "compressor_state",
+    "control_reason"
+]
 
 # =========================
 # ACTION LOGIC FUNCTION
+# Row-wise reference; apply_control() uses the vectorized
+# rules in control_engine.py, which give the same result.
 # =========================
 def decide_control(row):
     eev = DEFAULT_EEV_STEP
@@ -64,20 +68,27 @@ def decide_control(row):
 # =========================
 # APPLY CONTROL LOGIC
 # =========================
-df[[
-    "eev_step_cmd",
-    "fan_rpm_cmd",
-    "compressor_rpm_cmd",
-    "eev_state",
-    "fan_state",
-    "compressor_state",
-    "control_reason"
-]] = df.apply(decide_control, axis=1)
+def apply_control(df):
+    df, _ = apply_control_vectorized(df)
+    return df
 
-# =========================
-# SAVE OUTPUT
-# =========================
-df.to_csv(OUTPUT_FILE, index=False)
 
-print("✅ Phase-3 Control Logic Completed")
-print(f"📁 Output saved as: {OUTPUT_FILE}")
+if __name__ == "__main__":
+    with stage("control") as run:
+        # =========================
+        # LOAD DATA
+        # =========================
+        df = load_csv(INPUT_FILE)
+        run.rows_in = len(df)
+
+        df, hits = apply_control_vectorized(df)
+        run.rows_out = len(df)
+
+        # =========================
+        # SAVE OUTPUT
+        # =========================
+        save_csv(df, OUTPUT_FILE)
+
+    print("Rule hits:", hits)
+    print("✅ Phase-3 Control Logic Completed")
+    print(f"📁 Output saved as: {OUTPUT_FILE}")
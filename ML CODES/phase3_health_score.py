@@ -1,47 +1,41 @@
-import pandas as pd
+from instrumentation import stage
+from risk_scoring import find_anomaly_columns, score_health
+from telemetry_schema import load_csv, save_csv
 
-# ---------------------------------------
-# LOAD DATA
-# ---------------------------------------
-df = pd.read_csv("ml_dataset_with_anomalies.csv")
 
 # ---------------------------------------
 # AUTO-DETECT ANOMALY COLUMNS
 # (anything containing 'anomaly')
-# ---------------------------------------
-anomaly_cols = [c for c in df.columns if "anomaly" in c.lower()]
-
-print("Detected anomaly columns:")
-print(anomaly_cols)
-
-# ---------------------------------------
+#
 # NORMALIZE VALUES
 # IsolationForest: -1 = anomaly, 1 = normal
 # Convert to 1 = anomaly, 0 = normal
+#
+# ANOMALY COUNT → HEALTH SCORE (0–100)
+# (vectorized in risk_scoring.py)
 # ---------------------------------------
-for col in anomaly_cols:
-    if df[col].dtype != object:
-        df[col] = df[col].apply(lambda x: 1 if x == -1 else 0)
-    else:
-        df[col] = df[col].apply(lambda x: 1 if str(x).lower() == "anomaly" else 0)
+def compute_health_score(df):
+    return score_health(df)
 
-# ---------------------------------------
-# ANOMALY COUNT
-# ---------------------------------------
-df["anomaly_count"] = df[anomaly_cols].sum(axis=1)
 
-# ---------------------------------------
-# HEALTH SCORE (0–100)
-# ---------------------------------------
-MAX_ANOMALIES = len(anomaly_cols)
+if __name__ == "__main__":
+    with stage("health_score") as run:
+        # ---------------------------------------
+        # LOAD DATA
+        # ---------------------------------------
+        df = load_csv("ml_dataset_with_anomalies.csv")
+        run.rows_in = len(df)
 
-df["health_score"] = 100 - (df["anomaly_count"] / MAX_ANOMALIES) * 100
-df["health_score"] = df["health_score"].round(2)
+        print("Detected anomaly columns:")
+        print(find_anomaly_columns(df))
 
-# ---------------------------------------
-# SAVE OUTPUT
-# ---------------------------------------
-df.to_csv("ml_dataset_with_health_score.csv", index=False)
+        df = compute_health_score(df)
+        run.rows_out = len(df)
+
+        # ---------------------------------------
+        # SAVE OUTPUT
+        # ---------------------------------------
+        save_csv(df, "ml_dataset_with_health_score.csv")
 
-print("\n✅ Phase 3 Step 1 completed")
-print("📁 Output file: ml_dataset_with_health_score.csv")
+    print("\n✅ Phase 3 Step 1 completed")
+    print("📁 Output file: ml_dataset_with_health_score.csv")
@@ -1,17 +1,17 @@
-import pandas as pd
+from instrumentation import stage
+from risk_scoring import NORMAL_MIN_SCORE, WARNING_MIN_SCORE, score_risk
+from telemetry_schema import load_csv, save_csv
 
-# ---------------------------------------
-# LOAD DATA (FROM STEP 1)
-# ---------------------------------------
-df = pd.read_csv("ml_dataset_with_health_score.csv")
 
 # ---------------------------------------
 # RISK CLASSIFICATION FUNCTION
+# Row-wise reference; add_risk_levels() uses the bucketed
+# lookup in risk_scoring.py, which gives the same result.
 # ---------------------------------------
-def classify_risk(score):
-    if score >= 80:
+def classify_risk(score, normal_min=NORMAL_MIN_SCORE, warning_min=WARNING_MIN_SCORE):
+    if score >= normal_min:
         return "NORMAL"
-    elif score >= 50:
+    elif score >= warning_min:
         return "WARNING"
     else:
         return "CRITICAL"
@@ -24,20 +24,33 @@ def action_for_risk(risk):
     else:
         return "Immediate maintenance required"
 
+
 # ---------------------------------------
 # APPLY CLASSIFICATION
 # ---------------------------------------
-df["risk_level"] = df["health_score"].apply(classify_risk)
-df["recommended_action"] = df["risk_level"].apply(action_for_risk)
+def add_risk_levels(df, normal_min=NORMAL_MIN_SCORE, warning_min=WARNING_MIN_SCORE):
+    return score_risk(df, normal_min, warning_min)
 
-# ---------------------------------------
-# SAVE OUTPUT
-# ---------------------------------------
-df.to_csv("ml_dataset_with_risk_levels.csv", index=False)
 
-print("✅ Phase 3 – Step 2 completed")
-print("📁 Output file: ml_dataset_with_risk_levels.csv")
+if __name__ == "__main__":
+    with stage("risk_levels") as run:
+        # ---------------------------------------
+        # LOAD DATA (FROM STEP 1)
+        # ---------------------------------------
+        df = load_csv("ml_dataset_with_health_score.csv")
+        run.rows_in = len(df)
+
+        df = add_risk_levels(df)
+        run.rows_out = len(df)
+
+        # ---------------------------------------
+        # SAVE OUTPUT
+        # ---------------------------------------
+        save_csv(df, "ml_dataset_with_risk_levels.csv")
+
+    print("✅ Phase 3 – Step 2 completed")
+    print("📁 Output file: ml_dataset_with_risk_levels.csv")
 
-# Quick summary
-print("\nRisk distribution:")
-print(df["risk_level"].value_counts())
+    # Quick summary
+    print("\nRisk distribution:")
+    print(df["risk_level"].value_counts())
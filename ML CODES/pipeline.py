@@ -0,0 +1,234 @@
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+import instrumentation
+from phase1_feature_engineering import build_features
+from phase2_anomaly_detection import detect_anomalies
+from phase2_component_anomalies import detect_component_anomalies
+from phase3_control_logic import apply_control
+from phase3_health_score import compute_health_score
+from phase3_risk_classification import add_risk_levels
+from telemetry_schema import load_csv, save_csv
+
+# ---------------- PIPELINE CONFIG ----------------
+SOURCE_FILE = "telemetry.csv"
+CACHE_DIR = ".pipeline_cache"
+CACHE_KEEP = 5           # cached results kept per stage, least recently used go first
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Stage name → function, upstream stages ("source" = raw telemetry),
+# default parameters and the CSV the standalone phase script writes.
+STAGES = {
+    "features": {
+        "func": build_features,
+        "inputs": ["source"],
+        "params": {},
+        "output": "ml_dataset.csv",
+    },
+    "anomalies": {
+        "func": detect_anomalies,
+        "inputs": ["features"],
+        "params": {"n_estimators": 100, "contamination": 0.05, "random_state": 42},
+        "output": "ml_dataset_with_anomalies.csv",
+    },
+    "component_anomalies": {
+        "func": detect_component_anomalies,
+        "inputs": ["features"],
+        "params": {"n_estimators": 100, "contamination": 0.05, "random_state": 42},
+        "output": "ml_dataset_component_anomalies.csv",
+    },
+    "health_score": {
+        "func": compute_health_score,
+        "inputs": ["anomalies"],
+        "params": {},
+        "output": "ml_dataset_with_health_score.csv",
+    },
+    "risk_levels": {
+        "func": add_risk_levels,
+        "inputs": ["health_score"],
+        "params": {"normal_min": 80, "warning_min": 50},
+        "output": "ml_dataset_with_risk_levels.csv",
+    },
+    "control": {
+        "func": apply_control,
+        "inputs": ["anomalies"],
+        "params": {},
+        "output": "phase3_control_output.csv",
+    },
+}
+
+
+# ---------------- HASHING ----------------
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# Local modules a module imports, directly or through other local modules
+# (control_engine, risk_scoring, telemetry_schema, instrumentation, ...)
+def local_dependencies(path, seen=None):
+    seen = set() if seen is None else seen
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            dep = os.path.join(HERE, name.split(".")[0] + ".py")
+            if dep not in seen and os.path.exists(dep):
+                seen.add(dep)
+                local_dependencies(dep, seen)
+    return seen
+
+
+# A stage key covers the source of its phase module and of every local
+# module it depends on, its parameters and the keys of its inputs, so a
+# change anywhere upstream changes every key below it.
+def stage_key(name, params, input_keys):
+    h = hashlib.sha256()
+    h.update(name.encode())
+    module = inspect.getsourcefile(STAGES[name]["func"])
+    for path in [module] + sorted(local_dependencies(module) - {module}):
+        h.update(os.path.basename(path).encode())
+        h.update(file_hash(path).encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    for key in input_keys:
+        h.update(key.encode())
+    return h.hexdigest()
+
+
+# ---------------- CACHE ----------------
+# Keeps the `keep` most recently used results of each stage (cache hits
+# refresh the mtime), so parameter sweeps don't fill the disk.
+def prune_cache(cache_dir=CACHE_DIR, keep=CACHE_KEEP):
+    removed = 0
+    for name in STAGES:
+        entries = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir)
+                   if f.startswith(name + "-") and f.endswith(".pkl")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[keep:]:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+# ---------------- DAG ----------------
+def plan(targets):
+    order = []
+
+    def visit(name):
+        if name == "source" or name in order:
+            return
+        for upstream in STAGES[name]["inputs"]:
+            visit(upstream)
+        order.append(name)
+
+    for name in targets:
+        if name not in STAGES:
+            raise KeyError(f"unknown stage '{name}'")
+        visit(name)
+    return order
+
+
+def run_pipeline(source=SOURCE_FILE, targets=None, save=(), overrides=None,
+                 cache_dir=CACHE_DIR, use_cache=True, cache_keep=CACHE_KEEP):
+    targets = list(targets or STAGES)
+    save = list(save)
+    overrides = overrides or {}
+    os.makedirs(cache_dir, exist_ok=True)
+
+    frames = {}
+    paths = {}
+    keys = {"source": file_hash(source)}
+    report = []
+
+    # Cached results are only unpickled when something downstream needs them
+    def get(name):
+        if name not in frames:
+            frames[name] = load_csv(source) if name == "source" else pd.read_pickle(paths[name])
+        return frames[name]
+
+    # stages only asked for in `save` are planned (and run) too
+    for name in plan(targets + [s for s in save if s not in targets]):
+        stage = STAGES[name]
+        params = {**stage["params"], **overrides.get(name, {})}
+        keys[name] = stage_key(name, params, [keys[i] for i in stage["inputs"]])
+        paths[name] = os.path.join(cache_dir, f"{name}-{keys[name][:16]}.pkl")
+
+        start = time.perf_counter()
+        if use_cache and os.path.exists(paths[name]):
+            os.utime(paths[name])
+            status = "cached"
+        else:
+            with instrumentation.stage(name) as run:
+                inputs = [get(i) for i in stage["inputs"]]
+                run.rows_in = len(inputs[0])
+                frames[name] = stage["func"](*inputs, **params)
+                run.rows_out = len(frames[name])
+                with instrumentation.step("cache_write"):
+                    frames[name].to_pickle(paths[name])
+            status = "ran"
+
+        report.append((name, status, time.perf_counter() - start))
+
+    for name in save:
+        save_csv(get(name), STAGES[name]["output"])
+
+    prune_cache(cache_dir, cache_keep)
+    return {name: get(name) for name in targets}, report
+
+
+# "risk_levels.warning_min=40" → {"risk_levels": {"warning_min": 40}}
+def parse_overrides(items):
+    overrides = {}
+    for item in items:
+        target, value = item.split("=", 1)
+        stage, param = target.split(".", 1)
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            pass
+        overrides.setdefault(stage, {})[param] = value
+    return overrides
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run phase1 → phase3 in one process")
+    parser.add_argument("--source", default=SOURCE_FILE)
+    parser.add_argument("--targets", nargs="*", default=None, choices=list(STAGES))
+    parser.add_argument("--save", nargs="*", default=None, choices=list(STAGES),
+                        help="stages whose CSV is written (default: all targets)")
+    parser.add_argument("--set", nargs="*", default=[], metavar="STAGE.PARAM=VALUE")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-keep", type=int, default=CACHE_KEEP, help="cached results kept per stage")
+    parser.add_argument("--profile", choices=list(STAGES), help="run this stage under cProfile")
+    args = parser.parse_args()
+
+    if args.profile:
+        instrumentation.PROFILE_STAGE = args.profile
+
+    targets = args.targets or list(STAGES)
+    save = targets if args.save is None else args.save
+
+    _, report = run_pipeline(args.source, targets, save,
+                             parse_overrides(args.set), use_cache=not args.no_cache,
+                             cache_keep=args.cache_keep)
+
+    for name, status, seconds in report:
+        print(f"{name:<20} {status:<7} {seconds:.3f}s")
+
+    print("✅ Pipeline completed")
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import step
+from telemetry_schema import FLOAT_COLUMNS, INT_COLUMNS, RISK_LEVELS
+
+# ---------------------------------------
+# RISK BUCKETS
+# Health score ≥ normal_min → NORMAL, ≥ warning_min → WARNING, else CRITICAL
+# (same thresholds as phase3_risk_classification.py)
+# ---------------------------------------
+NORMAL_MIN_SCORE = 80
+WARNING_MIN_SCORE = 50
+
+RISK_ACTIONS = {
+    "NORMAL": "No action needed",
+    "WARNING": "Monitor system & schedule inspection",
+    "CRITICAL": "Immediate maintenance required",
+}
+
+CHUNK_ROWS = 1_000_000
+
+
+# ---------------------------------------
+# ANOMALY FLAGS (1 = anomaly, 0 = normal)
+# Numeric: IsolationForest -1 = anomaly. Labels: "anomaly" in any case.
+# Categorical labels are decided once per category, then looked up by code.
+# ---------------------------------------
+def anomaly_flags(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str).str.lower()
+        # extra last slot for code -1 (missing)
+        lookup = np.append((categories == "anomaly").astype(np.int8), 0)
+        return lookup[series.cat.codes.to_numpy()]
+    if pd.api.types.is_numeric_dtype(series):
+        return (series.to_numpy() == -1).astype(np.int8)
+    return (series.astype(str).str.lower() == "anomaly").to_numpy().astype(np.int8)
+
+
+def find_anomaly_columns(df):
+    return [c for c in df.columns if "anomaly" in c.lower()]
+
+
+def score_health(df, anomaly_cols=None):
+    df = df.copy()
+    if anomaly_cols is None:
+        anomaly_cols = find_anomaly_columns(df)
+
+    count = np.zeros(len(df), dtype=np.int8)
+    with step("anomaly_flags"):
+        for col in anomaly_cols:
+            flags = anomaly_flags(df[col])
+            df[col] = flags
+            count += flags
+
+    df["anomaly_count"] = count
+    health = 100 - (count / len(anomaly_cols)) * 100
+    df["health_score"] = np.round(health, 2)
+    return df
+
+
+# ---------------------------------------
+# RISK LEVEL + ACTION
+# Scores are bucketed with searchsorted, then the bucket index picks the
+# level and action from categoricals. NaN scores fall in CRITICAL, like
+# the row-wise classify_risk().
+# ---------------------------------------
+def classify_risk_levels(scores, normal_min=NORMAL_MIN_SCORE, warning_min=WARNING_MIN_SCORE):
+    if warning_min > normal_min:
+        raise ValueError("warning_min must not be above normal_min")
+
+    scores = np.asarray(scores, dtype=np.float64)
+    bucket = np.searchsorted([warning_min, normal_min], scores, side="right")
+    bucket[np.isnan(scores)] = 0
+
+    # bucket 0 → CRITICAL, 1 → WARNING, 2 → NORMAL
+    level_codes = np.array([RISK_LEVELS.index(level) for level in ("CRITICAL", "WARNING", "NORMAL")],
+                           dtype=np.int8)[bucket]
+
+    actions = [RISK_ACTIONS[level] for level in RISK_LEVELS]
+    risk = pd.Categorical.from_codes(level_codes, categories=RISK_LEVELS)
+    action = pd.Categorical.from_codes(level_codes, categories=actions)
+    return risk, action
+
+
+def score_risk(df, normal_min=NORMAL_MIN_SCORE, warning_min=WARNING_MIN_SCORE):
+    df = df.copy()
+    risk, action = classify_risk_levels(df["health_score"].to_numpy(), normal_min, warning_min)
+    df["risk_level"] = risk
+    df["recommended_action"] = action
+    return df
+
+
+# ---------------------------------------
+# CHUNKED FILE SCORING
+# Anomaly columns → health → risk in one pass over a CSV of any size;
+# memory stays at one chunk.
+# ---------------------------------------
+def score_file(in_path, out_path, chunk_rows=CHUNK_ROWS,
+               normal_min=NORMAL_MIN_SCORE, warning_min=WARNING_MIN_SCORE):
+    header = pd.read_csv(in_path, nrows=0).columns
+    dtypes = {c: d for c, d in {**FLOAT_COLUMNS, **INT_COLUMNS}.items() if c in header}
+    anomaly_cols = find_anomaly_columns(pd.DataFrame(columns=header))
+
+    rows = 0
+    first = True
+    for chunk in pd.read_csv(in_path, dtype=dtypes, chunksize=chunk_rows):
+        chunk = score_risk(score_health(chunk, anomaly_cols), normal_min, warning_min)
+        chunk.to_csv(out_path, mode="w" if first else "a", header=first, index=False)
+        rows += len(chunk)
+        first = False
+    return rows
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    rows = score_file("ml_dataset_with_anomalies.csv", "ml_dataset_with_risk_levels.csv")
+
+    print(f"✅ Scored {rows} rows in {time.perf_counter() - start:.3f}s")
+    print("📁 Output file: ml_dataset_with_risk_levels.csv")
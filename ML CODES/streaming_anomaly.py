@@ -0,0 +1,207 @@
+import time
+
+import numpy as np
+
+from phase2_anomaly_detection import features as ANOMALY_FEATURES
+from streaming_features import StreamingFeatures
+from telemetry_schema import load_csv
+
+# ---------------- DETECTOR CONFIG ----------------
+N_TREES = 25
+MAX_DEPTH = 8
+WINDOW = 250             # samples per mass window (reference ↔ latest swap)
+SIZE_LIMIT = 0.1         # fraction of WINDOW below which a node is terminal
+CONTAMINATION = 0.05     # same anomaly share as the phase2 IsolationForest
+SEED = 42
+
+
+# ---------------- HALF-SPACE TREES ----------------
+# Streaming anomaly detector (Tan, Ting & Liu 2011) for the phase2 features.
+#
+#   - trees are complete binary trees with random half-space splits, built
+#     once; every split is tested in one NumPy comparison, then all trees
+#     are walked together, one loop per level
+#   - node masses are counted in a "latest" window and swapped into the
+#     "reference" profile every WINDOW samples, which tracks slow drift
+#   - memory is fixed: 2 mass tables of N_TREES × 2^(MAX_DEPTH+1) + 1 window
+#
+# The first WINDOW samples only learn feature ranges and the first mass
+# profile; they are reported as Normal with score 0.
+#
+# Output matches phase2: anomaly (-1/1), anomaly_score (< 0 is anomalous,
+# relative distance to the CONTAMINATION quantile of the previous window)
+# and anomaly_label.
+class HalfSpaceTrees:
+
+    def __init__(self, features=ANOMALY_FEATURES, n_trees=N_TREES, max_depth=MAX_DEPTH,
+                 window=WINDOW, size_limit=SIZE_LIMIT, contamination=CONTAMINATION, seed=SEED):
+        self.features = list(features)
+        self.n_trees = n_trees
+        self.max_depth = max_depth
+        self.window = window
+        self.size_limit = size_limit * window
+        self.contamination = contamination
+
+        rng = np.random.default_rng(seed)
+        n_dims = len(self.features)
+        n_internal = 2 ** max_depth - 1
+        n_nodes = 2 ** (max_depth + 1) - 1
+
+        self.split_dim = np.empty((n_trees, n_internal), dtype=np.intp)
+        self.split_val = np.empty((n_trees, n_internal), dtype=np.float64)
+        for t in range(n_trees):
+            self._build_tree(t, rng, n_dims)
+
+        self.reference = np.zeros((n_trees, n_nodes), dtype=np.float64)
+        self.latest = np.zeros((n_trees, n_nodes), dtype=np.float64)
+        self._trees = np.arange(n_trees)
+        self._depth_weight = 2.0 ** np.arange(max_depth + 1)
+
+        # Flat views: np.take on 1-D arrays is much cheaper per sample than
+        # 2-D fancy indexing. Internal node i of tree t is t·n_internal + i;
+        # _left is its left child in the same numbering (right = left + 1),
+        # _to_node moves the path to the mass tables' t·n_nodes + i.
+        self._dim_flat = self.split_dim.ravel()
+        self._val_flat = self.split_val.ravel()
+        split_offset = self._trees * n_internal
+        self._left = 2 * np.arange(n_trees * n_internal) + 1 - np.repeat(split_offset, n_internal)
+        self._root = split_offset
+        self._to_node = self._trees * n_nodes - split_offset
+        self._cut = None    # split values in raw feature units, set after warm-up
+
+        # warm-up buffer, then reused for the window's scores
+        self._warmup = np.empty((window, n_dims), dtype=np.float64)
+        self._scores = np.empty(window, dtype=np.float64)
+        self._threshold = None
+        self.seen = 0
+
+    # Work space per dimension: random point s in [0, 1] ± 2·max(s, 1 − s)
+    def _build_tree(self, t, rng, n_dims):
+        s = rng.random(n_dims)
+        ws = 2 * np.maximum(s, 1 - s)
+        stack = [(0, s - ws, s + ws)]
+        while stack:
+            node, low, high = stack.pop()
+            if node >= self.split_dim.shape[1]:
+                continue
+            q = rng.integers(n_dims)
+            mid = (low[q] + high[q]) / 2
+            self.split_dim[t, node] = q
+            self.split_val[t, node] = mid
+            left_high = high.copy()
+            left_high[q] = mid
+            right_low = low.copy()
+            right_low[q] = mid
+            stack.append((2 * node + 1, low, left_high))
+            stack.append((2 * node + 2, right_low, high))
+
+    @property
+    def ready(self):
+        return self._threshold is not None
+
+    # Flat node index (tree offset included) at every level, for every tree:
+    # shape (MAX_DEPTH + 1, N_TREES). Raw (unscaled) sample.
+    # All splits are tested at once, so each level is a single lookup.
+    def _path(self, raw):
+        child = self._left + (raw.take(self._dim_flat) > self._cut)
+        path = np.empty((self.max_depth + 1, self.n_trees), dtype=np.intp)
+        path[0] = self._root
+        for level in range(self.max_depth):
+            child.take(path[level], out=path[level + 1])
+        path += self._to_node
+        return path
+
+    # Each tree stops at its first node with reference mass under the size
+    # limit (or at a leaf); score = Σ mass × 2^depth. Low score = anomalous.
+    def _mass_score(self, path):
+        mass = self.reference.ravel().take(path)
+        terminal = mass < self.size_limit
+        terminal[-1] = True
+        depth = terminal.argmax(axis=0)
+        return float((mass[depth, self._trees] * self._depth_weight.take(depth)).sum())
+
+    def _end_window(self):
+        self.reference, self.latest = self.latest, self.reference
+        self.latest[:] = 0
+        self._threshold = float(np.quantile(self._scores, self.contamination))
+
+    def _warm_up(self, raw):
+        self._warmup[self.seen] = raw
+        self.seen += 1
+        if self.seen < self.window:
+            return
+
+        low = self._warmup.min(axis=0)
+        span = np.where(self._warmup.max(axis=0) > low, self._warmup.max(axis=0) - low, 1.0)
+        # x > low + val·span  ⇔  (x − low) / span > val: scale the splits once
+        # instead of every sample
+        self._cut = low.take(self._dim_flat) + self._val_flat * span.take(self._dim_flat)
+        paths = [self._path(v) for v in self._warmup]
+        for path in paths:
+            self.reference.ravel()[path] += 1
+        for i, path in enumerate(paths):
+            self._scores[i] = self._mass_score(path)
+        self._threshold = float(np.quantile(self._scores, self.contamination))
+
+    # ---------- one sample ----------
+    def score_one(self, sample):
+        raw = np.fromiter((sample[f] for f in self.features), dtype=np.float64,
+                          count=len(self.features))
+        if not self.ready:
+            self._warm_up(raw)
+            return {"anomaly": 1, "anomaly_score": 0.0, "anomaly_label": "Normal"}
+
+        path = self._path(raw)
+        score = self._mass_score(path)
+        self.latest.ravel()[path] += 1
+
+        threshold = self._threshold
+        i = self.seen % self.window
+        self._scores[i] = score
+        self.seen += 1
+        if i == self.window - 1:
+            self._end_window()
+
+        relative = score / threshold - 1 if threshold > 0 else score - threshold
+        anomaly = -1 if relative < 0 else 1
+        return {
+            "anomaly": anomaly,
+            "anomaly_score": relative,
+            "anomaly_label": "Anomaly" if anomaly == -1 else "Normal",
+        }
+
+
+# ---------------- MANY FREEZERS ----------------
+# One detector per device, created on first sample.
+class StreamingAnomalyMonitor:
+
+    def __init__(self, **detector_kwargs):
+        self._detector_kwargs = detector_kwargs
+        self.detectors = {}
+
+    def score(self, device, sample):
+        detector = self.detectors.get(device)
+        if detector is None:
+            detector = self.detectors[device] = HalfSpaceTrees(**self._detector_kwargs)
+        return detector.score_one(sample)
+
+
+if __name__ == "__main__":
+    # Raw telemetry → streaming phase1 features → streaming phase2 scores
+    raw = load_csv("telemetry.csv").sort_values("ts")
+    features = StreamingFeatures()
+    # default WINDOW: a 50-sample window makes the 5% quantile threshold
+    # too noisy and flags ~14% of the replay
+    monitor = StreamingAnomalyMonitor()
+
+    samples = [row for row in map(features.update, raw.to_dict("records")) if row is not None]
+    samples = samples * 20   # replay for a longer stream
+
+    start = time.perf_counter()
+    results = [monitor.score("freezer_01", s) for s in samples]
+    elapsed = time.perf_counter() - start
+
+    anomalies = sum(r["anomaly"] == -1 for r in results)
+    print(f"Per-sample scoring: {elapsed / len(samples) * 1e6:.1f} µs")
+    print(f"Anomalies: {anomalies} / {len(samples)} ({anomalies / len(samples):.1%})")
+    print("✅ Streaming anomaly detection completed")
@@ -0,0 +1,144 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from phase1_feature_engineering import build_features
+from telemetry_schema import DEVICE_COLUMN, FLOAT_COLUMNS, INT_COLUMNS, load_csv
+
+# ---------------- STREAM CONFIG ----------------
+DEFAULT_DEVICE = "freezer_01"
+
+
+# ---------------- INCREMENTAL PHASE 1 ----------------
+# Same features as build_features(), one sample (or micro-batch) at a time.
+# Per device only the previous raw sample is kept, so state is O(1).
+#
+# Batch semantics reproduced exactly:
+#   - temp_delta of a sample uses the previous sample even if that one was
+#     dropped, and the first sample of a device is dropped (diff → NaN)
+#   - any NaN in a sample drops it, then ±inf becomes 0
+#   - float columns follow the schema (float32): a float32 +, -, / computed
+#     in double and rounded once to float32 is bit-identical to the float32 op
+#
+# Samples must arrive in time order per device; a late sample is counted in
+# `late` and skipped, because the batch path would have sorted it earlier.
+class StreamingFeatures:
+
+    def __init__(self):
+        self._last = {}
+        self.late = 0
+
+    @staticmethod
+    def _typed(sample):
+        row = {}
+        for key, value in sample.items():
+            if value is None:
+                value = math.nan
+            if key in FLOAT_COLUMNS:
+                value = float(np.float32(value))
+            elif key in INT_COLUMNS and not (isinstance(value, float) and math.isnan(value)):
+                value = int(value)
+            row[key] = value
+        return row
+
+    # ---------- one sample ----------
+    def update(self, sample, device=DEFAULT_DEVICE):
+        row = self._typed(sample)
+        last = self._last.get(device)
+
+        if last is not None and row["ts"] < last["ts"]:
+            self.late += 1
+            return None
+        self._last[device] = row
+
+        t = row["temperature"]
+        power = row["power_watts"]
+        comp = row["compressor_rpm"]
+        fan = row["fan_rpm"]
+
+        row["superheat"] = _f32(t - row["evap_temp"])
+        row["temp_delta"] = math.nan if last is None else _f32(t - last["temperature"])
+        row["power_per_rpm"] = _f32(_div(power, comp))
+        row["fan_efficiency"] = _f32(_div(fan, power))
+        row["vibration_flag"] = 1 if row["vibration"] > 0 else 0
+
+        # dropna() then replace([inf, -inf], 0)
+        for key, value in row.items():
+            if isinstance(value, float):
+                if value != value:
+                    return None
+                if value in (math.inf, -math.inf):
+                    row[key] = 0.0
+        return row
+
+    # ---------- micro-batch ----------
+    # Runs build_features() on [previous raw sample] + batch, per device.
+    # The carried sample always comes out first with a NaN temp_delta, so the
+    # batch's own dropna() removes it again.
+    def update_batch(self, df):
+        if DEVICE_COLUMN not in df:
+            df = df.assign(**{DEVICE_COLUMN: DEFAULT_DEVICE})
+
+        out = []
+        for device, batch in df.groupby(DEVICE_COLUMN, sort=False):
+            batch = batch.sort_values("ts")
+            last = self._last.get(device)
+
+            if last is not None:
+                late = batch["ts"] < last["ts"]
+                self.late += int(late.sum())
+                batch = batch[~late]
+            if batch.empty:
+                continue
+
+            if last is not None:
+                carried = pd.DataFrame([last]).assign(**{DEVICE_COLUMN: device})
+            else:
+                carried = batch.iloc[:0]
+            carried = carried.astype({c: t for c, t in batch.dtypes.items() if c in carried})
+            merged = pd.concat([carried, batch], ignore_index=True)
+            out.append(build_features(merged))
+
+            self._last[device] = self._typed(batch.iloc[-1].to_dict())
+
+        if not out:
+            return df.iloc[:0]
+        return pd.concat(out, ignore_index=True)
+
+
+def _f32(x):
+    return float(np.float32(x))
+
+
+# IEEE division for plain Python floats (x/0 → ±inf, 0/0 → NaN)
+def _div(a, b):
+    if b == 0:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+if __name__ == "__main__":
+    raw = load_csv("telemetry.csv")
+    expected = build_features(raw).reset_index(drop=True)
+
+    # Sample by sample, in time order
+    stream = StreamingFeatures()
+    samples = raw.sort_values("ts").to_dict("records")
+    start = time.perf_counter()
+    rows = [stream.update(s) for s in samples]
+    elapsed = time.perf_counter() - start
+    live = pd.DataFrame([r for r in rows if r is not None])
+
+    cols = ["superheat", "temp_delta", "power_per_rpm", "fan_efficiency", "vibration_flag"]
+    same = len(live) == len(expected) and all(
+        np.array_equal(live[c].to_numpy(dtype="float64"), expected[c].to_numpy(dtype="float64"))
+        for c in cols
+    )
+
+    print(f"Per-sample latency: {elapsed / len(samples) * 1e6:.1f} µs")
+    print(f"Matches batch features: {same}")
+    print("✅ Streaming feature check completed")
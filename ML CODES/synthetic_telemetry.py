@@ -0,0 +1,263 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from telemetry_schema import DEVICE_COLUMN, FLOAT_COLUMNS, INT_COLUMNS, save_csv
+
+# ---------------- GENERATOR CONFIG ----------------
+# Same columns, order and dtypes as telemetry.csv
+TELEMETRY_COLUMNS = [
+    "ts", "temperature", "evap_temp", "humidity", "door_status", "vibration",
+    "power_watts", "fan_rpm", "compressor_rpm", "pressure", "valve_steps",
+]
+
+CADENCE_S = 10               # firmware upload interval
+START = "2026-01-01T00:00:00Z"
+
+SETPOINT = -18.0             # cabinet °C
+BAND = 2.0                   # thermostat hysteresis (°C, peak to peak)
+CYCLE_MIN = (15, 30)         # compressor cycle length, minutes
+DUTY = (0.4, 0.6)            # compressor on-share of a cycle
+DOOR_OPENS_PER_HOUR = 2.0
+DOOR_OPEN_S = (10, 60)
+DOOR_BUMP = 3.0              # °C a door opening adds, decaying ...
+DOOR_TAU_S = 300             # ... with this time constant
+
+FAULT_RATE = 0.01            # share of rows inside a fault episode
+CHUNK_DAYS = 30              # days per device generated (and written) at once
+
+
+# ---------------- FAULTS ----------------
+# Faults are short episodes written into raw telemetry, so phase1 derived
+# features carry them too. "rows" is (episodes, EPISODE_ROWS): every
+# injector handles all episodes of its type in one go.
+#
+# vibration_spike      the vibration input is a digital 0/1 sensor, so a
+#                      spike is the sensor firing with a compressor / fan
+#                      RPM surge (loose mount, failing bearing)
+# power_drift          power draw ramping up at unchanged RPM (worn
+#                      compressor, refrigerant loss)
+# superheat_excursion  evaporator temperature dropping away from the cabinet
+#                      (starved evaporator, stuck expansion valve)
+FAULT_TYPES = ["none", "vibration_spike", "power_drift", "superheat_excursion"]
+EPISODE_ROWS = 3             # samples per episode (30 s at the 10 s cadence)
+
+
+def _set(df, column, rows, values):
+    data = df[column].to_numpy(copy=True)
+    data[rows] = values
+    df[column] = data
+
+
+def _vibration_spike(df, rows, rng):
+    _set(df, "vibration", rows, 1)
+    surge = rng.uniform(1.3, 1.5, rows.shape)
+    for col in ("compressor_rpm", "fan_rpm"):
+        rpm = df[col].to_numpy()
+        running = rpm[rpm > 0]
+        nominal = np.median(running) if len(running) else 1000
+        _set(df, col, rows, np.clip(np.maximum(rpm[rows], nominal) * surge, 0, 32767))
+
+
+def _power_drift(df, rows, rng):
+    # ramps from the highest clean draw to 20-50 % above it
+    ceiling = df["power_watts"].max()
+    peak = rng.uniform(1.2, 1.5, (len(rows), 1))
+    ramp = 1.0 + (peak - 1.0) * np.linspace(0.0, 1.0, rows.shape[1])
+    _set(df, "power_watts", rows, ceiling * ramp)
+
+
+def _superheat_excursion(df, rows, rng):
+    evap = df["evap_temp"].to_numpy()
+    _set(df, "evap_temp", rows, evap[rows] - rng.uniform(4.0, 6.0, rows.shape))
+
+
+FAULT_INJECTORS = {
+    "vibration_spike": _vibration_spike,
+    "power_drift": _power_drift,
+    "superheat_excursion": _superheat_excursion,
+}
+
+
+# Adds a "fault" column with the FAULT_TYPES code (0 = clean) of every row.
+# Episodes never overlap and never touch the first slot (phase1 drops the
+# first row of a stream).
+def add_faults(df, rate=FAULT_RATE, episode_rows=EPISODE_ROWS, seed=0):
+    rng = np.random.default_rng(seed)
+    df = df.reset_index(drop=True)
+    fault = np.zeros(len(df), dtype=np.int8)
+
+    kinds = list(FAULT_INJECTORS)
+    per_kind = round(rate * len(df) / episode_rows / len(kinds))
+    if rate > 0:
+        per_kind = max(per_kind, 1)
+    n_slots = len(df) // episode_rows
+    if per_kind * len(kinds) > n_slots - 1:
+        raise ValueError(f"{len(df)} rows is too few for {per_kind} episodes per fault type")
+
+    slots = rng.choice(np.arange(1, n_slots), size=per_kind * len(kinds), replace=False)
+    slots = slots.reshape(len(kinds), per_kind)
+    for kind, kind_slots in zip(kinds, slots):
+        rows = kind_slots[:, None] * episode_rows + np.arange(episode_rows)
+        FAULT_INJECTORS[kind](df, rows, rng)
+        fault[rows] = FAULT_TYPES.index(kind)
+
+    df["fault"] = fault
+    return df
+
+
+# ---------------- ONE FREEZER ----------------
+# Vectorized physics-ish model of a freezer at the firmware cadence:
+#   - compressor cycles with random length / duty; the cabinet cools while
+#     it runs and warms while it is off (DS18B20 0.0625 °C steps)
+#   - door openings (Poisson) bump cabinet temperature and humidity, and
+#     stop the evaporator fan while open
+#   - evaporator runs ~6.5 °C below the cabinet with the compressor on
+#     (superheat), ~1 °C when off; EEV follows superheat
+#   - power / pressure / RPM / vibration follow compressor state, with a
+#     start-up power spike
+def _compressor_cycles(n, rng):
+    cycles = []
+    total = 0
+    while total < n:
+        length = int(rng.uniform(*CYCLE_MIN) * 60 / CADENCE_S)
+        on = max(1, int(length * rng.uniform(*DUTY)))
+        cycles.append((length, on))
+        total += length
+
+    lengths = np.array([c[0] for c in cycles])
+    on_rows = np.array([c[1] for c in cycles])
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)[:n]
+    pos = np.arange(n) - starts
+    length = np.repeat(lengths, lengths)[:n]
+    on_len = np.repeat(on_rows, lengths)[:n]
+
+    on = pos < on_len
+    # sawtooth: top → bottom while on, bottom → top while off
+    frac = np.where(on, pos / on_len, (pos - on_len) / np.maximum(length - on_len, 1))
+    temp = np.where(on, BAND / 2 - BAND * frac, -BAND / 2 + BAND * frac)
+    return on, pos, temp
+
+
+def _door(n, rng):
+    hours = n * CADENCE_S / 3600
+    opens = rng.poisson(DOOR_OPENS_PER_HOUR * hours)
+    start = rng.integers(0, n, opens)
+    duration = rng.integers(DOOR_OPEN_S[0] // CADENCE_S, DOOR_OPEN_S[1] // CADENCE_S + 1, opens)
+
+    edges = np.zeros(n + 1, dtype=np.int32)
+    np.add.at(edges, start, 1)
+    np.add.at(edges, np.minimum(start + duration, n), -1)
+    door = (np.cumsum(edges[:n]) > 0).astype(np.int8)
+
+    # each open sample adds heat (an average opening adds DOOR_BUMP) that
+    # decays exponentially
+    gain = DOOR_BUMP * 2 * CADENCE_S / sum(DOOR_OPEN_S)
+    decay = np.exp(-CADENCE_S / DOOR_TAU_S)
+    bump = lfilter([gain], [1.0, -decay], door)
+    return door, np.minimum(bump, DOOR_BUMP * 2)
+
+
+def generate_device(n_rows, start=START, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_rows
+
+    on, pos, sawtooth = _compressor_cycles(n, rng)
+    door, bump = _door(n, rng)
+
+    temperature = np.round((SETPOINT + sawtooth + bump + rng.normal(0, 0.05, n)) / 0.0625) * 0.0625
+    superheat = np.where(on, rng.normal(6.5, 0.3, n), rng.normal(1.0, 0.2, n))
+    evap_temp = temperature - np.round(superheat, 1)
+    humidity = np.clip(np.round(75 + 2 * bump + rng.normal(0, 0.5, n), 1), 0, 100)
+
+    startup = on & (pos < 2)
+    power = np.where(on, rng.normal(190, 8, n), rng.normal(8, 2, n))
+    power = np.round(np.where(startup, power * 1.5, power))
+    compressor_rpm = np.where(on, rng.normal(1500, 50, n), 0)
+    fan_rpm = np.where(door == 1, 0, rng.normal(1100, 40, n))
+    pressure = np.round(np.where(on, rng.normal(250, 8, n), rng.normal(160, 5, n)))
+    valve_steps = np.where(on, np.clip(50 + 8 * (superheat - 6.5) + rng.normal(0, 3, n), 0, 100), 0)
+
+    vibration = on.astype(np.int8)
+    flip = rng.random(n) < 0.01
+    vibration[flip] ^= 1
+
+    # firmware upload jitter: ± 30 ms around the cadence
+    offsets = np.arange(n, dtype=np.int64) * CADENCE_S * 1000 + rng.integers(-30, 31, n)
+    ts = pd.Timestamp(start) + pd.to_timedelta(offsets, unit="ms")
+
+    df = pd.DataFrame({
+        "ts": ts,
+        "temperature": temperature,
+        "evap_temp": evap_temp,
+        "humidity": humidity,
+        "door_status": door,
+        "vibration": vibration,
+        "power_watts": power,
+        "fan_rpm": fan_rpm,
+        "compressor_rpm": compressor_rpm,
+        "pressure": pressure,
+        "valve_steps": valve_steps,
+    })
+    dtypes = {c: d for c, d in {**FLOAT_COLUMNS, **INT_COLUMNS}.items() if c in df}
+    return df[TELEMETRY_COLUMNS].astype(dtypes)
+
+
+# ---------------- FLEET ----------------
+# N devices × M days, one frame per (device, CHUNK_DAYS) block so any size
+# can be streamed to disk. Device i always gets the same data for a seed.
+def iter_fleet(n_devices, days, fault_rate=FAULT_RATE, start=START, seed=0, labels=False):
+    rows_per_day = 86400 // CADENCE_S
+    for device in range(n_devices):
+        device_id = f"freezer_{device + 1:02d}"
+        for first_day in range(0, days, CHUNK_DAYS):
+            n_days = min(CHUNK_DAYS, days - first_day)
+            chunk_start = pd.Timestamp(start) + pd.Timedelta(days=first_day)
+            chunk_seed = [seed, device, first_day]
+            df = generate_device(n_days * rows_per_day, chunk_start, chunk_seed)
+            if fault_rate > 0:
+                df = add_faults(df, fault_rate, seed=chunk_seed)
+                if not labels:
+                    df = df.drop(columns="fault")
+            if n_devices > 1:
+                df.insert(1, DEVICE_COLUMN, device_id)
+            yield device_id, df
+
+
+def generate_fleet(n_devices, days, **kwargs):
+    return pd.concat([df for _, df in iter_fleet(n_devices, days, **kwargs)], ignore_index=True)
+
+
+# Exactly n_rows of single-freezer telemetry (benchmarks)
+def generate_rows(n_rows, fault_rate=FAULT_RATE, seed=0):
+    df = generate_device(n_rows, seed=seed)
+    if fault_rate > 0:
+        df = add_faults(df, fault_rate, seed=seed).drop(columns="fault")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic freezer telemetry in the telemetry.csv schema")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--fault-rate", type=float, default=FAULT_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--labels", action="store_true", help="keep the injected 'fault' column")
+    parser.add_argument("--output", default="synthetic_telemetry.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if os.path.exists(args.output):
+        os.remove(args.output)
+    rows = 0
+    for _, df in iter_fleet(args.devices, args.days, args.fault_rate, seed=args.seed, labels=args.labels):
+        save_csv(df, args.output, append=rows > 0)
+        rows += len(df)
+
+    print(f"✅ {rows} rows for {args.devices} freezers × {args.days} days "
+          f"in {time.perf_counter() - start:.1f}s")
+    print(f"📁 Output file: {args.output}")
@@ -0,0 +1,220 @@
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from mqtt_ingest import TOPIC_FIELDS
+from telemetry_schema import DEVICE_COLUMN
+
+# ---------------- FRAME FORMAT ----------------
+# One fixed-size, little-endian frame per SensorData sample (ESP32 is
+# little-endian, so the sketch can send the struct bytes as they are):
+#
+#   struct __attribute__((packed)) FreezerFrameV1 {   // 40 bytes
+#     char     magic[2];        // "FZ"
+#     uint8_t  version;         // 1
+#     uint8_t  reserved;        // 0
+#     uint32_t device;          // fleet number → "freezer_<nn>"
+#     int64_t  ts_ms;           // epoch ms (NTP); 0 = stamp on arrival
+#     float    temp;            // °C
+#     float    humidity;        // %
+#     float    current;         // A, NAN when there is no INA219
+#     float    power;           // W
+#     int16_t  high_pressure;
+#     int16_t  low_pressure;
+#     int16_t  inventory;
+#     int8_t   door;            // 0 closed, 1 open
+#     int8_t   vibration;
+#   };
+#
+# A batch is frames of one version back to back (one MQTT payload or HTTP
+# body can carry any number). A new layout gets a new version number and
+# its own dtype below; old senders keep decoding.
+MAGIC = b"FZ"
+
+FRAME_V1 = np.dtype([
+    ("magic", "S2"),
+    ("version", "u1"),
+    ("reserved", "u1"),
+    ("device", "<u4"),
+    ("ts_ms", "<i8"),
+    ("temp", "<f4"),
+    ("humidity", "<f4"),
+    ("current", "<f4"),
+    ("power", "<f4"),
+    ("high_pressure", "<i2"),
+    ("low_pressure", "<i2"),
+    ("inventory", "<i2"),
+    ("door", "i1"),
+    ("vibration", "i1"),
+])
+
+FRAME_VERSIONS = {1: FRAME_V1}
+CURRENT_VERSION = 1
+
+# Frame fields that carry sensor values (the rest is header)
+VALUE_FIELDS = [f for f in FRAME_V1.names if f in TOPIC_FIELDS]
+
+
+# ---------------- ENCODE ----------------
+# Single frame, as the firmware would build it
+def encode_frame(device, ts_ms, temp, humidity, door, vibration, power,
+                 high_pressure, low_pressure, inventory, current=float("nan")):
+    frame = np.zeros(1, dtype=FRAME_V1)
+    frame[0] = (MAGIC, CURRENT_VERSION, 0, device, ts_ms, temp, humidity, current,
+                power, high_pressure, low_pressure, inventory, door, vibration)
+    return frame.tobytes()
+
+
+# Telemetry frame (columns named like mqtt_ingest records) → one batch
+def encode_batch(df, device=1):
+    frames = np.zeros(len(df), dtype=FRAME_V1)
+    frames["magic"] = MAGIC
+    frames["version"] = CURRENT_VERSION
+    frames["device"] = device
+    frames["ts_ms"] = pd.to_datetime(df["ts"], utc=True).to_numpy(dtype="datetime64[ms]").view(np.int64)
+    for field in VALUE_FIELDS:
+        column = TOPIC_FIELDS[field]
+        if column in df:
+            frames[field] = df[column].to_numpy()
+        elif FRAME_V1[field].kind == "f":
+            frames[field] = np.nan
+    return frames.tobytes()
+
+
+# ---------------- DECODE ----------------
+# Zero-copy view of a batch: one frombuffer and two vectorized header
+# checks, no per-frame or per-field Python.
+def decode_batch(payload):
+    if len(payload) < 4 or payload[:2] != MAGIC:
+        raise ValueError("not a telemetry frame batch")
+    version = payload[2]
+    dtype = FRAME_VERSIONS.get(version)
+    if dtype is None:
+        raise ValueError(f"unknown frame version {version}")
+    if len(payload) % dtype.itemsize:
+        raise ValueError(f"batch of {len(payload)} bytes is not a whole number of "
+                         f"{dtype.itemsize}-byte v{version} frames")
+
+    frames = np.frombuffer(payload, dtype=dtype)
+    bad = (frames["magic"] != MAGIC) | (frames["version"] != version)
+    if bad.any():
+        raise ValueError(f"frame {int(np.argmax(bad))} of the batch has a corrupt header")
+    return frames
+
+
+# Structured array → telemetry-style frame (one column copy per field)
+def frames_to_frame(frames, received=None):
+    ts_ms = frames["ts_ms"]
+    if received is not None:
+        ts_ms = np.where(ts_ms == 0, int(received * 1000), ts_ms)
+    devices = frames["device"]
+    names = {d: f"freezer_{d:02d}" for d in np.unique(devices).tolist()}
+
+    data = {
+        "ts": pd.to_datetime(ts_ms, unit="ms", utc=True),
+        DEVICE_COLUMN: pd.Categorical.from_codes(
+            np.searchsorted(list(names), devices), list(names.values())),
+    }
+    for field in VALUE_FIELDS:
+        data[TOPIC_FIELDS[field]] = frames[field]
+    return pd.DataFrame(data)
+
+
+# ---------------- BENCHMARK ----------------
+# The same samples as the firmware sends them today:
+#   json   uploadData() body, one HTTP POST per sample
+#   mqtt   mqttPublish(), one text publish per field (topic + payload bytes)
+#   frame  one FreezerFrameV1 per sample, decoded as one batch
+def _arduino(value):
+    # String(float) prints two decimals, String(int) none
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def firmware_payloads(frames):
+    rows = frames[VALUE_FIELDS].tolist()
+    bodies, publishes = [], []
+    for row in rows:
+        # fields a sketch doesn't have (NaN) are left out, as uploadData() does
+        values = {k: v if isinstance(v, float) else int(v)
+                  for k, v in zip(VALUE_FIELDS, row) if v == v}
+        body = "{" + ",".join(f'"{k}":{_arduino(v)}' for k, v in values.items()) + "}"
+        bodies.append(body.encode())
+        publishes.append([(f"freezer/{k}", _arduino(v).encode()) for k, v in values.items()])
+    return bodies, publishes
+
+
+def _decode_json(bodies):
+    rows = [json.loads(body) for body in bodies]
+    return {field: np.array([r[field] for r in rows]) for field in VALUE_FIELDS}
+
+
+def _decode_mqtt(publishes):
+    columns = {field: [] for field in VALUE_FIELDS}
+    for tick in publishes:
+        for topic, payload in tick:
+            columns[topic.split("/")[1]].append(float(payload))
+    return {field: np.array(values) for field, values in columns.items()}
+
+
+def _rate(fn, arg, n):
+    start = time.perf_counter()
+    fn(arg)
+    return n / (time.perf_counter() - start)
+
+
+def benchmark(n_samples, seed=0):
+    from synthetic_telemetry import generate_rows
+
+    df = generate_rows(n_samples, seed=seed)
+    rng = np.random.default_rng(seed)
+    df["low_pressure"] = rng.integers(20, 40, n_samples)
+    df["inventory"] = rng.integers(0, 30, n_samples)
+    df["current"] = df["power_watts"] / 230.0
+
+    batch = encode_batch(df)
+    frames = decode_batch(batch)
+    bodies, publishes = firmware_payloads(frames)
+
+    results = {
+        "json": {
+            "bytes_per_sample": sum(map(len, bodies)) / n_samples,
+            "messages_per_sample": 1,
+            "samples_per_s": _rate(_decode_json, bodies, n_samples),
+        },
+        "mqtt_text": {
+            "bytes_per_sample": sum(len(t) + len(p) for tick in publishes for t, p in tick) / n_samples,
+            "messages_per_sample": len(publishes[0]),
+            "samples_per_s": _rate(_decode_mqtt, publishes, n_samples),
+        },
+        "frame": {
+            "bytes_per_sample": len(batch) / n_samples,
+            "messages_per_sample": 1,
+            "samples_per_s": _rate(decode_batch, batch, n_samples),
+        },
+        "frame_to_dataframe": {
+            "bytes_per_sample": len(batch) / n_samples,
+            "messages_per_sample": 1,
+            "samples_per_s": _rate(lambda b: frames_to_frame(decode_batch(b)), batch, n_samples),
+        },
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary telemetry frames vs the firmware's JSON / text payloads")
+    parser.add_argument("--samples", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # same size as the packed C struct, so the sketch can send it as is
+    assert struct.calcsize("<2sBBIqffffhhhbb") == FRAME_V1.itemsize
+
+    results = benchmark(args.samples)
+    print(f"{'payload':<20} {'bytes/sample':>13} {'msgs/sample':>12} {'decode samples/s':>17}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['bytes_per_sample']:>13.1f} {r['messages_per_sample']:>12} "
+              f"{r['samples_per_s']:>17,.0f}")
+    print(f"✅ {args.samples} samples, v{CURRENT_VERSION} frames of {FRAME_V1.itemsize} bytes")
@@ -0,0 +1,115 @@
+import pandas as pd
+
+# ---------------- PIVOT CONFIG ----------------
+INPUT_FILES = ["ABC.csv"]
+OUTPUT_FILE = "telemetry_from_firestore.csv"
+
+CADENCE = "10s"      # same tick as telemetry.csv
+TOLERANCE = "15s"    # a reading older than this is a gap, not a value
+
+# Wide schema expected by phase1_feature_engineering.py
+TELEMETRY_COLUMNS = [
+    "temperature",
+    "evap_temp",
+    "humidity",
+    "door_status",
+    "vibration",
+    "power_watts",
+    "fan_rpm",
+    "compressor_rpm",
+    "pressure",
+    "valve_steps",
+]
+
+# Firestore sensor names → telemetry column
+SENSOR_ALIASES = {
+    "freezer_temp": "temperature",
+    "temperature": "temperature",
+    "evaporator_temperature": "evap_temp",
+    "evap_temp": "evap_temp",
+    "humidity": "humidity",
+    "door": "door_status",
+    "door_status": "door_status",
+    "vibration": "vibration",
+    "power": "power_watts",
+    "power_watts": "power_watts",
+    "fan_rpm": "fan_rpm",
+    "compressor_rpm": "compressor_rpm",
+    "pressure": "pressure",
+    "valve_steps": "valve_steps",
+}
+
+
+# ---------------- NORMALIZE LONG FORMAT ----------------
+# Fixes the schema drift of the exports in one pass:
+#   - `vaule` (typo in some documents) is folded into `value`
+#   - sensor names are mapped onto telemetry columns
+#   - mixed timestamp formats are parsed to UTC
+#   - rows without ts / sensor / value are dropped
+def normalize_long(df):
+    value = pd.to_numeric(df["value"], errors="coerce") if "value" in df else None
+    if "vaule" in df:
+        typo = pd.to_numeric(df["vaule"], errors="coerce")
+        value = typo if value is None else value.fillna(typo)
+
+    sensor = df["sensor"].astype("string").str.strip()
+    column = sensor.map(SENSOR_ALIASES).fillna(sensor)
+
+    out = pd.DataFrame({
+        "ts": pd.to_datetime(df["ts"], format="ISO8601", utc=True, errors="coerce"),
+        "column": column,
+        "value": value,
+    })
+    out = out.dropna(subset=["ts", "column", "value"])
+
+    # Duplicate readings for the same sensor and instant: keep the last one
+    out = out.sort_values(["column", "ts"], kind="stable")
+    out = out.drop_duplicates(subset=["column", "ts"], keep="last")
+    return out
+
+
+# ---------------- AS-OF ALIGNMENT ----------------
+# Every sensor is joined onto a shared time grid with merge_asof (latest
+# reading at or before the tick, within TOLERANCE). Ticks where the sensor
+# has no reading in tolerance get NaN and <column>_gap = 1.
+def pivot_long_to_wide(long_df, cadence=CADENCE, tolerance=TOLERANCE,
+                       gap_flags=True, drop_empty=True):
+    tol = pd.Timedelta(tolerance)
+    start = long_df["ts"].min().floor(cadence)
+    end = long_df["ts"].max().ceil(cadence)
+    wide = pd.DataFrame({"ts": pd.date_range(start, end, freq=cadence)})
+
+    extra = sorted(set(long_df["column"].unique()) - set(TELEMETRY_COLUMNS))
+    for col in TELEMETRY_COLUMNS + extra:
+        sensor = long_df.loc[long_df["column"] == col, ["ts", "value"]]
+        if sensor.empty:
+            wide[col] = float("nan")
+        else:
+            aligned = pd.merge_asof(
+                wide[["ts"]], sensor.rename(columns={"value": col}),
+                on="ts", direction="backward", tolerance=tol,
+            )
+            wide[col] = aligned[col].to_numpy()
+
+    value_cols = TELEMETRY_COLUMNS + extra
+    if drop_empty:
+        wide = wide.dropna(subset=value_cols, how="all").reset_index(drop=True)
+
+    if gap_flags:
+        gaps = wide[value_cols].isna().astype("int8")
+        gaps.columns = [f"{c}_gap" for c in value_cols]
+        wide = pd.concat([wide, gaps], axis=1)
+
+    return wide
+
+
+def pivot_files(paths=INPUT_FILES, **kwargs):
+    raw = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+    return pivot_long_to_wide(normalize_long(raw), **kwargs)
+
+
+if __name__ == "__main__":
+    wide = pivot_files()
+    wide.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ Pivot completed: {len(wide)} rows → {OUTPUT_FILE}")
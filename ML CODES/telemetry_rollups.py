@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from telemetry_schema import load_csv
+from telemetry_store import DEFAULT_DEVICE, TelemetryStore, _utc_ns
+
+# ---------------- ROLLUP CONFIG ----------------
+ROLLUP_ROOT = "telemetry_rollups"
+
+# Level name → bucket width in seconds, finest first
+LEVELS = {"1min": 60, "15min": 900, "1h": 3600, "1d": 86400}
+
+# Sensors rolled up (plus superheat when phase1 features are appended)
+ROLLUP_COLUMNS = [
+    "temperature", "evap_temp", "humidity", "power_watts", "fan_rpm",
+    "compressor_rpm", "pressure", "valve_steps", "superheat",
+]
+
+STATS = ["min", "max", "sum", "count"]
+
+
+# ---------------- REDUCTION ----------------
+# Every bucket keeps min / max / sum / count per column; mean = sum / count.
+# These four combine exactly, so a bucket that receives more rows later is
+# merged in place (fmin / fmax / + / +) instead of recomputed. NaNs are
+# skipped: they add nothing to sum or count.
+def _reduce(buckets, values):
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    blocks = []
+    for v in values.T:
+        valid = ~np.isnan(v)
+        blocks += [
+            np.fmin.reduceat(v, starts),
+            np.fmax.reduceat(v, starts),
+            np.add.reduceat(np.where(valid, v, 0.0), starts),
+            np.add.reduceat(valid.astype(np.float64), starts),
+        ]
+    return buckets[starts], np.column_stack(blocks)
+
+
+def _merge_rows(old, new):
+    merged = np.empty_like(old)
+    merged[0::4] = np.fmin(old[0::4], new[0::4])
+    merged[1::4] = np.fmax(old[1::4], new[1::4])
+    merged[2::4] = old[2::4] + new[2::4]
+    merged[3::4] = old[3::4] + new[3::4]
+    return merged
+
+
+def _epoch_ns(ts):
+    ts = pd.Series(ts)
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    return ts.to_numpy().astype("datetime64[ns]").view(np.int64)
+
+
+# ---------------- LAYOUT ----------------
+# <root>/<device>/index.json     columns + rows per level
+# <root>/<device>/<level>.ts     int64 bucket start (epoch seconds), sorted
+# <root>/<device>/<level>.bin    float64 rows × (columns × [min, max, sum, count])
+#
+# Files only grow (plus an in-place rewrite of the last row); readers map
+# the row count from the index, which is written last. The index also keeps
+# a copy of each level's last row: every write first truncates the files to
+# the indexed row count and restores that row, so bytes left behind by a
+# crashed update are overwritten instead of shifting later rows.
+class RollupPyramid:
+
+    def __init__(self, root=ROLLUP_ROOT, levels=LEVELS):
+        self.root = root
+        self.levels = levels
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- index ----------
+    def devices(self):
+        return sorted(
+            d for d in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, d, "index.json"))
+        )
+
+    def _device_dir(self, device):
+        return os.path.join(self.root, device)
+
+    def _load_index(self, device):
+        path = os.path.join(self._device_dir(device), "index.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_index(self, device, index):
+        path = os.path.join(self._device_dir(device), "index.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _paths(self, device, level):
+        base = os.path.join(self._device_dir(device), level)
+        return base + ".ts", base + ".bin"
+
+    def _open(self, device, level, index):
+        rows = index["rows"][level]
+        width = len(index["columns"]) * len(STATS)
+        ts_path, bin_path = self._paths(device, level)
+        if rows == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, width))
+        return (np.memmap(ts_path, dtype=np.int64, mode="r", shape=(rows,)),
+                np.memmap(bin_path, dtype=np.float64, mode="r", shape=(rows, width)))
+
+    # ---------- update ----------
+    # Raw telemetry in (any batch size, in time order); every level is
+    # reduced straight from the batch and merged with its last stored
+    # bucket when the batch continues it. Cost is O(batch), not O(history).
+    def update(self, device, df):
+        if df.empty:
+            return {}
+        os.makedirs(self._device_dir(device), exist_ok=True)
+
+        index = self._load_index(device)
+        if index is None:
+            index = {
+                "columns": [c for c in ROLLUP_COLUMNS if c in df],
+                "rows": {level: 0 for level in self.levels},
+                "last": {},
+                "last_ts": None,
+                "last_ns": None,
+            }
+
+        # Rows at or before the last rolled-up timestamp are already in the
+        # buckets (a replayed or overlapping batch) and are skipped
+        ns = _epoch_ns(df["ts"])
+        order = np.argsort(ns, kind="stable")
+        last_ns = index.get("last_ns")
+        if last_ns is None and index["last_ts"] is not None:
+            last_ns = (index["last_ts"] + 1) * 10**9 - 1
+        if last_ns is not None:
+            order = order[ns[order] > last_ns]
+        if not len(order):
+            return {level: 0 for level in self.levels}
+        ns = ns[order]
+        seconds = ns // 10**9
+
+        values = np.column_stack([
+            df[c].to_numpy(dtype=np.float64)[order] if c in df else np.full(len(order), np.nan)
+            for c in index["columns"]
+        ])
+
+        written = {}
+        for level, width in self.levels.items():
+            buckets, stats = _reduce(seconds // width * width, values)
+            written[level] = self._append(device, level, index, buckets, stats)
+
+        index["last_ts"] = int(seconds[-1])
+        index["last_ns"] = int(ns[-1])
+        self._save_index(device, index)
+        return written
+
+    def _append(self, device, level, index, buckets, stats):
+        rows = index["rows"][level]
+        ts_path, bin_path = self._paths(device, level)
+        stats = np.ascontiguousarray(stats)
+
+        # committed last row: the index copy (the file's may be half-merged)
+        tail_ts, tail = None, None
+        if rows:
+            last_ts, last_stats = self._open(device, level, index)
+            tail_ts = int(last_ts[-1])
+            tail = np.array(index.get("last", {}).get(level, last_stats[-1]), dtype=np.float64)
+            del last_ts, last_stats
+            if buckets[0] == tail_ts:
+                tail = _merge_rows(tail, stats[0])
+                buckets, stats = buckets[1:], stats[1:]
+
+        for path in (ts_path, bin_path):
+            if not os.path.exists(path):
+                open(path, "wb").close()
+        with open(ts_path, "r+b") as ts_file, open(bin_path, "r+b") as bin_file:
+            ts_file.truncate(rows * 8)
+            bin_file.truncate(rows * stats.shape[1] * 8)
+            if rows:
+                bin_file.seek((rows - 1) * tail.nbytes)
+                tail.tofile(bin_file)
+            ts_file.seek(0, os.SEEK_END)
+            bin_file.seek(0, os.SEEK_END)
+            buckets.astype(np.int64).tofile(ts_file)
+            stats.tofile(bin_file)
+
+        index["rows"][level] = rows + len(buckets)
+        index.setdefault("last", {})[level] = (stats[-1] if len(buckets) else tail).tolist()
+        return len(buckets)
+
+    def build_from_store(self, device, store_root):
+        store = TelemetryStore(store_root)
+        frame = store.read_frame(device)
+        return self.update(device, frame)
+
+    # ---------- query ----------
+    # Coarsest level with at least one bucket per pixel over [start, end);
+    # ranges finer than the first level fall back to it.
+    def choose_level(self, start, end, width_px):
+        span = (_utc_ns(end) - _utc_ns(start)) / 1e9
+        per_pixel = span / max(width_px, 1)
+        chosen = next(iter(self.levels))
+        for level, width in self.levels.items():
+            if width <= per_pixel:
+                chosen = level
+        return chosen
+
+    # Returns one row per bucket in [start, end) at the chosen level:
+    # ts, <col>_min, <col>_max, <col>_mean, <col>_count. Two binary searches
+    # plus a slice of at most width_px × (next level / this level) rows,
+    # whatever the history length.
+    def query(self, device, start, end, width_px=1000, columns=None, level=None):
+        index = self._load_index(device)
+        if index is None:
+            raise KeyError(f"unknown device '{device}'")
+        level = level or self.choose_level(start, end, width_px)
+
+        buckets, stats = self._open(device, level, index)
+        lo = _utc_ns(start) // 10**9 // self.levels[level] * self.levels[level]
+        hi = _utc_ns(end) // 10**9
+        i = np.searchsorted(buckets, lo, side="left")
+        j = np.searchsorted(buckets, hi, side="left")
+        rows = np.array(stats[i:j])
+
+        data = {"ts": pd.to_datetime(np.array(buckets[i:j]), unit="s", utc=True)}
+        for col in columns or index["columns"]:
+            k = index["columns"].index(col) * len(STATS)
+            count = rows[:, k + 3]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = rows[:, k + 2] / count
+            data[f"{col}_min"] = rows[:, k]
+            data[f"{col}_max"] = rows[:, k + 1]
+            data[f"{col}_mean"] = np.where(count > 0, mean, np.nan)
+            data[f"{col}_count"] = count.astype(np.int64)
+
+        out = pd.DataFrame(data)
+        out.attrs["level"] = level
+        return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Min/max/mean/count rollups at 1 min → 1 day")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    update_cmd = sub.add_parser("update", help="roll up new telemetry rows")
+    update_cmd.add_argument("--input", default="telemetry.csv")
+    update_cmd.add_argument("--device", default=DEFAULT_DEVICE)
+
+    query_cmd = sub.add_parser("query")
+    query_cmd.add_argument("--device", default=DEFAULT_DEVICE)
+    query_cmd.add_argument("--start", required=True)
+    query_cmd.add_argument("--end", required=True)
+    query_cmd.add_argument("--width", type=int, default=1000, help="plot width in pixels")
+    query_cmd.add_argument("--columns", nargs="*")
+    args = parser.parse_args()
+
+    pyramid = RollupPyramid()
+
+    if args.command == "update":
+        written = pyramid.update(args.device, load_csv(args.input))
+        print(f"✅ Rollups updated for {args.device}: {written}")
+
+    else:
+        start = time.perf_counter()
+        result = pyramid.query(args.device, args.start, args.end, args.width, args.columns)
+        elapsed = time.perf_counter() - start
+        print(result.to_string(max_rows=20))
+        print(f"✅ {len(result)} buckets at {result.attrs['level']} in {elapsed * 1000:.2f} ms")
@@ -0,0 +1,185 @@
+import os
+
+import pandas as pd
+
+from instrumentation import step
+
+# ---------------- SCHEMA ----------------
+# One dtype per known column, shared by phase1 → phase3.
+# Columns not listed here keep the dtype pandas infers.
+
+TS_COLUMN = "ts"
+
+# Freezer id in multi-device files (absent in single-freezer telemetry.csv)
+DEVICE_COLUMN = "device_id"
+
+# Every file is written with this timestamp format, and read with the
+# ISO-8601 fast path (it also accepts the older "+00:00" files).
+TS_WRITE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+FLOAT_COLUMNS = {
+    # raw sensors
+    "temperature": "float32",
+    "evap_temp": "float32",
+    "humidity": "float32",
+    "power_watts": "float32",
+    "pressure": "float32",
+    # phase1 features
+    "superheat": "float32",
+    "temp_delta": "float32",
+    "power_per_rpm": "float32",
+    "fan_efficiency": "float32",
+    # phase2 / phase3 scores
+    "anomaly_score": "float32",
+    "health_score": "float32",
+}
+
+INT_COLUMNS = {
+    "door_status": "int8",
+    "vibration": "int8",
+    "vibration_flag": "int8",
+    "anomaly": "int8",
+    "anomaly_count": "int8",
+    "ml_anomaly_flag": "int8",
+    "fan_rpm": "int16",
+    "compressor_rpm": "int16",
+    "valve_steps": "int16",
+    "eev_step_cmd": "int16",
+    "fan_rpm_cmd": "int16",
+    "compressor_rpm_cmd": "int16",
+    "fan_rpm_command": "int16",
+    "compressor_rpm_command": "int16",
+}
+
+ANOMALY_LABELS = ["Normal", "Anomaly"]
+RISK_LEVELS = ["NORMAL", "WARNING", "CRITICAL"]
+
+# Label columns → fixed categories (None = categories taken from the data).
+# phase3_health_score rewrites anomaly labels as 0/1, so a label column that
+# is already numeric is kept as a small int instead (when it fits; numeric
+# device ids keep their dtype so no two freezers ever share an id).
+LABEL_COLUMNS = {
+    DEVICE_COLUMN: None,
+    "anomaly_label": ANOMALY_LABELS,
+    "temp_anomaly": ANOMALY_LABELS,
+    "power_anomaly": ANOMALY_LABELS,
+    "rpm_anomaly": ANOMALY_LABELS,
+    "vibration_anomaly": ANOMALY_LABELS,
+    "risk_level": RISK_LEVELS,
+    "recommended_action": None,
+    "eev_state": None,
+    "fan_state": None,
+    "compressor_state": None,
+    "control_reason": None,
+    "system_action": None,
+}
+
+# Parsed copies of CSVs, keyed by source size + mtime
+CACHE_DIR = ".schema_cache"
+
+
+# ---------------- TYPING ----------------
+def parse_ts(values):
+    return pd.to_datetime(values, format="ISO8601", utc=True)
+
+
+def _fits_int8(values):
+    if values.isna().any() or not (values == values.round()).all():
+        return False
+    return values.empty or (values.min() >= -128 and values.max() <= 127)
+
+
+def _apply_labels(df):
+    for col, categories in LABEL_COLUMNS.items():
+        if col not in df:
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]):
+            if col != DEVICE_COLUMN and _fits_int8(df[col]):
+                df[col] = df[col].astype("int8")
+        elif categories is None:
+            df[col] = df[col].astype("category")
+        else:
+            df[col] = pd.Categorical(df[col], categories=categories)
+    return df
+
+
+# Slow path for files with blank lines, repeated header rows (telemetry.csv
+# was appended to) or missing values in integer columns.
+def _read_lenient(path):
+    df = pd.read_csv(path, dtype=str)
+    df = df[df[TS_COLUMN] != TS_COLUMN]
+
+    for col, dtype in {**FLOAT_COLUMNS, **INT_COLUMNS}.items():
+        if col not in df:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if dtype.startswith("int") and values.isna().any():
+            dtype = "float32"
+        df[col] = values.astype(dtype)
+
+    for col in LABEL_COLUMNS:
+        if col in df:
+            numeric = pd.to_numeric(df[col], errors="coerce")
+            if numeric.notna().all():
+                df[col] = numeric
+    return df.reset_index(drop=True)
+
+
+def read_typed_csv(path):
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {
+        c: d for c, d in {**FLOAT_COLUMNS, **INT_COLUMNS}.items() if c in header
+    }
+    with step("read_csv"):
+        try:
+            df = pd.read_csv(path, dtype=dtypes)
+        except (ValueError, TypeError):
+            df = _read_lenient(path)
+
+    if TS_COLUMN in df:
+        with step("parse_ts"):
+            df[TS_COLUMN] = parse_ts(df[TS_COLUMN])
+    return _apply_labels(df)
+
+
+# ---------------- LOAD / SAVE ----------------
+def _cache_path(path, cache_dir):
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    return os.path.join(cache_dir, f"{name}.{stat.st_size}-{stat.st_mtime_ns}.pkl")
+
+
+def load_csv(path, cache=True, cache_dir=CACHE_DIR):
+    with step("load_csv") as record:
+        df = _load_csv(path, cache, cache_dir)
+        if record is not None:
+            record.rows_out = len(df)
+    return df
+
+
+def _load_csv(path, cache, cache_dir):
+    if not cache:
+        return read_typed_csv(path)
+
+    cached = _cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        with step("read_cache"):
+            return pd.read_pickle(cached)
+
+    df = read_typed_csv(path)
+
+    # Drop stale copies of the same file before writing the new one
+    os.makedirs(cache_dir, exist_ok=True)
+    prefix = os.path.basename(path) + "."
+    for old in os.listdir(cache_dir):
+        if old.startswith(prefix) and old.endswith(".pkl"):
+            os.remove(os.path.join(cache_dir, old))
+    df.to_pickle(cached)
+    return df
+
+
+# append=True adds rows to an existing file without repeating the header
+def save_csv(df, path, append=False):
+    with step("save_csv", rows_in=len(df)):
+        df.to_csv(path, index=False, date_format=TS_WRITE_FORMAT,
+                  mode="a" if append else "w", header=not append)
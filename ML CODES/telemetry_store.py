@@ -0,0 +1,256 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ---------------- STORE CONFIG ----------------
+STORE_ROOT = "telemetry_store"
+DEFAULT_DEVICE = "freezer_01"
+
+# ~30 days of 10-second telemetry per segment
+SEGMENT_ROWS = 1 << 18
+
+# Text/label columns are stored as integer codes into a per-column category list
+# (at most 32767 distinct labels per column; -1 = missing)
+CODE_DTYPE = "int16"
+
+
+def _utc_ns(value):
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return ts.value
+
+
+# ---------------- LAYOUT ----------------
+# <root>/<device>/index.json           column dtypes + segment list (sorted by ts)
+# <root>/<device>/seg-000000/<col>.npy fixed-width column, memory-mapped
+# <root>/<device>/seg-000000.npz       same segment after archive()
+#
+# `ts` is stored as int64 nanoseconds since epoch (UTC). Segments never
+# overlap in time, so the segment list itself is the sorted timestamp index.
+class TelemetryStore:
+
+    def __init__(self, root=STORE_ROOT, segment_rows=SEGMENT_ROWS):
+        self.root = root
+        self.segment_rows = segment_rows
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- index ----------
+    def devices(self):
+        return sorted(
+            d for d in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, d, "index.json"))
+        )
+
+    def _device_dir(self, device):
+        return os.path.join(self.root, device)
+
+    # Rows stored for a device (0 if it has none), from the index alone
+    def row_count(self, device):
+        index = self._load_index(device)
+        if index is None:
+            return 0
+        return sum(segment["rows"] for segment in index["segments"])
+
+    def _load_index(self, device):
+        path = os.path.join(self._device_dir(device), "index.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_index(self, device, index):
+        path = os.path.join(self._device_dir(device), "index.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    # ---------- write ----------
+    def _encode(self, df, index):
+        ts = pd.to_datetime(df["ts"], format="ISO8601", utc=True)
+        columns = {"ts": ts.to_numpy(dtype="datetime64[ns]").view("int64")}
+
+        for col, spec in index["columns"].items():
+            if col not in df:
+                raise ValueError(f"column '{col}' missing from appended frame")
+            if "categories" in spec:
+                categories = spec["categories"]
+                values = df[col].astype("string")
+                known = set(categories)
+                categories += [label for label in values.dropna().unique() if label not in known]
+                # codes are fixed-width on disk, so the list can't outgrow them
+                if len(categories) > np.iinfo(spec["dtype"]).max + 1:
+                    raise ValueError(f"column '{col}' has {len(categories)} distinct labels, "
+                                     f"more than {spec['dtype']} codes can hold")
+                codes = pd.Categorical(values, categories=categories).codes
+                columns[col] = codes.astype(CODE_DTYPE)
+            else:
+                columns[col] = df[col].to_numpy(dtype=spec["dtype"])
+        return columns
+
+    def _new_index(self, df):
+        columns = {}
+        for col in df.columns:
+            if col == "ts":
+                continue
+            dtype = df[col].dtype
+            if pd.api.types.is_bool_dtype(dtype):
+                columns[col] = {"dtype": "int8"}
+            elif pd.api.types.is_numeric_dtype(dtype):
+                columns[col] = {"dtype": np.dtype(dtype).name}
+            else:
+                columns[col] = {"dtype": CODE_DTYPE, "categories": []}
+        return {"columns": columns, "segments": []}
+
+    def _open_segment(self, device, segment, index, mode):
+        seg_dir = os.path.join(self._device_dir(device), segment["name"])
+        if mode == "w+":
+            os.makedirs(seg_dir, exist_ok=True)
+        dtypes = {"ts": "int64", **{c: s["dtype"] for c, s in index["columns"].items()}}
+        return {
+            col: np.lib.format.open_memmap(
+                os.path.join(seg_dir, f"{col}.npy"), mode=mode,
+                dtype=dtype, shape=(self.segment_rows,) if mode == "w+" else None,
+            )
+            for col, dtype in dtypes.items()
+        }
+
+    def append(self, device, df):
+        if df.empty:
+            return 0
+        os.makedirs(self._device_dir(device), exist_ok=True)
+
+        index = self._load_index(device) or self._new_index(df)
+        columns = self._encode(df, index)
+
+        order = np.argsort(columns["ts"], kind="stable")
+        columns = {c: v[order] for c, v in columns.items()}
+
+        segments = index["segments"]
+        if segments and columns["ts"][0] < segments[-1]["ts_max"]:
+            raise ValueError("store is append-only: batch starts before the last stored timestamp")
+
+        n = len(columns["ts"])
+        done = 0
+        while done < n:
+            if not segments or segments[-1]["closed"]:
+                segment = {"name": f"seg-{len(segments):06d}", "rows": 0,
+                           "ts_min": None, "ts_max": None,
+                           "closed": False, "archived": False}
+                arrays = self._open_segment(device, segment, index, "w+")
+                segments.append(segment)
+            else:
+                segment = segments[-1]
+                arrays = self._open_segment(device, segment, index, "r+")
+
+            start = segment["rows"]
+            take = min(self.segment_rows - start, n - done)
+            for col, values in columns.items():
+                arrays[col][start:start + take] = values[done:done + take]
+                arrays[col].flush()
+
+            if segment["ts_min"] is None:
+                segment["ts_min"] = int(columns["ts"][done])
+            segment["ts_max"] = int(columns["ts"][done + take - 1])
+            segment["rows"] = start + take
+            segment["closed"] = segment["rows"] == self.segment_rows
+            done += take
+
+        # Index is written last: a crash mid-append leaves the previous view intact
+        self._save_index(device, index)
+        return n
+
+    # ---------- archive ----------
+    # Closed segments are compressed into one .npz and their raw files removed.
+    # Archived segments are still readable, but decompress instead of mapping.
+    def archive(self, device):
+        index = self._load_index(device)
+        archived = 0
+        for segment in index["segments"]:
+            if not segment["closed"] or segment["archived"]:
+                continue
+            seg_dir = os.path.join(self._device_dir(device), segment["name"])
+            arrays = self._open_segment(device, segment, index, "r")
+            np.savez_compressed(seg_dir + ".npz", **arrays)
+            for col in arrays:
+                os.remove(os.path.join(seg_dir, f"{col}.npy"))
+            os.rmdir(seg_dir)
+            segment["archived"] = True
+            archived += 1
+        self._save_index(device, index)
+        return archived
+
+    # ---------- read ----------
+    def _segment_arrays(self, device, segment, index, columns):
+        rows = segment["rows"]
+        if segment["archived"]:
+            path = os.path.join(self._device_dir(device), segment["name"] + ".npz")
+            with np.load(path) as npz:
+                return {c: npz[c][:rows] for c in columns}
+        arrays = self._open_segment(device, segment, index, "r")
+        return {c: arrays[c][:rows] for c in columns}
+
+    # Returns {column: ndarray} for start <= ts < end. When the range falls in
+    # one un-archived segment every array is a read-only view of the mapped
+    # file (no copy); across segments the slices are concatenated.
+    def read_range(self, device, start=None, end=None, columns=None):
+        index = self._load_index(device)
+        if index is None:
+            raise KeyError(f"unknown device '{device}'")
+
+        wanted = ["ts"] + [c for c in (columns or index["columns"]) if c != "ts"]
+        lo = None if start is None else _utc_ns(start)
+        hi = None if end is None else _utc_ns(end)
+
+        parts = []
+        for segment in index["segments"]:
+            if segment["rows"] == 0:
+                continue
+            if lo is not None and segment["ts_max"] < lo:
+                continue
+            if hi is not None and segment["ts_min"] >= hi:
+                continue
+
+            arrays = self._segment_arrays(device, segment, index, wanted)
+            ts = arrays["ts"]
+            i = 0 if lo is None else np.searchsorted(ts, lo, side="left")
+            j = len(ts) if hi is None else np.searchsorted(ts, hi, side="left")
+            parts.append({c: a[i:j] for c, a in arrays.items()})
+
+        if not parts:
+            dtypes = {"ts": "int64", **{c: s["dtype"] for c, s in index["columns"].items()}}
+            return {c: np.empty(0, dtype=dtypes[c]) for c in wanted}
+        if len(parts) == 1:
+            return parts[0]
+        return {c: np.concatenate([p[c] for p in parts]) for c in wanted}
+
+    def read_frame(self, device, start=None, end=None, columns=None):
+        index = self._load_index(device)
+        arrays = self.read_range(device, start, end, columns)
+
+        ts = arrays.pop("ts").view("datetime64[ns]")
+        data = {"ts": pd.DatetimeIndex(ts).tz_localize("UTC")}
+        for col, values in arrays.items():
+            spec = index["columns"][col]
+            if "categories" in spec:
+                data[col] = pd.Categorical.from_codes(values, categories=spec["categories"])
+            else:
+                data[col] = values
+        return pd.DataFrame(data, copy=False)
+
+
+if __name__ == "__main__":
+    from datetime import datetime, timezone
+
+    store = TelemetryStore()
+
+    df = pd.read_csv("ml_dataset_with_anomalies.csv")
+    if DEFAULT_DEVICE not in store.devices():
+        store.append(DEFAULT_DEVICE, df)
+
+    start = datetime(2025, 12, 16, tzinfo=timezone.utc)
+    window = store.read_frame(DEFAULT_DEVICE, start=start)
+
+    print(f"✅ Stored {len(df)} rows for {DEFAULT_DEVICE}, read back {len(window)}")
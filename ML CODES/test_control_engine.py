@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from benchmark_control_engine import make_rows
+from control_engine import compressor_control_vectorized, decide_control_vectorized
+from phase3_compressor_control import compressor_control
+from phase3_control_logic import CONTROL_COLUMNS, decide_control
+
+
+# Thresholds, the values either side of them, and NaN for every column
+def boundary_rows():
+    rows = make_rows(2000, seed=7)
+    edges = pd.DataFrame({
+        "power_watts": [900, 900.001, np.nan, 0],
+        "superheat": [12, 12.001, 5, 8],
+        "temp_delta": [3, 3.001, np.nan, 3],
+        "vibration": [1.5, 2, 1.5, 0],
+        "vibration_anomaly": [0, 0, 1, 0],
+        "power_anomaly": [1, 1, 0, 1],
+        "temperature_anomaly": [1, 0, 1, 1],
+    })
+    return pd.concat([rows, edges], ignore_index=True)
+
+
+def test_decide_control_matches_row_wise():
+    df = boundary_rows()
+    expected = df.apply(decide_control, axis=1)
+    expected.columns = CONTROL_COLUMNS
+
+    commands, hits = decide_control_vectorized(df)
+    for col in CONTROL_COLUMNS:
+        assert commands[col].astype(object).tolist() == expected[col].tolist(), col
+    assert sum(commands["control_reason"] == "Normal operation") == hits["normal_operation"]
+
+
+def test_compressor_control_matches_row_wise():
+    df = boundary_rows()
+    expected = df.apply(compressor_control, axis=1, result_type="expand")
+
+    delta, state, hits = compressor_control_vectorized(df)
+    assert delta.tolist() == expected[0].tolist()
+    assert state.astype(object).tolist() == expected[1].tolist()
+    assert sum(hits.values()) == len(df)
@@ -0,0 +1,150 @@
+import pandas as pd
+
+from firestore_incremental_export import encode_mark, export_collection_incremental
+
+
+# ---------------- FAKE CLIENT ----------------
+# In-memory stand-in for the few Firestore calls the export makes; every
+# streamed query and every document it returns is logged.
+class Snapshot:
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return None if self._data is None else dict(self._data)
+
+
+class Ref:
+
+    def __init__(self, collection, doc_id):
+        self.collection = collection
+        self.id = doc_id
+
+
+class Query:
+
+    def __init__(self, collection, order=(), cursor=None, limit=None, fields=None):
+        self.collection = collection
+        self.order = order
+        self.cursor = cursor
+        self.n = limit
+        self.fields = fields
+
+    def _with(self, **changes):
+        state = {"order": self.order, "cursor": self.cursor, "limit": self.n, "fields": self.fields}
+        return Query(self.collection, **{**state, **changes})
+
+    def order_by(self, field):
+        return self._with(order=self.order + (field,))
+
+    def select(self, fields):
+        return self._with(fields=fields)
+
+    def start_after(self, cursor):
+        return self._with(cursor=cursor)
+
+    def limit(self, n):
+        return self._with(limit=n)
+
+    def _key(self, doc_id, data):
+        return tuple(doc_id if f == "__name__" else data[f] for f in self.order)
+
+    def stream(self):
+        docs = self.collection.docs
+        rows = sorted((self._key(i, d), i) for i, d in docs.items()
+                      if all(f == "__name__" or f in d for f in self.order))
+        if self.cursor is not None:
+            after = tuple(self.cursor[f].id if f == "__name__" else self.cursor[f] for f in self.order)
+            rows = [r for r in rows if r[0] > after]
+        rows = rows[:self.n]
+        self.collection.log.append({"cursor": self.cursor is not None, "select": self.fields,
+                                    "documents": len(rows)})
+        return [Snapshot(i, {k: v for k, v in docs[i].items()
+                             if self.fields is None or k in self.fields}) for _, i in rows]
+
+
+class Collection(Query):
+
+    def __init__(self):
+        super().__init__(self)
+        self.docs = {}
+        self.log = []
+
+    def document(self, doc_id):
+        return Ref(self, doc_id)
+
+
+class FakeDb:
+
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, Collection())
+
+    def get_all(self, refs):
+        refs = list(refs)
+        if refs:
+            refs[0].collection.log.append({"get_all": len(refs)})
+        return [Snapshot(r.id, r.collection.docs.get(r.id)) for r in refs]
+
+
+def make_db(n=25):
+    db = FakeDb()
+    docs = db.collection("TEMPERATURE").docs
+    for i in range(n):
+        docs[f"doc{i:03d}"] = {"ts": i, "value": float(i)}
+    docs["untimed"] = {"value": -1.0}
+    return db, docs
+
+
+def export(db, tmp_path, checkpoints, **kwargs):
+    return export_collection_incremental(db, "TEMPERATURE", str(tmp_path / "T.csv"), checkpoints,
+                                         str(tmp_path / "cp.json"), page_size=10, **kwargs)
+
+
+# ---------------- TESTS ----------------
+def test_rerun_without_new_data_reads_nothing(tmp_path):
+    db, _ = make_db()
+    checkpoints = {}
+    assert export(db, tmp_path, checkpoints) == 25
+
+    log = db.collection("TEMPERATURE").log
+    log.clear()
+    assert export(db, tmp_path, checkpoints) == 0
+    assert log == [{"cursor": True, "select": None, "documents": 0}]
+
+
+def test_untimed_sweep_is_opt_in(tmp_path):
+    db, docs = make_db()
+    checkpoints = {}
+    export(db, tmp_path, checkpoints)
+    docs["doc100"] = {"ts": 100, "vaule": 3.0}
+
+    assert export(db, tmp_path, checkpoints) == 1
+    assert export(db, tmp_path, checkpoints, untimed=True) == 1
+    assert export(db, tmp_path, checkpoints, untimed=True) == 0
+
+    df = pd.read_csv(tmp_path / "T.csv")
+    assert sorted(df["document_id"]) == sorted(docs)
+    assert df.loc[df["document_id"] == "doc100", "vaule"].item() == 3.0
+
+
+def test_crash_before_checkpoint_does_not_duplicate_rows(tmp_path):
+    db, docs = make_db()
+    checkpoints = {}
+    export(db, tmp_path, checkpoints)
+    for i in range(25, 40):
+        docs[f"doc{i:03d}"] = {"ts": i, "value": float(i)}
+    export(db, tmp_path, checkpoints)
+
+    # the last page was appended but its checkpoint never saved
+    checkpoints["TEMPERATURE"] = encode_mark(29, "doc029")
+    assert export(db, tmp_path, checkpoints) == 0
+
+    df = pd.read_csv(tmp_path / "T.csv")
+    assert df["document_id"].is_unique
+    assert len(df) == 40
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from fleet import output_names, run_fleet
+
+
+def test_sanitized_names_do_not_collide():
+    devices = ["fz01", "FZ01", "fz/1", "fz_1", "fz 1", "plain"]
+    names = output_names(devices)
+
+    assert len({name.lower() for name in names.values()}) == len(devices)
+    assert names["plain"] == "plain"
+    assert output_names(["fz/1"]) == {"fz/1": names["fz/1"]}
+
+
+def test_empty_fleet_has_no_results(tmp_path):
+    assert run_fleet(pd.DataFrame(), out_dir=str(tmp_path), n_workers=1) == []
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import socket
+
+from http_ingest import HttpIngest, serve
+
+
+class FlakySink:
+    def __init__(self, failures):
+        self.failures = failures
+        self.frames = []
+
+    def write(self, df):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.frames.append(df)
+
+
+SAMPLE = {"temp": -18.5, "humidity": 40, "door": 0, "vibration": 0, "power": 120}
+
+
+def test_failed_write_is_retried(tmp_path):
+    async def run():
+        sink = FlakySink(failures=1)
+        ingest = HttpIngest(sink, str(tmp_path / "alerts.csv"))
+        ingest.upload(json.dumps([SAMPLE] * 3).encode(), "application/json")
+        await ingest.flush()
+        assert ingest.pending_rows() == 3
+        ingest.upload(json.dumps(SAMPLE).encode(), "application/json")
+        await ingest.flush()
+        return sink, ingest
+
+    sink, ingest = asyncio.run(run())
+    assert ingest.stats["failed"] == 1
+    assert ingest.stats["written"] == 4
+    assert ingest.pending_rows() == 0
+    assert sum(len(df) for df in sink.frames) == 4
+
+
+async def _request(port, content_length):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST /uploadData HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    writer.close()
+    return status
+
+
+def test_malformed_content_length_is_a_bad_request(tmp_path):
+    async def run():
+        ingest = HttpIngest(FlakySink(0), str(tmp_path / "alerts.csv"))
+        stop = asyncio.Event()
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = asyncio.create_task(serve(ingest, "127.0.0.1", port, stop))
+        await asyncio.sleep(0.2)
+        try:
+            return [await _request(port, value) for value in ("abc", "-5", "1e3", "²")]
+        finally:
+            stop.set()
+            await server
+
+    assert asyncio.run(run()) == [400] * 4
+
+
+def test_out_of_range_ts_is_rejected_per_item(tmp_path):
+    async def run():
+        sink = FlakySink(0)
+        ingest = HttpIngest(sink, str(tmp_path / "alerts.csv"))
+        ingest.upload(json.dumps([SAMPLE] * 100).encode(), "application/json")
+        replies = [ingest.upload(json.dumps([SAMPLE, {**SAMPLE, "ts": ts}]).encode(), "application/json")
+                   for ts in (1e15, 1e300, -1)]
+        await ingest.flush()
+        return sink, ingest, replies
+
+    sink, ingest, replies = asyncio.run(run())
+    for status, payload in replies:
+        assert status == 200
+        assert payload["accepted"] == 1
+        assert [r["index"] for r in payload["rejected"]] == [1]
+    assert ingest.stats["written"] == 103
+    assert ingest.stats["dropped"] == 0
+
+    status, payload = ingest.upload(json.dumps({**SAMPLE, "ts": 1e15}).encode(), "application/json")
+    assert status == 422
+
+
+def test_writer_survives_unexpected_errors(tmp_path):
+    class BrokenSink(FlakySink):
+        def write(self, df):
+            if not self.frames and self.failures:
+                self.failures -= 1
+                raise OverflowError("boom")
+            self.frames.append(df)
+
+    async def run():
+        sink = BrokenSink(1)
+        ingest = HttpIngest(sink, str(tmp_path / "alerts.csv"), batch_interval=0.01)
+        writer = asyncio.create_task(ingest.writer())
+        ingest.upload(json.dumps(SAMPLE).encode(), "application/json")
+        await asyncio.sleep(0.1)
+        ingest.upload(json.dumps(SAMPLE).encode(), "application/json")
+        await asyncio.sleep(0.1)
+        alive = not writer.done()
+        writer.cancel()
+        return ingest, alive
+
+    ingest, alive = asyncio.run(run())
+    assert alive
+    assert ingest.stats["dropped"] == 1
+    assert ingest.stats["written"] == 1
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from mqtt_ingest import MqttIngest, TickAssembler, parse_topic
+
+FIRMWARE_TOPICS = ["temp", "humidity", "door", "vibration", "power",
+                   "high_pressure", "low_pressure", "inventory"]
+SEND_INTERVAL = 5.0
+
+
+# Firmware publishes of `ticks` ticks, every value = its tick number
+def firmware_stream(ticks, drop=(), start=0.0):
+    messages = []
+    for tick in range(ticks):
+        for i, field in enumerate(FIRMWARE_TOPICS):
+            if (tick, field) not in drop:
+                messages.append((start + tick * SEND_INTERVAL + i * 0.001, f"freezer/{field}", float(tick)))
+    return messages
+
+
+def assemble(messages):
+    ticks = TickAssembler()
+    records = []
+    for received, topic, value in sorted(messages):
+        closed = ticks.add(*parse_topic(topic), value, received)
+        if closed is not None:
+            records.append(closed)
+    return records + ticks.close_all()
+
+
+def test_lost_publish_does_not_mix_ticks():
+    records = assemble(firmware_stream(6, drop={(2, "humidity")}))
+
+    assert len(records) == 6
+    for tick, (_, _, values) in enumerate(records):
+        assert set(values.values()) == {float(tick)}
+    assert "humidity" not in records[2][2]
+    assert len(records[3][2]) == len(FIRMWARE_TOPICS)
+
+
+def test_lost_first_topic_starts_tick_on_time_gap():
+    records = assemble(firmware_stream(4, drop={(1, "temp")}))
+
+    assert len(records) == 4
+    for tick, (_, _, values) in enumerate(records):
+        assert set(values.values()) == {float(tick)}
+
+
+def test_out_of_band_inventory_keeps_ticks_intact():
+    messages = firmware_stream(5)
+    # camera script publishing between firmware ticks
+    messages.append((1 * SEND_INTERVAL + 2.5, "freezer/inventory", 42.0))
+    records = assemble(messages)
+
+    firmware = [values for _, _, values in records if "temperature" in values]
+    assert len(firmware) == 5
+    for tick, values in enumerate(firmware):
+        assert set(values.values()) == {float(tick)}
+    assert [values for _, _, values in records if "temperature" not in values] == [{"inventory": 42.0}]
+
+
+def test_ingest_writes_one_record_per_tick():
+    class Sink:
+        def __init__(self):
+            self.frames = []
+
+        def write(self, df):
+            self.frames.append(df)
+
+    async def run():
+        sink = Sink()
+        ingest = MqttIngest(sink, queue_size=4, batch_rows=2)
+        stop = asyncio.Event()
+        service = asyncio.create_task(ingest.run(stop))
+        for received, topic, value in firmware_stream(3, drop={(1, "door")}):
+            await ingest.feed(topic, str(value).encode(), received)
+        await ingest.feed("freezer/unknown", b"1")
+        stop.set()
+        return sink, await service
+
+    sink, stats = asyncio.run(run())
+    assert stats["written"] == 3
+    assert stats["rejected"] == 1
+    assert sum(len(df) for df in sink.frames) == 3
+
+
+class FlakySink:
+    def __init__(self, failures, error=OSError):
+        self.failures = failures
+        self.error = error
+        self.frames = []
+
+    def write(self, df):
+        if self.failures:
+            self.failures -= 1
+            raise self.error("disk full")
+        self.frames.append(df)
+
+
+async def ingest_ticks(sink, ticks, **kwargs):
+    ingest = MqttIngest(sink, **kwargs)
+    stop = asyncio.Event()
+    service = asyncio.create_task(ingest.run(stop))
+    # ticks ahead of the clock, so only a new freezer/temp closes them
+    for received, topic, value in firmware_stream(ticks, start=time.time() + 60):
+        await asyncio.wait_for(ingest.feed(topic, str(value).encode(), received), 5)
+    await asyncio.sleep(0.05)
+    stop.set()
+    return await service
+
+
+def test_failed_writes_are_retried():
+    sink = FlakySink(failures=2)
+    stats = asyncio.run(ingest_ticks(sink, 20, queue_size=8, batch_rows=2, batch_interval=0.01))
+
+    assert stats["failed"] == 2
+    assert stats["written"] == stats["records"] == 20
+    assert stats["dropped"] == 0
+    rows = [row for df in sink.frames for row in df["temperature"]]
+    assert rows == [float(tick) for tick in range(20)]
+
+
+def test_rejected_data_is_dropped_and_consuming_continues():
+    sink = FlakySink(failures=1, error=RuntimeError)
+    stats = asyncio.run(ingest_ticks(sink, 10, queue_size=4, batch_rows=2, batch_interval=0.01))
+
+    assert stats["dropped"] == 2
+    assert stats["written"] == 8
@@ -0,0 +1,101 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import mqtt_publisher
+from mqtt_publisher import MqttPublisher
+
+CONNACK_OK = b"\x20\x02\x00\x00"
+CONNACK_NOT_AUTHORIZED = b"\x20\x02\x00\x05"
+
+
+# Just enough broker: "close" hangs up right after accept, "refuse" answers
+# CONNECT with a failing CONNACK, "accept" keeps the client and its bytes
+class FakeBroker(threading.Thread):
+
+    def __init__(self, mode):
+        super().__init__(daemon=True)
+        self.mode = mode
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.received = b""
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            if self.mode == "close":
+                conn.close()
+                continue
+            conn.recv(1024)
+            if self.mode == "refuse":
+                conn.sendall(CONNACK_NOT_AUTHORIZED)
+                conn.close()
+                continue
+            conn.sendall(CONNACK_OK)
+            conn.settimeout(0.1)
+            while not self.done.is_set():
+                try:
+                    data = conn.recv(1024)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                self.received += data
+            conn.close()
+
+    def stop(self):
+        self.done.set()
+        self.join()
+        self.sock.close()
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(mqtt_publisher, "RECONNECT_MIN_S", 0.1)
+    monkeypatch.setattr(mqtt_publisher, "RECONNECT_MAX_S", 0.8)
+
+
+@pytest.mark.parametrize("mode", ["close", "refuse"])
+def test_rejected_connections_back_off_and_never_count_as_connected(fast_backoff, mode):
+    broker = FakeBroker(mode)
+    broker.start()
+    publisher = MqttPublisher("127.0.0.1", broker.port).start()
+    seen_connected = False
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        seen_connected |= publisher.stats()["connected"]
+        time.sleep(0.01)
+    publisher.stop(flush_timeout=0)
+    broker.stop()
+
+    assert not seen_connected
+    # 0.1 + 0.2 + 0.4 + 0.8 + 0.8 s of backoff: a handful of attempts, not dozens
+    assert 2 <= broker.connections <= 7
+
+
+def test_accepted_connection_publishes(fast_backoff):
+    broker = FakeBroker("accept")
+    broker.start()
+    publisher = MqttPublisher("127.0.0.1", broker.port).start()
+    publisher.publish("freezer/inventory", 7)
+    deadline = time.monotonic() + 2.0
+    while b"freezer/inventory" not in broker.received and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = publisher.stats()
+    publisher.stop()
+    broker.stop()
+
+    assert stats["connected"]
+    assert stats["published"] == 1
+    assert broker.connections == 1
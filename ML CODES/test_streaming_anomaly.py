@@ -0,0 +1,28 @@
+import numpy as np
+
+from streaming_anomaly import HalfSpaceTrees, WINDOW
+
+
+def stationary(n, features, seed=0):
+    rng = np.random.default_rng(seed)
+    return [dict(zip(features, row)) for row in rng.normal(size=(n, len(features)))]
+
+
+def test_stationary_stream_flags_about_contamination():
+    detector = HalfSpaceTrees()
+    samples = stationary(WINDOW * 20, detector.features)
+    results = [detector.score_one(s) for s in samples][WINDOW:]
+
+    rate = sum(r["anomaly"] == -1 for r in results) / len(results)
+    assert 0.02 < rate < 0.08
+
+
+def test_outlier_is_flagged():
+    detector = HalfSpaceTrees()
+    for s in stationary(WINDOW * 3, detector.features):
+        detector.score_one(s)
+
+    outlier = {f: 8.0 for f in detector.features}
+    result = detector.score_one(outlier)
+    assert result["anomaly"] == -1
+    assert result["anomaly_label"] == "Anomaly"
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from telemetry_rollups import RollupPyramid
+
+
+def telemetry(start, minutes):
+    ts = pd.date_range(start, periods=minutes * 6, freq="10s", tz="UTC")
+    return pd.DataFrame({"ts": ts, "temperature": np.arange(len(ts), dtype=np.float64)})
+
+
+def query(pyramid, level="1min"):
+    return pyramid.query("fz", "2026-01-01", "2026-01-02", level=level)
+
+
+def test_overlapping_batch_is_not_counted_twice(tmp_path):
+    pyramid = RollupPyramid(str(tmp_path))
+    df = telemetry("2026-01-01 00:00", 30)
+    pyramid.update("fz", df.iloc[:100])
+    pyramid.update("fz", df.iloc[50:])
+    pyramid.update("fz", df.iloc[:100])
+
+    expected = RollupPyramid(str(tmp_path / "once"))
+    expected.update("fz", df)
+    pd.testing.assert_frame_equal(query(pyramid), query(expected))
+    assert query(pyramid)["temperature_count"].sum() == len(df)
+
+
+def test_crashed_update_leaves_no_orphan_rows(tmp_path):
+    pyramid = RollupPyramid(str(tmp_path))
+    df = telemetry("2026-01-01 00:00", 30)
+    pyramid.update("fz", df.iloc[:95])
+    index = pyramid._load_index("fz")
+
+    # an update that dies after writing the files but before the index:
+    # half-merged last row plus orphan bytes at the end of every level
+    pyramid.update("fz", df.iloc[95:140])
+    pyramid._save_index("fz", index)
+
+    pyramid.update("fz", df.iloc[95:])
+    expected = RollupPyramid(str(tmp_path / "once"))
+    expected.update("fz", df)
+    for level in ("1min", "15min"):
+        pd.testing.assert_frame_equal(query(pyramid, level), query(expected, level))
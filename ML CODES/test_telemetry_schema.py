@@ -0,0 +1,20 @@
+import pandas as pd
+
+from telemetry_schema import DEVICE_COLUMN, load_csv, save_csv
+
+
+def test_numeric_device_ids_survive_a_round_trip(tmp_path):
+    devices = [1, 200, 300, 1000, 456, 128]
+    df = pd.DataFrame({
+        "ts": pd.date_range("2026-01-01", periods=6, freq="5s", tz="UTC"),
+        DEVICE_COLUMN: devices,
+        "anomaly_label": [0, 1, 0, 0, 1, 0],
+        "temperature": [-18.0] * 6,
+    })
+    path = tmp_path / "fleet.csv"
+    save_csv(df, path)
+
+    loaded = load_csv(path, cache=False)
+    assert loaded[DEVICE_COLUMN].tolist() == devices
+    assert loaded[DEVICE_COLUMN].nunique() == len(devices)
+    assert loaded["anomaly_label"].dtype == "int8"
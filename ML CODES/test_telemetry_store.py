@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from telemetry_store import TelemetryStore
+
+
+def frame(start, labels):
+    ts = pd.date_range(start, periods=len(labels), freq="10s", tz="UTC")
+    return pd.DataFrame({"ts": ts, "temperature": -18.0, "control_reason": labels})
+
+
+def test_row_count_and_labels_round_trip(tmp_path):
+    store = TelemetryStore(str(tmp_path), segment_rows=1024)
+    assert store.row_count("fz") == 0
+    store.append("fz", frame("2026-01-01", ["a", "b"] * 1000))
+    assert store.row_count("fz") == 2000
+    assert store.read_frame("fz")["control_reason"].tolist() == ["a", "b"] * 1000
+
+
+def test_too_many_labels_raise_instead_of_wrapping(tmp_path):
+    store = TelemetryStore(str(tmp_path), segment_rows=1024)
+    store.append("fz", frame("2026-01-01", ["a"]))
+    with pytest.raises(ValueError, match="distinct labels"):
+        store.append("fz", frame("2026-01-02", [f"label {i}" for i in range(40_000)]))
+    assert store.row_count("fz") == 1
+    assert store.read_frame("fz")["control_reason"].tolist() == ["a"]
@@ -0,0 +1,341 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# ---------------- PIPELINE CONFIG ----------------
+INFERENCE_STRIDE = 1     # run the model on every Nth captured frame (1 = newest each time)
+REPORT_S = 5.0           # per-stage FPS / latency printout interval
+STATS_WINDOW = 60        # frames the FPS / latency figures are averaged over
+WINDOW_NAME = "YOLO Freezer Inventory"
+JOIN_TIMEOUT_S = 10.0    # shutdown waits this long for an inference call in progress
+
+# Gate in front of the detector (see InferenceGate)
+GATE_WIDTH = 64          # thumbnail width the frame difference runs on
+PIXEL_DELTA = 25         # grey levels a thumbnail pixel must change by ...
+MOTION_AREA = 0.01       # ... on this share of the thumbnail to count as motion
+SETTLE_S = 1.5           # still this long after motion / door close → detect once
+MAX_STALE_S = 300.0      # detect anyway after this long (lighting drift, missed events)
+REPUBLISH_S = 1.0        # while the gate skips, the last count is handed out again this often
+
+
+# ---------------- STAGE STATS ----------------
+# FPS and latency over the last STATS_WINDOW events of one stage
+class StageStats:
+
+    def __init__(self, name, window=STATS_WINDOW):
+        self.name = name
+        self.times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def tick(self, latency=None):
+        with self._lock:
+            self.count += 1
+            self.times.append(time.monotonic())
+            if latency is not None:
+                self.latencies.append(latency)
+
+    def summary(self):
+        with self._lock:
+            times, latencies = list(self.times), list(self.latencies)
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        text = f"{self.name} {fps:5.1f} fps"
+        if latencies:
+            text += (f", latency {sum(latencies) / len(latencies) * 1000:6.1f} ms"
+                     f" (max {max(latencies) * 1000:.1f})")
+        return text
+
+
+# ---------------- LATEST-VALUE SLOT ----------------
+# Holds only the newest item: a writer never waits, a reader blocks until
+# something newer than what it last saw arrives. Older items are simply
+# overwritten, so nothing queues up between stages.
+class LatestSlot:
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._item = None
+
+    def put(self, item):
+        with self._cond:
+            self._seq += 1
+            self._item = item
+            self._cond.notify_all()
+
+    def get_newer(self, seen, timeout=None, min_seq=None):
+        target = seen + 1 if min_seq is None else max(min_seq, seen + 1)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq >= target, timeout):
+                return seen, None
+            return self._seq, self._item
+
+    def latest(self):
+        with self._cond:
+            return self._seq, self._item
+
+
+# ---------------- INFERENCE GATE ----------------
+# Inventory only changes while the door is open, so the detector runs once
+# the scene has settled after a door event instead of on every frame:
+#   - motion = share of pixels of a grey GATE_WIDTH-wide thumbnail that
+#     changed by more than PIXEL_DELTA since the previous checked frame
+#   - motion or a door change marks the count stale; while the door is
+#     open (hands, lid) nothing runs
+#   - once nothing has moved for SETTLE_S (and the door is closed) the
+#     detector runs once; otherwise the last count is reused
+#   - a first count at start-up and one every MAX_STALE_S as a safety net
+# A check costs well under a millisecond, so a closed freezer costs
+# almost nothing.
+class DoorSignal:
+
+    def __init__(self):
+        self.is_open = False
+        self.last_change = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        is_open = bool(int(float(value)))
+        with self._lock:
+            if is_open != self.is_open or self.last_change is None:
+                self.last_change = time.monotonic()
+            self.is_open = is_open
+
+    def state(self):
+        with self._lock:
+            return self.is_open, self.last_change
+
+    # Follows the firmware's freezer/door topic (payload "0" / "1")
+    def start_mqtt(self, host, port=1883, topic="freezer/door"):
+        import paho.mqtt.client as mqtt
+
+        def on_connect(client, *args):
+            client.subscribe(topic)
+
+        def on_message(client, userdata, msg):
+            try:
+                self.set(msg.payload)
+            except ValueError:
+                pass
+
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        else:
+            client = mqtt.Client()
+        client.on_connect = on_connect
+        client.on_message = on_message
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        client.connect_async(host, port, 60)
+        client.loop_start()
+        return self
+
+
+class InferenceGate:
+
+    def __init__(self, door=None, settle_s=SETTLE_S, max_stale_s=MAX_STALE_S,
+                 width=GATE_WIDTH, pixel_delta=PIXEL_DELTA, motion_area=MOTION_AREA):
+        self.door = door
+        self.settle_s = settle_s
+        self.max_stale_s = max_stale_s
+        self.width = width
+        self.pixel_delta = pixel_delta
+        self.motion_area = motion_area
+        self.previous = None
+        self.stale = True
+        self.last_event = 0.0
+        self.last_door_change = None
+        self.last_run = None
+        self.stats = StageStats("gate")
+        self.passed = 0
+
+    def _thumbnail(self, frame):
+        height = max(1, frame.shape[0] * self.width // frame.shape[1])
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def motion(self, frame):
+        thumb = self._thumbnail(frame)
+        previous, self.previous = self.previous, thumb
+        if previous is None:
+            return False
+        changed = cv2.absdiff(thumb, previous) > self.pixel_delta
+        return np.count_nonzero(changed) > self.motion_area * changed.size
+
+    def should_infer(self, frame, now):
+        start = time.monotonic()
+        if self.motion(frame):
+            self.stale = True
+            self.last_event = now
+
+        door_open = False
+        if self.door is not None:
+            door_open, changed = self.door.state()
+            if changed is not None and changed != self.last_door_change:
+                self.last_door_change = changed
+                self.stale = True
+                self.last_event = max(self.last_event, changed)
+
+        run = (
+            self.last_run is None
+            or (self.stale and not door_open and now - self.last_event >= self.settle_s)
+            or now - self.last_run >= self.max_stale_s
+        )
+        if run:
+            self.stale = False
+            self.last_run = now
+            self.passed += 1
+        self.stats.tick(time.monotonic() - start)
+        return run
+
+    def summary(self):
+        checked = self.stats.count
+        skipped = 100 * (checked - self.passed) / checked if checked else 0.0
+        return f"{self.stats.summary()}, {skipped:.0f}% skipped"
+
+
+# ---------------- STAGES ----------------
+# Capture: reads as fast as the camera delivers and keeps the latest frame,
+# so the driver buffer never holds stale frames.
+class CaptureThread(threading.Thread):
+
+    def __init__(self, cap, frames, stop):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.frames = frames
+        self.stop = stop
+        self.stats = StageStats("capture")
+        # ask the driver for the shallowest buffer it supports
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def run(self):
+        while not self.stop.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                self.stop.set()
+                break
+            self.frames.put((time.monotonic(), frame))
+            self.stats.tick()
+
+
+# Inference: takes the newest frame (at least `stride` frames after the
+# previous one), runs infer(frame) → (count, results) and publishes the
+# result with the capture time of its frame. A count is therefore never
+# older than one inference period plus one capture interval. With a gate,
+# frames it turns down republish the last result (marked "reused") every
+# `republish_s`, so on_result keeps seeing the count between door events.
+class InferenceThread(threading.Thread):
+
+    def __init__(self, infer, frames, results, stop, stride=INFERENCE_STRIDE, gate=None,
+                 republish_s=REPUBLISH_S):
+        super().__init__(name="inference", daemon=True)
+        self.infer = infer
+        self.frames = frames
+        self.results = results
+        self.stop = stop
+        self.stride = max(1, stride)
+        self.gate = gate
+        self.republish_s = republish_s
+        self.stats = StageStats("inference")
+        self.error = None
+
+    # an exception in infer stops the pipeline; run_pipeline re-raises it
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop.set()
+
+    def _run(self):
+        seen = 0
+        last, last_put = None, 0.0
+        while not self.stop.is_set():
+            seq, item = self.frames.get_newer(seen, timeout=0.5,
+                                              min_seq=seen + self.stride if seen else None)
+            if item is None:
+                continue
+            seen = seq
+            captured, frame = item
+            if self.gate is not None and not self.gate.should_infer(frame, captured):
+                if last is not None and captured - last_put >= self.republish_s:
+                    self.results.put({**last, "reused": True})
+                    last_put = captured
+                continue
+            count, results = self.infer(frame)
+            done = time.monotonic()
+            last = {"captured": captured, "done": done, "frame": frame,
+                    "count": count, "results": results, "reused": False}
+            self.results.put(last)
+            last_put = done
+            # latency = frame capture → count available
+            self.stats.tick(done - captured)
+
+
+# ---------------- RUNNER ----------------
+# Capture and inference run on their own threads; the caller's thread
+# handles results (on_result(result) e.g. MQTT publish) and, optionally,
+# annotation + display, since HighGUI must stay on the main thread.
+# annotate(result) → image; with display=False nothing is drawn at all.
+# An exception raised by infer stops the pipeline and is re-raised here.
+def run_pipeline(cap, infer, annotate=None, on_result=None, stride=INFERENCE_STRIDE,
+                 display=True, window=WINDOW_NAME, report_s=REPORT_S, gate=None,
+                 republish_s=REPUBLISH_S):
+    frames, results = LatestSlot(), LatestSlot()
+    stop = threading.Event()
+    capture = CaptureThread(cap, frames, stop)
+    inference = InferenceThread(infer, frames, results, stop, stride, gate, republish_s)
+    display_stats = StageStats("display")
+    freshness = StageStats("results")
+    capture.start()
+    inference.start()
+
+    seen = 0
+    last_report = time.monotonic()
+    try:
+        while not stop.is_set():
+            seen, result = results.get_newer(seen, timeout=0.05)
+            if result is not None:
+                if not result["reused"]:
+                    freshness.tick(time.monotonic() - result["captured"])
+                if on_result is not None:
+                    on_result(result)
+                if display and annotate is not None:
+                    cv2.imshow(window, annotate(result))
+                    if not result["reused"]:
+                        display_stats.tick(time.monotonic() - result["done"])
+
+            if display and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+            now = time.monotonic()
+            if now - last_report >= report_s:
+                stages = [capture.stats, inference.stats, freshness]
+                if display:
+                    stages.append(display_stats)
+                summaries = [s.summary() for s in stages]
+                if gate is not None:
+                    summaries.insert(1, gate.summary())
+                print(" | ".join(summaries))
+                last_report = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        capture.join(timeout=2)
+        inference.join(timeout=JOIN_TIMEOUT_S)
+        if inference.is_alive():
+            print(f"⚠️ inference still running after {JOIN_TIMEOUT_S:.0f}s, not waiting for it")
+        cap.release()
+        if display:
+            cv2.destroyAllWindows()
+    if inference.error is not None:
+        raise RuntimeError("inference stage failed") from inference.error
+    stats = {"capture": capture.stats, "inference": inference.stats, "display": display_stats}
+    if gate is not None:
+        stats["gate"] = gate
+    return stats
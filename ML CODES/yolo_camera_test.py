@@ -1,17 +1,22 @@
+import sys
+
 from ultralytics import YOLO
 import cv2
 
+from vision_pipeline import run_pipeline
+
 model = YOLO("yolov8n.pt")
 cap = cv2.VideoCapture(0)
 
 ICECREAM_CLASSES = ["cup", "bottle", "box"]
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+# capture / inference / display on separate stages; see vision_pipeline
+INFERENCE_STRIDE = 1
+HEADLESS = "--headless" in sys.argv
+
 
-    results = model(frame, conf=0.5)
+def count_icecream(frame):
+    results = model(frame, conf=0.5, verbose=False)
     detections = results[0].boxes
 
     icecream_count = 0
@@ -23,21 +28,29 @@ while True:
         if label in ICECREAM_CLASSES:
             icecream_count += 1
 
-    annotated = results[0].plot()
+    return icecream_count, results
+
+
+def annotate(result):
+    annotated = result["results"][0].plot()
     cv2.putText(
         annotated,
-        f"Ice-Cream Count: {icecream_count}",
+        f"Ice-Cream Count: {result['count']}",
         (20, 40),
         cv2.FONT_HERSHEY_SIMPLEX,
         1,
         (0, 255, 0),
         2
     )
+    return annotated
+
 
-    cv2.imshow("YOLO Inventory Counter", annotated)
+def print_count(result):
+    if HEADLESS:
+        print("Ice-Cream Count:", result["count"])
 
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-cap.release()
-cv2.destroyAllWindows()
+stats = run_pipeline(cap, count_icecream, annotate, print_count,
+                     stride=INFERENCE_STRIDE, display=not HEADLESS,
+                     window="YOLO Inventory Counter")
+print(" | ".join(s.summary() for s in stats.values()))
@@ -1,14 +1,19 @@
-import cv2
+import sys
 import time
-import paho.mqtt.client as mqtt
+
+import cv2
 from ultralytics import YOLO
 
+from mqtt_publisher import MqttPublisher
+from vision_pipeline import DoorSignal, InferenceGate, run_pipeline
+
 # ---------------- MQTT CONFIG ----------------
 MQTT_BROKER = "broker.hivemq.com"
 MQTT_TOPIC  = "freezer/inventory"
 
-client = mqtt.Client()
-client.connect(MQTT_BROKER, 1883, 60)
+# Network loop, reconnects and buffering run on the publisher's own
+# thread; publish() below never blocks the frame loop.
+publisher = MqttPublisher(MQTT_BROKER).start()
 
 # ---------------- YOLO MODEL ----------------
 model = YOLO("yolov8n.pt")   # lightweight & fast
@@ -36,16 +41,31 @@ ICE_CREAM_ALIASES = [
 SEND_INTERVAL = 10  # seconds
 last_send_time = time.time()
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+# ---------------- PIPELINE ----------------
+# Capture, inference and display run as separate stages (vision_pipeline):
+# the camera is drained continuously and the model always gets the newest
+# frame, so the count is at most one inference period old.
+#   --headless   no window, no annotation (count + MQTT only)
+#   --no-gate    run the model on every frame instead of after door events
+INFERENCE_STRIDE = 1   # model every Nth captured frame
+HEADLESS = "--headless" in sys.argv
 
-    results = model(frame, conf=0.4)
+# ---------------- DOOR / MOTION GATE ----------------
+# YOLO only runs once the picture has settled after motion or a door
+# event (firmware freezer/door topic); otherwise the last count is reused.
+GATED = "--no-gate" not in sys.argv
+DOOR_TOPIC = "freezer/door"
+
+gate = None
+if GATED:
+    gate = InferenceGate(DoorSignal().start_mqtt(MQTT_BROKER, topic=DOOR_TOPIC))
 
-    inventory_count = 0
 
-    # ---------------- DETECTION LOOP ----------------
+# ---------------- DETECTION ----------------
+def count_inventory(frame):
+    results = model(frame, conf=0.4, verbose=False)
+
+    inventory_count = 0
     for result in results:
         boxes = result.boxes
         for box in boxes:
@@ -61,30 +81,39 @@ while True:
             if label in ICE_CREAM_ALIASES:
                 inventory_count += 1
 
-    # ---------------- MQTT SEND (SLOW) ----------------
+    return inventory_count, results
+
+
+# ---------------- MQTT SEND (SLOW) ----------------
+def send_inventory(result):
+    global last_send_time
     current_time = time.time()
     if current_time - last_send_time >= SEND_INTERVAL:
-        client.publish(MQTT_TOPIC, inventory_count)
-        print("Inventory sent:", inventory_count)
+        publisher.publish(MQTT_TOPIC, result["count"])
+        print("Inventory queued:", result["count"], publisher.stats())
         last_send_time = current_time
 
-    # ---------------- DISPLAY ----------------
-    annotated_frame = results[0].plot()
+
+# ---------------- DISPLAY ----------------
+def annotate(result):
+    annotated_frame = result["results"][0].plot()
 
     cv2.putText(
         annotated_frame,
-        f"Ice-Cream Inventory: {inventory_count}",
+        f"Ice-Cream Inventory: {result['count']}",
         (20, 40),
         cv2.FONT_HERSHEY_SIMPLEX,
         1,
         (0, 255, 0),
         2
     )
+    return annotated_frame
 
-    cv2.imshow("YOLO Freezer Inventory", annotated_frame)
 
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+stats = run_pipeline(cap, count_inventory, annotate, send_inventory,
+                     stride=INFERENCE_STRIDE, display=not HEADLESS,
+                     window="YOLO Freezer Inventory", gate=gate)
+print(" | ".join(s.summary() for s in stats.values()))
 
-cap.release()
-cv2.destroyAllWindows()
+publisher.stop()
+print("MQTT publisher:", publisher.stats())